@@ -0,0 +1,17 @@
+"""
+Throughput benchmarks for the screening agent.
+
+    python -m screening_agent.benchmarks.corpus --out /tmp/corpus --resumes 200
+    python -m screening_agent.benchmarks.stub_server --port 8765 --latency-ms 300
+    python -m screening_agent.benchmarks.run --resumes 200 --out data/bench_results
+
+The modules under screening_agent/modules import each other by bare name, so
+the package puts that folder on sys.path before anything else is imported.
+"""
+
+import os
+import sys
+
+MODULES_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "modules"))
+if MODULES_DIR not in sys.path:
+    sys.path.insert(0, MODULES_DIR)
@@ -0,0 +1,218 @@
+# corpus.py
+"""
+Synthetic resumes (PDF / DOCX / TXT) and job descriptions at configurable scale.
+
+Resumes follow the layout resume_scraper_nlp expects (contact block, section
+headers, "Title, Company, City Mon YYYY - Mon YYYY" role lines, bullet duties,
+comma-separated skills), so the parse benchmarks exercise the real code paths.
+Everything is seeded and ASCII-only, and PDFs are written directly without a
+PDF library.
+"""
+
+import os
+import json
+import random
+
+from . import MODULES_DIR  # noqa: F401  (puts the modules folder on sys.path)
+
+FIRST = ["Aarav", "Maya", "Liam", "Sofia", "Noah", "Priya", "Ethan", "Chloe", "Ravi", "Emma",
+         "Lucas", "Ana", "Omar", "Grace", "Kenji", "Zara", "Mateo", "Isla", "Arjun", "Nora"]
+LAST = ["Sharma", "Johnson", "Garcia", "Chen", "Okafor", "Muller", "Rossi", "Patel", "Kim",
+        "Silva", "Nguyen", "Brown", "Haddad", "Kowalski", "Tanaka", "Lopez"]
+TITLES = ["Data Engineer", "Data Scientist", "Senior Data Scientist", "ML Engineer",
+          "Software Engineer", "Backend Developer", "Full Stack Developer", "Mobile Developer",
+          "Analytics Engineer", "Platform Engineer", "Data Analyst"]
+COMPANIES = ["Acme Corp", "Globex", "Initech", "Umbrella Health", "Stark Industries",
+             "Wayne Enterprises", "Hooli", "Vandelay Imports", "Bright Horizons", "Tata Consultancy Services"]
+CITIES = ["Boston", "Austin", "Seattle", "Chennai", "Pune", "London", "Toronto", "Denver"]
+MONTHS = ["Jan", "Feb", "Mar", "Apr", "May", "Jun", "Jul", "Aug", "Sep", "Oct", "Nov", "Dec"]
+VERBS = ["Built", "Designed", "Maintained", "Migrated", "Optimised", "Automated", "Led", "Deployed"]
+OBJECTS = ["ETL pipelines", "REST services", "dashboards", "feature stores", "mobile apps",
+           "data models", "CI/CD workflows", "recommendation models", "streaming jobs"]
+DEGREES = ["Master of Science in Computer Science", "Bachelor of Technology in Electronics",
+           "Masters in Data Analytics Engineering", "Bachelor of Science in Mathematics",
+           "MCA Computer Applications", "PhD in Statistics"]
+UNIVERSITIES = ["Northeastern University", "Vellore Institute of Technology", "University of Example",
+                "State University", "Institute of Technology Delhi"]
+CERTS = ["AWS Certified Solutions Architect", "TensorFlow Developer Certificate",
+         "Google Cloud Professional Data Engineer certification", "Certified Scrum Master"]
+SOFT = ["communication", "teamwork", "leadership", "problem-solving", "attention to detail"]
+BOILERPLATE = ("We are an equal opportunity employer and value diversity at our company. "
+               "We do not discriminate on the basis of race, religion, color, national origin, "
+               "gender, sexual orientation, age, marital status, veteran status, or disability status.")
+
+
+def _skill_names():
+    from skill_matcher import load_taxonomy
+    return [e["name"] for e in load_taxonomy()]
+
+
+def make_resume(seed: int, skills_pool=None) -> dict:
+    """Structured synthetic resume (also the ground truth for what the parsers should find)."""
+    rng = random.Random(seed)
+    skills_pool = skills_pool or _skill_names()
+    name = f"{rng.choice(FIRST)} {rng.choice(LAST)}"
+    year = 2025
+    roles = []
+    for _ in range(rng.randint(1, 6)):
+        span = rng.randint(1, 4)
+        start_y, start_m = year - span, rng.choice(MONTHS)
+        end = "Present" if not roles else f"{rng.choice(MONTHS)} {year}"
+        roles.append({
+            "title": rng.choice(TITLES), "company": rng.choice(COMPANIES), "city": rng.choice(CITIES),
+            "start_year_month": f"{start_m} {start_y}", "end_year_month": end,
+            "duties": [f"{rng.choice(VERBS)} {rng.choice(OBJECTS)} using {rng.choice(skills_pool)} "
+                       f"for {rng.randint(2, 40)} teams" for _ in range(rng.randint(2, 7))],
+        })
+        year = start_y
+    return {
+        "name": name,
+        "email": f"{name.lower().replace(' ', '.')}{seed}@example.com",
+        "phone": f"+1 555 {rng.randint(100, 999)} {rng.randint(1000, 9999)}",
+        "skills": rng.sample(skills_pool, rng.randint(6, 20)),
+        "past_roles": roles,
+        "education": [{"degree": rng.choice(DEGREES), "institution": rng.choice(UNIVERSITIES),
+                       "year": str(rng.randint(2008, 2023))} for _ in range(rng.randint(1, 2))],
+        "certifications": rng.sample(CERTS, rng.randint(0, 2)),
+        "soft_skills": rng.sample(SOFT, 2),
+    }
+
+
+def resume_lines(r: dict) -> list:
+    lines = [r["name"].upper(), f"{r['email']} | {r['phone']}", "",
+             "SUMMARY", f"Engineer with strengths in {', '.join(r['soft_skills'])}.", "",
+             "PROFESSIONAL EXPERIENCE"]
+    for role in r["past_roles"]:
+        lines.append(f"{role['title']}, {role['company']}, {role['city']} "
+                     f"{role['start_year_month']} - {role['end_year_month']}")
+        lines += [f"- {d}" for d in role["duties"]]
+        lines.append("")
+    lines += ["SKILLS", ", ".join(r["skills"]), "", "EDUCATION"]
+    for e in r["education"]:
+        lines += [e["degree"], f"{e['institution']} {e['year']}"]
+    if r["certifications"]:
+        lines += ["", "CERTIFICATIONS"] + r["certifications"]
+    return lines
+
+
+def make_jd(seed: int, skills_pool=None) -> tuple:
+    """(jd_text, jd_json) in the shape jd_parser produces."""
+    rng = random.Random(10_000 + seed)
+    skills_pool = skills_pool or _skill_names()
+    picked = rng.sample(skills_pool, 12)
+    lo = rng.randint(1, 8)
+    jd = {
+        "required_skills": picked[:7], "preferred_skills": picked[7:],
+        "min_experience_years": lo, "max_experience_years": lo + rng.randint(2, 5),
+        "required_qualifications": ["BE/BTech in Computer Science", "MCA"],
+        "domain": rng.choice(["Software Development", "Healthcare", "Fintech", "Retail"]),
+        "soft_skills": rng.sample(SOFT, 3), "other_notes": [],
+    }
+    title = rng.choice(TITLES)
+    text = "\n".join([
+        f"{title}", "", "About the role",
+        f"We are hiring a {title} to join a fast-growing {jd['domain']} team.", "",
+        "Requirements",
+        f"- {jd['min_experience_years']}-{jd['max_experience_years']} years of professional experience",
+        *[f"- Strong hands-on experience with {s}" for s in jd["required_skills"]],
+        "- BE/BTech in Computer Science or MCA", "",
+        "Nice to have", *[f"- {s}" for s in jd["preferred_skills"]], "",
+        "Soft skills: " + ", ".join(jd["soft_skills"]), "",
+        "About us", BOILERPLATE, BOILERPLATE,
+    ])
+    return text, jd
+
+# ---------- writers ---------------------------------------------------------
+def write_txt(lines, path):
+    with open(path, "w", encoding="utf-8") as f:
+        f.write("\n".join(lines))
+
+
+def write_docx(lines, path):
+    from docx import Document
+    doc = Document()
+    for line in lines:
+        doc.add_paragraph(line)
+    doc.save(path)
+
+
+def _pdf_escape(s: str) -> str:
+    return s.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)")
+
+
+def write_pdf(lines, path, lines_per_page: int = 55):
+    """Minimal single-font PDF (Helvetica, one text object per page)."""
+    pages = [lines[i:i + lines_per_page] for i in range(0, len(lines), lines_per_page)] or [[]]
+    objects = ["<< /Type /Catalog /Pages 2 0 R >>", None,
+               "<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>"]
+    kids = []
+    for page in pages:
+        body = "BT /F1 10 Tf 13 TL 50 750 Td " + " ".join(
+            f"({_pdf_escape(line)}) Tj T*" for line in page) + " ET"
+        objects.append(f"<< /Length {len(body)} >>\nstream\n{body}\nendstream")
+        content_no = len(objects)
+        objects.append(f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] "
+                       f"/Resources << /Font << /F1 3 0 R >> >> /Contents {content_no} 0 R >>")
+        kids.append(f"{len(objects)} 0 R")
+    objects[1] = f"<< /Type /Pages /Kids [{' '.join(kids)}] /Count {len(kids)} >>"
+
+    out = bytearray(b"%PDF-1.4\n")
+    offsets = []
+    for no, obj in enumerate(objects, start=1):
+        offsets.append(len(out))
+        out += f"{no} 0 obj\n{obj}\nendobj\n".encode("latin-1")
+    xref = len(out)
+    out += f"xref\n0 {len(objects) + 1}\n0000000000 65535 f \n".encode("latin-1")
+    out += "".join(f"{o:010d} 00000 n \n" for o in offsets).encode("latin-1")
+    out += f"trailer\n<< /Size {len(objects) + 1} /Root 1 0 R >>\nstartxref\n{xref}\n%%EOF\n".encode("latin-1")
+    with open(path, "wb") as f:
+        f.write(out)
+
+
+WRITERS = {"pdf": write_pdf, "docx": write_docx, "txt": write_txt}
+
+
+def build_corpus(out_dir: str, n_resumes: int = 100, n_jds: int = 3,
+                 formats=("pdf", "docx", "txt"), seed: int = 0) -> dict:
+    """
+    Write resumes/<id>.<fmt> (formats round-robin), resumes/<id>.truth.json,
+    jds/<id>.txt and jds/<id>.json. Returns a manifest dict (also saved as manifest.json).
+    """
+    skills_pool = _skill_names()
+    res_dir, jd_dir = os.path.join(out_dir, "resumes"), os.path.join(out_dir, "jds")
+    os.makedirs(res_dir, exist_ok=True)
+    os.makedirs(jd_dir, exist_ok=True)
+    manifest = {"resumes": [], "jds": [], "seed": seed}
+    for i in range(n_resumes):
+        r = make_resume(seed * 1_000_003 + i, skills_pool)
+        fmt = formats[i % len(formats)]
+        path = os.path.join(res_dir, f"r{i:06d}.{fmt}")
+        WRITERS[fmt](resume_lines(r), path)
+        with open(os.path.join(res_dir, f"r{i:06d}.truth.json"), "w", encoding="utf-8") as f:
+            json.dump(r, f)
+        manifest["resumes"].append(path)
+    for j in range(n_jds):
+        text, jd = make_jd(seed * 1_000_003 + j, skills_pool)
+        base = os.path.join(jd_dir, f"jd{j:03d}")
+        with open(base + ".txt", "w", encoding="utf-8") as f:
+            f.write(text)
+        with open(base + ".json", "w", encoding="utf-8") as f:
+            json.dump(jd, f, indent=2)
+        manifest["jds"].append(base + ".txt")
+    with open(os.path.join(out_dir, "manifest.json"), "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=2)
+    return manifest
+
+
+if __name__ == "__main__":
+    import argparse
+
+    ap = argparse.ArgumentParser(description="Generate a synthetic resume/JD corpus.")
+    ap.add_argument("--out", required=True)
+    ap.add_argument("--resumes", type=int, default=100)
+    ap.add_argument("--jds", type=int, default=3)
+    ap.add_argument("--formats", default="pdf,docx,txt")
+    ap.add_argument("--seed", type=int, default=0)
+    args = ap.parse_args()
+    m = build_corpus(args.out, args.resumes, args.jds, tuple(args.formats.split(",")), args.seed)
+    print(f"[corpus] Wrote {len(m['resumes'])} resumes and {len(m['jds'])} JDs to {args.out}")
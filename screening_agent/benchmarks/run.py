@@ -0,0 +1,336 @@
+# run.py
+"""
+End-to-end benchmark suite. Builds (or reuses) a synthetic corpus, starts the
+stub LLM server, points both backends at it and times:
+
+  parse      nlp_resume_parse, sequential cold/warm text cache and process pool
+  skills     taxonomy skill matching over raw resume text
+  scoring    CandidatePool packing + NumPy ranking of a large replicated pool
+  llm        sequential generate() vs async generate_many() against the stub
+  screening  JD extraction → parse every resume → rank → batched LLM scoring of the top K
+
+Results are written as JSON (one file per run) so releases can be compared:
+
+    python -m screening_agent.benchmarks.run --resumes 300 --out data/bench_results
+    python -m screening_agent.benchmarks.run --baseline data/bench_results/<old>.json
+"""
+
+import os
+import sys
+import json
+import time
+import shutil
+import platform
+import tempfile
+import subprocess
+
+from . import MODULES_DIR
+from .corpus import build_corpus
+from .stub_server import StubLLMServer
+
+ALL_BENCHES = ("parse", "skills", "scoring", "llm", "screening", "service")
+
+
+def _configure_env(stub_url: str, work_dir: str):
+    # Must run before any agent module is imported: they read these at import time.
+    os.environ.update({
+        "OLLAMA_HOST": stub_url,
+        "OPENAI_BASE_URL": f"{stub_url}/v1",
+        "OPENAI_API_KEY": os.environ.get("OPENAI_API_KEY", "stub"),
+        "LLM_CACHE_DISABLED": "1",
+        "OLLAMA_PROBE_S": "0",
+        "TEXT_CACHE_DIR": os.path.join(work_dir, "text_cache"),
+        "CANDIDATE_STORE_PATH": os.path.join(work_dir, "store.sqlite"),
+    })
+
+
+def _rate(n, seconds):
+    return round(n / seconds, 2) if seconds > 0 else None
+
+
+# ---------- individual benchmarks -------------------------------------------
+def bench_parse(files, workers):
+    import resume_scraper_nlp as nlp
+    import text_extraction
+
+    shutil.rmtree(text_extraction.TEXT_CACHE_DIR, ignore_errors=True)
+    out = {"files": len(files)}
+    for label in ("sequential_cold", "sequential_warm"):
+        t0 = time.perf_counter()
+        errors = 0
+        for f in files:
+            try:
+                nlp.nlp_resume_parse(f)
+            except Exception:
+                errors += 1
+        dt = time.perf_counter() - t0
+        out[label] = {"seconds": round(dt, 3), "files_per_sec": _rate(len(files), dt), "errors": errors}
+    shutil.rmtree(text_extraction.TEXT_CACHE_DIR, ignore_errors=True)
+    with open(os.devnull, "w") as devnull:
+        stats = nlp.batch_parse(files, out=devnull, workers=workers)
+    out["parallel_cold"] = {"seconds": stats["seconds"], "files_per_sec": stats["files_per_sec"],
+                            "workers": stats["workers"], "errors": stats["failed"]}
+    return out
+
+
+def bench_skills(files, repeats=3):
+    from skill_matcher import get_skill_matcher
+    from text_extraction import extract_text
+
+    texts = [extract_text(f) for f in files]
+    matcher = get_skill_matcher()
+    best = float("inf")
+    for _ in range(repeats):
+        t0 = time.perf_counter()
+        hits = sum(len(matcher.match(t)) for t in texts)
+        best = min(best, time.perf_counter() - t0)
+    return {"docs": len(texts), "taxonomy_size": len(matcher), "seconds": round(best, 4),
+            "docs_per_sec": _rate(len(texts), best), "hits": hits}
+
+
+def bench_scoring(truth_resumes, jd, pool_size):
+    import scoring
+
+    resumes = [truth_resumes[i % len(truth_resumes)] for i in range(pool_size)]
+    for i, r in enumerate(resumes):
+        resumes[i] = {**r, "name": f"{r['name']} #{i}",
+                      "total_years_of_experience": (i % 150) / 10}
+    t0 = time.perf_counter()
+    pool = scoring.CandidatePool.from_resumes(resumes)
+    build = time.perf_counter() - t0
+    best = float("inf")
+    for _ in range(3):
+        t0 = time.perf_counter()
+        scoring.score_pool(jd, pool)
+        best = min(best, time.perf_counter() - t0)
+    t0 = time.perf_counter()
+    index = scoring.SkillIndex(pool)
+    index_s = time.perf_counter() - t0
+    top_best, top_stats = float("inf"), {}
+    for _ in range(3):
+        t0 = time.perf_counter()
+        scoring.rank_top_k(jd, pool, 20, index=index, stats=top_stats)
+        top_best = min(top_best, time.perf_counter() - t0)
+    return {"candidates": pool_size, "pool_build_s": round(build, 3), "score_rank_s": round(best, 4),
+            "candidates_per_sec": _rate(pool_size, best),
+            "top_k": {"k": 20, "index_build_s": round(index_s, 3), "rank_s": round(top_best, 4),
+                      **top_stats}}
+
+
+def bench_llm(stub, n_prompts):
+    import local_model
+    from async_llm import run_many
+
+    prompts = [f"Summarise candidate {i} in one line." for i in range(n_prompts)]
+    before = stub.requests
+    t0 = time.perf_counter()
+    for p in prompts[: max(1, n_prompts // 5)]:
+        local_model.generate(p, use_cache=False)
+    seq_n = max(1, n_prompts // 5)
+    seq = time.perf_counter() - t0
+    t0 = time.perf_counter()
+    run_many(prompts, use_cache=False)
+    conc = time.perf_counter() - t0
+    return {"stub_latency_ms": stub.latency_ms,
+            "sequential": {"calls": seq_n, "seconds": round(seq, 3), "calls_per_sec": _rate(seq_n, seq)},
+            "generate_many": {"calls": n_prompts, "seconds": round(conc, 3),
+                              "calls_per_sec": _rate(n_prompts, conc)},
+            "stub_requests": stub.requests - before}
+
+
+def bench_screening(stub, jd_text, files, top_k, work_dir):
+    import jd_parser
+    import scoring
+    import skill_match
+    import resume_scraper_nlp as nlp
+
+    jd_parser.OUTPUT_DIR = os.path.join(work_dir, "jd_json")       # keep data/ clean
+    before = stub.requests
+    stages = {}
+    t_all = time.perf_counter()
+
+    t0 = time.perf_counter()
+    jd = jd_parser.extract_jd_requirements(jd_text)
+    stages["jd_extract_s"] = round(time.perf_counter() - t0, 3)
+
+    t0 = time.perf_counter()
+    parsed = []
+    for f in files:
+        try:
+            parsed.append(nlp.nlp_resume_parse(f))
+        except Exception:
+            pass
+    stages["parse_s"] = round(time.perf_counter() - t0, 3)
+
+    t0 = time.perf_counter()
+    ranked = scoring.rank_candidates(jd, parsed, top_k=top_k)
+    stages["rank_s"] = round(time.perf_counter() - t0, 4)
+
+    t0 = time.perf_counter()
+    shortlist = {r["candidate"]: parsed[r["index"]] for r in ranked}
+    skill_match.score_skills_batch(jd.get("required_skills", []), shortlist)
+    stages["llm_score_top_k_s"] = round(time.perf_counter() - t0, 3)
+
+    total = time.perf_counter() - t_all
+    return {"resumes": len(files), "parsed": len(parsed), "top_k": top_k, **stages,
+            "total_s": round(total, 3), "resumes_per_sec": _rate(len(files), total),
+            "llm_requests": stub.requests - before}
+
+
+def bench_service(stub, jd_json, files, concurrency, work_dir):
+    import asyncio
+    import httpx
+    sys.path.insert(0, os.path.dirname(MODULES_DIR))
+    from service import serve
+    from logging_module import Histogram
+
+    async def upload(client, base, job_id, path, hist):
+        with open(path, "rb") as f:
+            data = f.read()
+        t0 = time.perf_counter()
+        r = await client.post(f"{base}/jobs/{job_id}/resumes",
+                              params={"filename": os.path.basename(path)}, content=data)
+        hist.observe((time.perf_counter() - t0) * 1000)
+        return r.status_code
+
+    async def run():
+        ready = asyncio.Event()
+        server = asyncio.create_task(serve("127.0.0.1", 0, ready=ready,
+                                           config={"upload_dir": os.path.join(work_dir, "uploads")}))
+        await ready.wait()
+        base = f"http://127.0.0.1:{ready.port}"
+        before = stub.requests
+        limits = httpx.Limits(max_connections=concurrency)
+        async with httpx.AsyncClient(timeout=120, limits=limits) as client:
+            job_id = (await client.post(f"{base}/jobs", json={"jd": jd_json})).json()["job_id"]
+            hist = Histogram()
+            sem = asyncio.Semaphore(concurrency)
+
+            async def bounded(path):
+                async with sem:
+                    return await upload(client, base, job_id, path, hist)
+
+            t0 = time.perf_counter()
+            codes = await asyncio.gather(*(bounded(p) for p in files))
+            elapsed = time.perf_counter() - t0
+            t0 = time.perf_counter()
+            ranked = (await client.get(f"{base}/jobs/{job_id}/rank", params={"top": 10})).json()["ranked"]
+            rank_ms = (time.perf_counter() - t0) * 1000
+            stats = (await client.get(f"{base}/stats")).json()
+        server.cancel()
+        await asyncio.gather(server, return_exceptions=True)
+        return {"uploads": len(files), "concurrency": concurrency,
+                "ok": sum(c == 201 for c in codes), "total_s": round(elapsed, 3),
+                "uploads_per_sec": _rate(len(files), elapsed),
+                "p50_ms": hist.quantile(0.5), "p95_ms": hist.quantile(0.95),
+                "p99_ms": round(hist.quantile(0.99), 1), "max_ms": round(hist.max, 1),
+                "rank_ms": round(rank_ms, 1), "ranked": len(ranked),
+                "escalated": stats["escalated"], "score_batches": stats["score_batches"],
+                "llm_requests": stub.requests - before}
+
+    return asyncio.run(run())
+
+
+# ---------- results ---------------------------------------------------------
+def _meta(args):
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True,
+                                text=True, cwd=MODULES_DIR).stdout.strip() or None
+    except OSError:
+        commit = None
+    return {"timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"), "git_commit": commit,
+            "python": platform.python_version(), "platform": platform.platform(),
+            "cpu_count": os.cpu_count(), "params": vars(args)}
+
+
+def _flatten(d, prefix=""):
+    out = {}
+    for k, v in d.items():
+        key = f"{prefix}{k}"
+        if isinstance(v, dict):
+            out.update(_flatten(v, key + "."))
+        elif isinstance(v, (int, float)) and not isinstance(v, bool):
+            out[key] = v
+    return out
+
+
+def compare(current: dict, baseline: dict):
+    cur, base = _flatten(current["results"]), _flatten(baseline["results"])
+    print(f"\n{'metric':<48} {'baseline':>12} {'current':>12} {'change':>8}")
+    for key in sorted(cur.keys() & base.keys()):
+        b, c = base[key], cur[key]
+        change = f"{(c - b) / b * 100:+.1f}%" if b else "n/a"
+        print(f"{key:<48} {b:>12} {c:>12} {change:>8}")
+
+
+def main(argv=None):
+    import argparse
+
+    ap = argparse.ArgumentParser(description="Screening agent benchmark suite.")
+    ap.add_argument("--corpus", help="Existing corpus dir (default: generate a temporary one)")
+    ap.add_argument("--resumes", type=int, default=100)
+    ap.add_argument("--workers", type=int, default=None)
+    ap.add_argument("--pool-size", type=int, default=50_000, help="Candidates for the scoring bench")
+    ap.add_argument("--llm-prompts", type=int, default=50)
+    ap.add_argument("--top-k", type=int, default=20)
+    ap.add_argument("--concurrency", type=int, default=100, help="Concurrent uploads for the service bench")
+    ap.add_argument("--latency-ms", type=float, default=200.0, help="Stub LLM latency")
+    ap.add_argument("--only", default=",".join(ALL_BENCHES))
+    ap.add_argument("--out", default=os.path.join(MODULES_DIR, "../../data/bench_results"))
+    ap.add_argument("--baseline", help="Previous results JSON to compare against")
+    args = ap.parse_args(argv)
+
+    work_dir = tempfile.mkdtemp(prefix="screening_bench_")
+    stub = StubLLMServer(latency_ms=args.latency_ms, jitter_ms=args.latency_ms / 4).start()
+    _configure_env(stub.url, work_dir)
+    try:
+        corpus = args.corpus or os.path.join(work_dir, "corpus")
+        manifest_path = os.path.join(corpus, "manifest.json")
+        if not os.path.exists(manifest_path):
+            print(f"[bench] Generating {args.resumes} synthetic resumes in {corpus}")
+            build_corpus(corpus, n_resumes=args.resumes, n_jds=1)
+        with open(manifest_path, "r", encoding="utf-8") as f:
+            manifest = json.load(f)
+        files = manifest["resumes"]
+        truth = []
+        for f in files:
+            with open(os.path.splitext(f)[0] + ".truth.json", "r", encoding="utf-8") as fh:
+                truth.append(json.load(fh))
+        with open(manifest["jds"][0], "r", encoding="utf-8") as f:
+            jd_text = f.read()
+        with open(os.path.splitext(manifest["jds"][0])[0] + ".json", "r", encoding="utf-8") as f:
+            jd_json = json.load(f)
+
+        selected = set(args.only.split(","))
+        results = {}
+        runners = {
+            "parse": lambda: bench_parse(files, args.workers),
+            "skills": lambda: bench_skills(files),
+            "scoring": lambda: bench_scoring(truth, jd_json, args.pool_size),
+            "llm": lambda: bench_llm(stub, args.llm_prompts),
+            "screening": lambda: bench_screening(stub, jd_text, files, args.top_k, work_dir),
+            "service": lambda: bench_service(stub, jd_json, files, args.concurrency, work_dir),
+        }
+        for name in ALL_BENCHES:
+            if name in selected:
+                print(f"[bench] {name} …", file=sys.stderr)
+                results[name] = runners[name]()
+    finally:
+        stub.stop()
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+    report = {"meta": _meta(args), "results": results}
+    os.makedirs(args.out, exist_ok=True)
+    out_path = os.path.join(args.out, f"bench_{time.strftime('%Y%m%d_%H%M%S')}.json")
+    with open(out_path, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+    print(json.dumps(results, indent=2))
+    print(f"[bench] Results written to {out_path}")
+    if args.baseline:
+        with open(args.baseline, "r", encoding="utf-8") as f:
+            compare(report, json.load(f))
+    return report
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,178 @@
+# stub_server.py
+"""
+Local stand-in for Ollama (/api/generate, /api/tags) and the OpenAI chat API
+(/v1/chat/completions) with configurable latency and error rate.
+
+Responses are structurally valid for each prompt the agent sends (JD extraction,
+resume extraction, single and batched skill scoring), built from the prompt text
+with the skill taxonomy, so the full pipeline runs end to end without a model.
+Point the agent at it with OLLAMA_HOST=http://127.0.0.1:<port> and
+OPENAI_BASE_URL=http://127.0.0.1:<port>/v1 (any OPENAI_API_KEY).
+"""
+
+import re
+import json
+import time
+import random
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from . import MODULES_DIR  # noqa: F401  (puts the modules folder on sys.path)
+
+EMAIL_RE = re.compile(r"[\w\.-]+@[\w\.-]+")
+YEARS_RE = re.compile(r"(\d+)\s*-\s*(\d+)\s*years")
+
+
+def _quoted_block(prompt: str) -> str:
+    parts = prompt.split('"""')
+    return parts[-2] if len(parts) >= 3 else prompt
+
+
+def _required_skills(prompt: str) -> list:
+    body = prompt.split("Job required skills:", 1)[-1].split("\n\n", 1)[0]
+    return [l[2:].strip() for l in body.splitlines() if l.startswith("- ")]
+
+
+def fake_response(prompt: str) -> str:
+    from skill_matcher import get_skill_matcher
+    matcher = get_skill_matcher()
+    if "from the following job description" in prompt:
+        text = _quoted_block(prompt)
+        skills = matcher.find_skills(text)
+        m = YEARS_RE.search(text)
+        return json.dumps({
+            "required_skills": skills[:8], "preferred_skills": skills[8:],
+            "min_experience_years": int(m.group(1)) if m else 0,
+            "max_experience_years": int(m.group(2)) if m else "",
+            "required_qualifications": ["BE/BTech in Computer Science"],
+            "domain": "Software Development", "soft_skills": ["communication"], "other_notes": [],
+        })
+    if "candidate resume" in prompt:
+        text = _quoted_block(prompt)
+        lines = [l.strip() for l in text.splitlines() if l.strip()]
+        email = EMAIL_RE.search(text)
+        return json.dumps({
+            "name": lines[0].title() if lines else None,
+            "email": email.group(0) if email else None, "phone": None,
+            "skills": matcher.find_skills(text), "past_roles": [], "education": [],
+            "certifications": [], "projects": [], "soft_skills": [], "other_notes": [],
+        })
+    if "Candidates (each block" in prompt:
+        skills = _required_skills(prompt)
+        keys = re.findall(r"^\[(C\d+)\]", prompt, flags=re.M)
+        return json.dumps({k: {s: {"score": 5, "reason": "Stub score."} for s in skills} for k in keys})
+    if "Job required skills" in prompt:
+        return json.dumps({s: {"score": 5, "reason": "Stub score."} for s in _required_skills(prompt)})
+    return "OK"
+
+
+class _Server(ThreadingHTTPServer):
+    # The default listen backlog (5) drops connections once a benchmark fans out past it.
+    request_queue_size = 128
+    daemon_threads = True
+
+
+class StubLLMServer:
+    def __init__(self, host: str = "127.0.0.1", port: int = 0, latency_ms: float = 200.0,
+                 jitter_ms: float = 50.0, error_rate: float = 0.0, seed: int = 0):
+        self.latency_ms, self.jitter_ms, self.error_rate = latency_ms, jitter_ms, error_rate
+        self.requests = 0
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        self.httpd = _Server((host, port), self._handler())
+        self._thread = None
+
+    @property
+    def url(self) -> str:
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def _delay_and_fail(self) -> bool:
+        with self._lock:
+            self.requests += 1
+            delay = max(0.0, self.latency_ms + self._rng.uniform(-self.jitter_ms, self.jitter_ms))
+            fail = self._rng.random() < self.error_rate
+        time.sleep(delay / 1000)
+        return fail
+
+    def _handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, *args):
+                pass
+
+            def _send(self, status, payload):
+                body = json.dumps(payload).encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def do_GET(self):
+                if self.path.startswith("/api/tags"):
+                    self._send(200, {"models": [{"name": "stub"}]})
+                else:
+                    self._send(404, {"error": "not found"})
+
+            def do_POST(self):
+                length = int(self.headers.get("Content-Length", 0))
+                req = json.loads(self.rfile.read(length) or b"{}")
+                if server._delay_and_fail():
+                    self._send(503, {"error": "stub overloaded"})
+                    return
+                if self.path.startswith("/api/generate"):
+                    prompt = req.get("prompt", "")
+                    self._send(200, {"model": req.get("model"), "response": fake_response(prompt),
+                                     "done": True, "prompt_eval_count": len(prompt) // 4})
+                elif self.path.endswith("/chat/completions"):
+                    prompt = "\n".join(m.get("content", "") for m in req.get("messages", [])
+                                       if m.get("role") == "user")
+                    content = fake_response(prompt)
+                    self._send(200, {
+                        "id": "chatcmpl-stub", "object": "chat.completion", "created": int(time.time()),
+                        "model": req.get("model", "stub"),
+                        "choices": [{"index": 0, "finish_reason": "stop",
+                                     "message": {"role": "assistant", "content": content}}],
+                        "usage": {"prompt_tokens": len(prompt) // 4, "completion_tokens": len(content) // 4,
+                                  "total_tokens": (len(prompt) + len(content)) // 4},
+                    })
+                else:
+                    self._send(404, {"error": "not found"})
+
+        return Handler
+
+    def start(self):
+        self._thread = threading.Thread(target=self.httpd.serve_forever, daemon=True,
+                                        name="stub-llm-server")
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+
+if __name__ == "__main__":
+    import argparse
+
+    ap = argparse.ArgumentParser(description="Stub Ollama/OpenAI server for local benchmarks.")
+    ap.add_argument("--port", type=int, default=8765)
+    ap.add_argument("--latency-ms", type=float, default=200.0)
+    ap.add_argument("--jitter-ms", type=float, default=50.0)
+    ap.add_argument("--error-rate", type=float, default=0.0)
+    args = ap.parse_args()
+    srv = StubLLMServer(port=args.port, latency_ms=args.latency_ms, jitter_ms=args.jitter_ms,
+                        error_rate=args.error_rate)
+    print(f"[stub_server] Listening on {srv.url} (OLLAMA_HOST={srv.url}, OPENAI_BASE_URL={srv.url}/v1)")
+    try:
+        srv.httpd.serve_forever()
+    except KeyboardInterrupt:
+        srv.stop()
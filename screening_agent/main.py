@@ -0,0 +1,86 @@
+# main.py
+"""
+End-to-end screening from the command line:
+
+    python screening_agent/main.py --jd data/job_descriptions/DY_FS.txt --resumes data/resumes --top 10
+    python screening_agent/main.py --jd-json data/JD_JSON_Extracted/<job_id>.json --resumes "data/resumes/*.pdf" --no-llm-score
+"""
+
+import os
+import sys
+import json
+import argparse
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from pipeline import ScreeningPipeline, iter_resume_paths, rankable  # noqa: E402  (also puts modules/ on sys.path)
+from config_loader import get_section                       # noqa: E402
+import logging_module as metrics                            # noqa: E402
+
+
+def load_jd(args, store) -> dict:
+    if args.jd_json:
+        with open(args.jd_json, "r", encoding="utf-8") as f:
+            return json.load(f)
+    from jd_parser import parse_jd_from_file
+    return parse_jd_from_file(args.jd, store=store)
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Screen a folder of resumes against a job description.")
+    src = ap.add_mutually_exclusive_group(required=True)
+    src.add_argument("--jd", help="Job description text file (parsed with jd_parser)")
+    src.add_argument("--jd-json", help="Already-extracted JD JSON")
+    ap.add_argument("--resumes", required=True, help="Resume file, directory or glob pattern")
+    ap.add_argument("--top", type=int, default=None, help="Shortlist size (default: pipeline.shortlist_k)")
+    ap.add_argument("--no-llm-score", action="store_true", help="Skip LLM skill scoring of the shortlist")
+    ap.add_argument("--escalate-below", type=float, default=None, help="Override pipeline.escalate_below")
+    ap.add_argument("--parse-workers", type=int, default=None, help="Override pipeline.parse_workers")
+    ap.add_argument("--out", default=None, help="Write the full result JSON here")
+    ap.add_argument("--no-store", action="store_true",
+                    help="Don't reuse stored parses or persist the JD, parses and scores")
+    args = ap.parse_args(argv)
+
+    overrides = {k: v for k, v in (("escalate_below", args.escalate_below),
+                                    ("parse_workers", args.parse_workers)) if v is not None}
+    paths = iter_resume_paths(args.resumes)
+    if not paths:
+        print(f"[Main] No resumes found for {args.resumes}", file=sys.stderr)
+        return 1
+
+    store = None
+    if not args.no_store:
+        from candidate_store import get_store
+        store = get_store()
+    jd = load_jd(args, store)
+    with metrics.run(jd.get("JOB_ID")):
+        result = ScreeningPipeline(overrides, store=store).run(jd, paths, top_k=args.top,
+                                                               llm_score=not args.no_llm_score)
+
+    if store is not None:
+        # Only what was ranked: dropped duplicates would come back in a re-rank (rescoring.py).
+        ranked_pool = rankable(result["candidates"], {**get_section("pipeline"), **overrides})
+        job_id = store.put_job(jd, result["job_id"])
+        store.put_candidates(job_id, [(cid, r["parsed"], r.get("doc_hash")) for cid, r in ranked_pool])
+        store.put_scores(job_id, result["ranked"])
+        # Per-requirement columns so a later JD / weights edit re-ranks incrementally (rescoring.py).
+        from rescoring import snapshot
+        snapshot(store, job_id, jd, [(cid, r["parsed"]) for cid, r in ranked_pool], result["ranked"])
+        print(f"[Main] Stored JD, {len(ranked_pool)} candidates and scores in {store.path}")
+
+    stats = result["stats"]
+    print(f"[Main] {stats['resumes']} resumes in {stats['total_s']}s | tiers {stats['tiers']} | "
+          f"escalation rate {stats['escalation_rate']:.1%} | reused {stats['reused']} | "
+          f"duplicates {stats['duplicates']}")
+    for rank, r in enumerate(result["ranked"], start=1):
+        missing = ", ".join(r["missing_required"]) or "-"
+        print(f"{rank:>3}. {r['candidate']:<30} {r['score']:.3f}  [{r['tier']}]  missing: {missing}")
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            json.dump(result, f, indent=2, default=str)
+        print(f"[Main] Full result written to {args.out}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
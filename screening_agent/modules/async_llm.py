@@ -0,0 +1,149 @@
+# async_llm.py
+"""
+Shared plumbing for the async LLM path: one pooled HTTP client per event loop,
+a global max-in-flight limit and per-backend RPM/TPM rate limiters.
+
+local_model.agenerate / openai_model.agenerate do the actual calls;
+generate_many() fans a list of prompts out over them and keeps input order.
+"""
+
+import os
+import time
+import asyncio
+
+MAX_IN_FLIGHT = int(os.getenv("LLM_MAX_IN_FLIGHT", "16"))
+# 0 = unlimited
+RATE_LIMITS = {
+    "ollama": (int(os.getenv("OLLAMA_RPM", "0")), int(os.getenv("OLLAMA_TPM", "0"))),
+    "openai": (int(os.getenv("OPENAI_RPM", "500")), int(os.getenv("OPENAI_TPM", "200000"))),
+}
+
+
+def estimate_tokens(text: str | None) -> int:
+    # ~4 characters per token is close enough for budgeting
+    return len(text) // 4 + 1 if text else 0
+
+
+class RateLimiter:
+    """Token-bucket limiter on requests/minute and tokens/minute."""
+
+    def __init__(self, rpm: int = 0, tpm: int = 0):
+        self.rpm, self.tpm = rpm, tpm
+        self._req = float(rpm)
+        self._tok = float(tpm)
+        self._stamp = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    def _refill(self):
+        now = time.monotonic()
+        elapsed, self._stamp = now - self._stamp, now
+        if self.rpm:
+            self._req = min(self.rpm, self._req + elapsed * self.rpm / 60)
+        if self.tpm:
+            self._tok = min(self.tpm, self._tok + elapsed * self.tpm / 60)
+
+    async def acquire(self, tokens: int = 0):
+        if not self.rpm and not self.tpm:
+            return
+        if self.tpm:
+            tokens = min(tokens, self.tpm)      # a single oversized request still goes through
+        async with self._lock:
+            while True:
+                self._refill()
+                wait = 0.0
+                if self.rpm and self._req < 1:
+                    wait = max(wait, (1 - self._req) * 60 / self.rpm)
+                if self.tpm and self._tok < tokens:
+                    wait = max(wait, (tokens - self._tok) * 60 / self.tpm)
+                if wait <= 0:
+                    break
+                await asyncio.sleep(wait)
+            if self.rpm:
+                self._req -= 1
+            if self.tpm:
+                self._tok -= tokens
+
+
+class _LoopState:
+    # asyncio primitives and httpx connections belong to one event loop
+    def __init__(self):
+        import httpx
+        self.semaphore = asyncio.Semaphore(MAX_IN_FLIGHT)
+        self.limiters = {name: RateLimiter(*limits) for name, limits in RATE_LIMITS.items()}
+        self.http = httpx.AsyncClient(
+            limits=httpx.Limits(max_connections=MAX_IN_FLIGHT,
+                                max_keepalive_connections=MAX_IN_FLIGHT),
+            timeout=httpx.Timeout(60.0, connect=5.0),
+        )
+        self.openai = None
+
+
+_states: dict = {}
+
+def _state() -> _LoopState:
+    loop = asyncio.get_running_loop()
+    state = _states.get(loop)
+    if state is None:
+        state = _states[loop] = _LoopState()
+    return state
+
+
+def http_client():
+    """Pooled httpx.AsyncClient shared by every async backend call on this loop."""
+    return _state().http
+
+
+def openai_client():
+    """AsyncOpenAI client for this loop, sending its requests over the shared pool."""
+    state = _state()
+    if state.openai is None:
+        from dotenv import load_dotenv
+        from openai import AsyncOpenAI
+        load_dotenv()
+        state.openai = AsyncOpenAI(http_client=state.http)
+    return state.openai
+
+
+async def run_limited(backend: str, tokens: int, call):
+    """Await call() once a global in-flight slot and the backend's rate budget allow it."""
+    state = _state()
+    async with state.semaphore:
+        await state.limiters[backend].acquire(tokens)
+        return await call()
+
+
+async def aclose():
+    state = _states.pop(asyncio.get_running_loop(), None)
+    if state is not None:
+        await state.http.aclose()            # also the transport of state.openai
+
+
+async def generate_many(prompts: list[str],
+                        system: str | None = None,
+                        max_tokens: int = 1000,
+                        temperature: float = 0.4,
+                        backend: str = "local",
+                        return_exceptions: bool = False,
+                        use_cache: bool = True) -> list:
+    """
+    Run every prompt concurrently (bounded by LLM_MAX_IN_FLIGHT and the rate limits)
+    and return the responses in the same order as `prompts`.
+    backend="local" tries Ollama with GPT fallback, "openai" goes straight to GPT.
+    """
+    if backend == "openai":
+        from openai_model import agenerate
+    else:
+        from local_model import agenerate
+    tasks = [agenerate(p, system, max_tokens=max_tokens, temperature=temperature,
+                       use_cache=use_cache) for p in prompts]
+    return await asyncio.gather(*tasks, return_exceptions=return_exceptions)
+
+
+def run_many(prompts: list[str], **kwargs) -> list:
+    """Blocking wrapper around generate_many for scripts and the CLI."""
+    async def _main():
+        try:
+            return await generate_many(prompts, **kwargs)
+        finally:
+            await aclose()
+    return asyncio.run(_main())
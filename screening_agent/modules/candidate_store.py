@@ -0,0 +1,530 @@
+# candidate_store.py
+"""
+Single-file SQLite store for JDs, parsed candidates and scores.
+
+Replaces the one-pretty-printed-file-per-candidate layout under data/Resume_Parsing
+and data/JD_JSON_Extracted. Candidates are keyed by (job_id, candidate_id), so two
+people with the same name no longer overwrite each other. Skills are normalised
+with skill_matcher.skill_key into an indexed side table, which lets queries like
+"job X, skill Y, ≥5 years" run on indexes instead of loading every file:
+
+    python candidate_store.py migrate                      # import the old JSON folders
+    python candidate_store.py query --job <id> --skill python --min-years 5
+    python candidate_store.py bench --n 100000
+"""
+
+import os
+import json
+import time
+import sqlite3
+import hashlib
+import threading
+
+from skill_matcher import skill_key
+from dedup import bands, hamming, to_signed, to_unsigned, NEAR_DUP_BITS
+
+BASE_DIR       = os.path.dirname(__file__)
+STORE_PATH     = os.getenv("CANDIDATE_STORE_PATH", os.path.join(BASE_DIR, "../../data/store/screening.sqlite"))
+RESUME_JSON_DIR = os.path.join(BASE_DIR, "../../data/Resume_Parsing")
+JD_JSON_DIR    = os.path.join(BASE_DIR, "../../data/JD_JSON_Extracted")
+EXPORT_JSON    = os.getenv("EXPORT_PARSED_JSON", "0") == "1"    # also write the legacy per-file JSON
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    job_id      TEXT PRIMARY KEY,
+    data        TEXT NOT NULL,
+    updated_at  REAL
+);
+CREATE TABLE IF NOT EXISTS candidates (
+    id            INTEGER PRIMARY KEY,
+    job_id        TEXT NOT NULL,
+    candidate_id  TEXT NOT NULL,
+    name          TEXT,
+    email         TEXT,
+    total_years   REAL,
+    data          TEXT NOT NULL,
+    updated_at    REAL,
+    UNIQUE (job_id, candidate_id)
+);
+CREATE INDEX IF NOT EXISTS idx_candidates_job_years ON candidates(job_id, total_years);
+CREATE TABLE IF NOT EXISTS candidate_skills (
+    skill      TEXT NOT NULL,
+    candidate  INTEGER NOT NULL REFERENCES candidates(id) ON DELETE CASCADE,
+    PRIMARY KEY (skill, candidate)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS idx_candidate_skills_candidate ON candidate_skills(candidate);
+CREATE TABLE IF NOT EXISTS scores (
+    job_id        TEXT NOT NULL,
+    candidate_id  TEXT NOT NULL,
+    score         REAL,
+    details       TEXT,
+    updated_at    REAL,
+    PRIMARY KEY (job_id, candidate_id)
+);
+CREATE INDEX IF NOT EXISTS idx_scores_job_score ON scores(job_id, score DESC);
+CREATE TABLE IF NOT EXISTS documents (
+    doc_hash    TEXT PRIMARY KEY,
+    simhash     INTEGER NOT NULL,
+    parsed      TEXT,
+    tier        TEXT,
+    updated_at  REAL
+);
+CREATE TABLE IF NOT EXISTS document_files (
+    file_hash   TEXT PRIMARY KEY,
+    doc_hash    TEXT NOT NULL REFERENCES documents(doc_hash) ON DELETE CASCADE
+);
+CREATE TABLE IF NOT EXISTS score_state (
+    job_id      TEXT PRIMARY KEY,
+    meta        TEXT NOT NULL,
+    columns     BLOB NOT NULL,
+    updated_at  REAL
+);
+CREATE TABLE IF NOT EXISTS llm_skill_scores (
+    job_id        TEXT NOT NULL,
+    candidate_id  TEXT NOT NULL,
+    skill         TEXT NOT NULL,
+    score         REAL,
+    reason        TEXT,
+    updated_at    REAL,
+    PRIMARY KEY (job_id, candidate_id, skill)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS document_bands (
+    band      INTEGER NOT NULL,
+    value     INTEGER NOT NULL,
+    doc_hash  TEXT NOT NULL REFERENCES documents(doc_hash) ON DELETE CASCADE,
+    PRIMARY KEY (band, value, doc_hash)
+) WITHOUT ROWID;
+"""
+# Columns added after the first release; created on open for older store files.
+LATE_COLUMNS = {"candidates": [("doc_hash", "TEXT")]}
+TIER_RANK = {"nlp": 1, "llm": 2}    # a document's stored parse is never downgraded
+
+
+def _dumps(data) -> str:
+    return json.dumps(data, ensure_ascii=False, separators=(",", ":"), default=str)
+
+
+def candidate_key(resume: dict) -> str:
+    """Stable id when the caller has none: email, else name, else a content hash."""
+    for field in ("email", "name"):
+        value = (resume.get(field) or "").strip().lower()
+        if value:
+            return value
+    return hashlib.sha1(_dumps(resume).encode("utf-8")).hexdigest()[:16]
+
+
+def _years(resume: dict):
+    years = resume.get("total_years_of_experience")
+    try:
+        return float(years) if years not in (None, "") else None
+    except (TypeError, ValueError):
+        return None
+
+
+class CandidateStore:
+    def __init__(self, path: str = STORE_PATH):
+        self.path = path
+        self._lock = threading.Lock()
+        if path != ":memory:":
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._db = sqlite3.connect(path, timeout=30, check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.execute("PRAGMA foreign_keys=ON")
+        self._db.executescript(SCHEMA)
+        for table, columns in LATE_COLUMNS.items():
+            have = {row[1] for row in self._db.execute(f"PRAGMA table_info({table})")}
+            for name, decl in columns:
+                if name not in have:
+                    self._db.execute(f"ALTER TABLE {table} ADD COLUMN {name} {decl}")
+        self._db.execute("CREATE INDEX IF NOT EXISTS idx_candidates_doc ON candidates(doc_hash)")
+        self._db.commit()
+
+    # ---------- jobs --------------------------------------------------------
+    def put_job(self, jd: dict, job_id: str | None = None) -> str:
+        job_id = job_id or jd["JOB_ID"]
+        with self._lock, self._db:
+            self._db.execute(
+                "INSERT INTO jobs VALUES (?, ?, ?) ON CONFLICT(job_id) DO UPDATE SET "
+                "data = excluded.data, updated_at = excluded.updated_at",
+                (job_id, _dumps(jd), time.time()))
+        return job_id
+
+    def get_job(self, job_id: str) -> dict | None:
+        with self._lock:
+            row = self._db.execute("SELECT data FROM jobs WHERE job_id = ?", (job_id,)).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def jobs(self) -> list:
+        with self._lock:
+            return [r[0] for r in self._db.execute("SELECT job_id FROM jobs ORDER BY updated_at")]
+
+    # ---------- candidates --------------------------------------------------
+    def put_candidates(self, job_id: str, items) -> int:
+        """
+        Bulk upsert [(candidate_id | None, resume_dict[, doc_hash]), …] for one job in a
+        single transaction. Re-putting a candidate replaces its data and skills.
+        """
+        now = time.time()
+        rows, skills = [], {}
+        for cid, resume, *doc in items:
+            cid = cid or candidate_key(resume)
+            rows.append((job_id, cid, resume.get("name"), resume.get("email"), _years(resume),
+                         _dumps(resume), now, doc[0] if doc else None))
+            skills[cid] = {skill_key(s) for s in resume.get("skills") or [] if isinstance(s, str) and s.strip()}
+        if not rows:
+            return 0
+        with self._lock, self._db:
+            self._db.executemany(
+                "INSERT INTO candidates (job_id, candidate_id, name, email, total_years, data, updated_at, "
+                "doc_hash) VALUES (?, ?, ?, ?, ?, ?, ?, ?) ON CONFLICT(job_id, candidate_id) DO UPDATE SET "
+                "name = excluded.name, email = excluded.email, total_years = excluded.total_years, "
+                "data = excluded.data, updated_at = excluded.updated_at, "
+                "doc_hash = COALESCE(excluded.doc_hash, candidates.doc_hash)", rows)
+            ids = self._ids(job_id, list(skills))
+            self._db.executemany("DELETE FROM candidate_skills WHERE candidate = ?",
+                                 [(i,) for i in ids.values()])
+            self._db.executemany("INSERT OR IGNORE INTO candidate_skills VALUES (?, ?)",
+                                 [(s, ids[cid]) for cid, keys in skills.items() for s in keys])
+        return len(rows)
+
+    def _ids(self, job_id: str, candidate_ids: list) -> dict:
+        out = {}
+        for i in range(0, len(candidate_ids), 500):          # stay under SQLite's variable limit
+            chunk = candidate_ids[i:i + 500]
+            marks = ",".join("?" * len(chunk))
+            out.update(self._db.execute(
+                f"SELECT candidate_id, id FROM candidates WHERE job_id = ? AND candidate_id IN ({marks})",
+                (job_id, *chunk)).fetchall())
+        return out
+
+    def put_candidate(self, job_id: str, candidate_id: str | None, resume: dict) -> str:
+        candidate_id = candidate_id or candidate_key(resume)
+        self.put_candidates(job_id, [(candidate_id, resume)])
+        return candidate_id
+
+    def get_candidate(self, job_id: str, candidate_id: str) -> dict | None:
+        with self._lock:
+            row = self._db.execute("SELECT data FROM candidates WHERE job_id = ? AND candidate_id = ?",
+                                   (job_id, candidate_id)).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def load_candidates(self, job_id: str) -> list:
+        """[(candidate_id, resume_dict), …] for a job, in insertion order."""
+        with self._lock:
+            rows = self._db.execute("SELECT candidate_id, data FROM candidates WHERE job_id = ? ORDER BY id",
+                                    (job_id,)).fetchall()
+        return [(cid, json.loads(data)) for cid, data in rows]
+
+    def candidate_count(self, job_id: str) -> int:
+        with self._lock:
+            return self._db.execute("SELECT COUNT(*) FROM candidates WHERE job_id = ?", (job_id,)).fetchone()[0]
+
+    def iter_candidates(self, job_id: str, chunk: int = 1000):
+        """Yield (candidate_id, resume_dict) in insertion order, decoding a chunk at a time."""
+        last = 0
+        while True:
+            with self._lock:
+                rows = self._db.execute("SELECT id, candidate_id, data FROM candidates WHERE job_id = ? AND id > ? "
+                                        "ORDER BY id LIMIT ?", (job_id, last, chunk)).fetchall()
+            if not rows:
+                return
+            last = rows[-1][0]
+            for _, cid, data in rows:
+                yield cid, json.loads(data)
+
+    def load_table(self, job_id: str):
+        """A job's candidates as a compact candidate_table.CandidateTable (no list of dicts in between)."""
+        from candidate_table import CandidateTable
+        return CandidateTable.from_items(self.iter_candidates(job_id))
+
+    def find_candidates(self, job_id: str | None = None, skills=(), min_years: float | None = None,
+                        max_years: float | None = None, limit: int | None = None,
+                        with_data: bool = False) -> list:
+        """Candidates having every skill in `skills` (any spelling the taxonomy knows) and the year range."""
+        where, params = [], []
+        if job_id is not None:
+            where.append("c.job_id = ?")
+            params.append(job_id)
+        if min_years is not None:
+            where.append("c.total_years >= ?")
+            params.append(min_years)
+        if max_years is not None:
+            where.append("c.total_years <= ?")
+            params.append(max_years)
+        for skill in skills:
+            where.append("c.id IN (SELECT candidate FROM candidate_skills WHERE skill = ?)")
+            params.append(skill_key(skill))
+        cols = "c.job_id, c.candidate_id, c.name, c.email, c.total_years" + (", c.data" if with_data else "")
+        sql = f"SELECT {cols} FROM candidates c"
+        if where:
+            sql += " WHERE " + " AND ".join(where)
+        sql += " ORDER BY c.total_years DESC"
+        if limit:
+            sql += f" LIMIT {int(limit)}"
+        with self._lock:
+            rows = self._db.execute(sql, params).fetchall()
+        keys = ("job_id", "candidate_id", "name", "email", "total_years") + (("data",) if with_data else ())
+        out = [dict(zip(keys, r)) for r in rows]
+        if with_data:
+            for r in out:
+                r["data"] = json.loads(r["data"])
+        return out
+
+    # ---------- scores ------------------------------------------------------
+    def put_scores(self, job_id: str, ranked: list) -> int:
+        """Upsert rank_candidates()-style rows ({"candidate", "score", …}) in one transaction."""
+        now = time.time()
+        rows = [(job_id, r["candidate"], r["score"],
+                 _dumps({k: v for k, v in r.items() if k not in ("candidate", "score", "index")}), now)
+                for r in ranked]
+        with self._lock, self._db:
+            self._db.executemany(
+                "INSERT INTO scores VALUES (?, ?, ?, ?, ?) ON CONFLICT(job_id, candidate_id) DO UPDATE SET "
+                "score = excluded.score, details = excluded.details, updated_at = excluded.updated_at", rows)
+        return len(rows)
+
+    def top_scores(self, job_id: str, k: int = 10) -> list:
+        with self._lock:
+            rows = self._db.execute(
+                "SELECT candidate_id, score, details FROM scores WHERE job_id = ? ORDER BY score DESC LIMIT ?",
+                (job_id, k)).fetchall()
+        return [{"candidate": cid, "score": score, **json.loads(details or "{}")} for cid, score, details in rows]
+
+    # ---------- incremental re-scoring (rescoring.py) ----------------------
+    def put_score_state(self, job_id: str, meta: dict, columns: bytes):
+        """Per-candidate, per-requirement score columns of a job's last full scoring."""
+        with self._lock, self._db:
+            self._db.execute("INSERT OR REPLACE INTO score_state VALUES (?, ?, ?, ?)",
+                             (job_id, _dumps(meta), sqlite3.Binary(columns), time.time()))
+
+    def get_score_state(self, job_id: str) -> tuple | None:
+        """(meta, columns) or None."""
+        with self._lock:
+            row = self._db.execute("SELECT meta, columns FROM score_state WHERE job_id = ?", (job_id,)).fetchone()
+        return (json.loads(row[0]), bytes(row[1])) if row else None
+
+    def put_llm_skill_scores(self, job_id: str, scores: dict) -> int:
+        """Upsert {candidate_id: {skill: {"score", "reason"}}}; skills are stored by skill_key."""
+        now = time.time()
+        rows = [(job_id, cid, skill_key(skill), entry.get("score"), entry.get("reason"), now)
+                for cid, per_skill in scores.items() if isinstance(per_skill, dict) and "error" not in per_skill
+                for skill, entry in per_skill.items() if isinstance(entry, dict)]
+        with self._lock, self._db:
+            self._db.executemany("INSERT OR REPLACE INTO llm_skill_scores VALUES (?, ?, ?, ?, ?, ?)", rows)
+        return len(rows)
+
+    def llm_skill_scores(self, job_id: str, candidate_ids) -> dict:
+        """{candidate_id: {skill_key: {"score", "reason"}}} for the given candidates."""
+        out = {}
+        ids = list(candidate_ids)
+        with self._lock:
+            for i in range(0, len(ids), 500):
+                part = ids[i:i + 500]
+                for cid, skill, score, reason in self._db.execute(
+                        f"SELECT candidate_id, skill, score, reason FROM llm_skill_scores "
+                        f"WHERE job_id = ? AND candidate_id IN ({','.join('?' * len(part))})", (job_id, *part)):
+                    out.setdefault(cid, {})[skill] = {"score": score, "reason": reason}
+        return out
+
+    def candidate_versions(self, job_id: str) -> dict:
+        """{candidate_id: [row id, updated_at]}; changes whenever a candidate is re-put or deleted and re-added."""
+        with self._lock:
+            return {cid: [rid, ts] for cid, rid, ts in self._db.execute(
+                "SELECT candidate_id, id, updated_at FROM candidates WHERE job_id = ?", (job_id,))}
+
+    def get_candidates(self, job_id: str, candidate_ids) -> list:
+        """[(candidate_id, resume_dict), …] of the given candidates, in insertion order."""
+        ids, rows = list(candidate_ids), []
+        with self._lock:
+            for i in range(0, len(ids), 500):
+                part = ids[i:i + 500]
+                rows += self._db.execute(
+                    f"SELECT id, candidate_id, data FROM candidates "
+                    f"WHERE job_id = ? AND candidate_id IN ({','.join('?' * len(part))})", (job_id, *part)).fetchall()
+        return [(cid, json.loads(data)) for _, cid, data in sorted(rows)]
+
+    def skill_members(self, job_id: str, skills) -> dict:
+        """{skill_key: {candidate_id, …}} of a job's candidates listing each skill (via the skill index)."""
+        out = {}
+        with self._lock:
+            for key in {skill_key(s) for s in skills}:
+                out[key] = {r[0] for r in self._db.execute(
+                    "SELECT c.candidate_id FROM candidate_skills s JOIN candidates c ON c.id = s.candidate "
+                    "WHERE s.skill = ? AND c.job_id = ?", (key, job_id))}
+        return out
+
+    # ---------- documents (parse once, reuse across jobs) -------------------
+    def doc_for_file(self, file_hash: str) -> str | None:
+        with self._lock:
+            row = self._db.execute("SELECT doc_hash FROM document_files WHERE file_hash = ?",
+                                   (file_hash,)).fetchone()
+        return row[0] if row else None
+
+    def get_document(self, doc_hash: str) -> dict | None:
+        with self._lock:
+            row = self._db.execute("SELECT simhash, parsed, tier FROM documents WHERE doc_hash = ?",
+                                   (doc_hash,)).fetchone()
+        if row is None:
+            return None
+        return {"doc_hash": doc_hash, "simhash": to_unsigned(row[0]),
+                "parsed": json.loads(row[1]) if row[1] else None, "tier": row[2]}
+
+    def put_document(self, fingerprint: dict, parsed: dict | None = None, tier: str | None = None):
+        """
+        Register a document ({"doc_hash", "simhash"[, "file_hash"]}) and, optionally, its parse.
+        A stored parse is only replaced by one of the same or a better tier (nlp < llm).
+        """
+        doc_hash, now = fingerprint["doc_hash"], time.time()
+        parsed = {k: v for k, v in (parsed or {}).items() if k != "JOB_ID"} or None
+        with self._lock, self._db:
+            row = self._db.execute("SELECT tier FROM documents WHERE doc_hash = ?", (doc_hash,)).fetchone()
+            if row is None:
+                self._db.execute("INSERT INTO documents VALUES (?, ?, ?, ?, ?)",
+                                 (doc_hash, to_signed(fingerprint["simhash"]),
+                                  _dumps(parsed) if parsed else None, tier, now))
+                self._db.executemany("INSERT OR IGNORE INTO document_bands VALUES (?, ?, ?)",
+                                     [(b, v, doc_hash) for b, v in bands(fingerprint["simhash"])])
+            elif parsed and TIER_RANK.get(tier, 0) >= TIER_RANK.get(row[0], 0):
+                self._db.execute("UPDATE documents SET parsed = ?, tier = ?, updated_at = ? WHERE doc_hash = ?",
+                                 (_dumps(parsed), tier, now, doc_hash))
+            if fingerprint.get("file_hash"):
+                self._db.execute("INSERT OR REPLACE INTO document_files VALUES (?, ?)",
+                                 (fingerprint["file_hash"], doc_hash))
+
+    def near_duplicates(self, simhash: int, max_bits: int = NEAR_DUP_BITS, exclude: str | None = None) -> list:
+        """[(doc_hash, distance), …] of stored documents within max_bits of `simhash`, closest first."""
+        clauses = " OR ".join("(band = ? AND value = ?)" for _ in bands(simhash))
+        params = [x for bv in bands(simhash) for x in bv]
+        with self._lock:
+            rows = self._db.execute(
+                f"SELECT DISTINCT d.doc_hash, d.simhash FROM document_bands b JOIN documents d "
+                f"ON d.doc_hash = b.doc_hash WHERE {clauses}", params).fetchall()
+        hits = [(h, hamming(simhash, to_unsigned(s))) for h, s in rows if h != exclude]
+        return sorted((h for h in hits if h[1] <= max_bits), key=lambda h: h[1])
+
+    def jobs_for_document(self, doc_hash: str) -> list:
+        with self._lock:
+            return [r[0] for r in self._db.execute(
+                "SELECT DISTINCT job_id FROM candidates WHERE doc_hash = ?", (doc_hash,))]
+
+    def summary(self) -> dict:
+        with self._lock:
+            counts = {t: self._db.execute(f"SELECT COUNT(*) FROM {t}").fetchone()[0]
+                      for t in ("jobs", "candidates", "candidate_skills", "scores", "documents")}
+        size = os.path.getsize(self.path) if os.path.exists(self.path) else 0
+        return {**counts, "bytes": size, "path": self.path}
+
+    def close(self):
+        with self._lock:
+            self._db.close()
+
+
+_store = None
+SHARED = object()          # `store=` default of the parsers: the process-wide store below
+
+def get_store() -> CandidateStore:
+    global _store
+    if _store is None:
+        _store = CandidateStore()
+    return _store
+
+
+def resolve_store(store) -> "CandidateStore | None":
+    """A `store=` argument: SHARED → get_store(), None → don't persist, else that store."""
+    return get_store() if store is SHARED else store
+
+# ---------- migration from the JSON folders --------------------------------
+def migrate_json(store: CandidateStore | None = None, resume_dir: str = RESUME_JSON_DIR,
+                 jd_dir: str = JD_JSON_DIR) -> dict:
+    """Import <jd_dir>/<job_id>.json and <resume_dir>/<job_id>/<candidate>.json; safe to re-run."""
+    store = store or get_store()
+    stats = {"jobs": 0, "candidates": 0, "skipped": 0}
+    if os.path.isdir(jd_dir):
+        for fname in sorted(os.listdir(jd_dir)):
+            if not fname.endswith(".json"):
+                continue
+            try:
+                with open(os.path.join(jd_dir, fname), "r", encoding="utf-8") as f:
+                    jd = json.load(f)
+                store.put_job(jd, jd.get("JOB_ID") or fname[:-5])
+                stats["jobs"] += 1
+            except (OSError, ValueError):
+                stats["skipped"] += 1
+    if os.path.isdir(resume_dir):
+        for job_id in sorted(os.listdir(resume_dir)):
+            folder = os.path.join(resume_dir, job_id)
+            if not os.path.isdir(folder):
+                continue
+            items = []
+            for fname in sorted(os.listdir(folder)):
+                if not fname.endswith(".json"):
+                    continue
+                try:
+                    with open(os.path.join(folder, fname), "r", encoding="utf-8") as f:
+                        items.append((fname[:-5], json.load(f)))
+                except (OSError, ValueError):
+                    stats["skipped"] += 1
+            stats["candidates"] += store.put_candidates(job_id, items)
+    return stats
+
+# ---------- benchmark -------------------------------------------------------
+def benchmark(n: int = 100_000, jobs: int = 10, seed: int = 0) -> dict:
+    import random
+    import tempfile
+    from skill_matcher import get_skill_matcher
+
+    rng = random.Random(seed)
+    names = list(get_skill_matcher().names.values())
+    path = os.path.join(tempfile.mkdtemp(prefix="candidate_store_"), "bench.sqlite")
+    store = CandidateStore(path)
+    t0 = time.perf_counter()
+    per_job = n // jobs
+    for j in range(jobs):
+        store.put_candidates(f"job-{j}", [(f"cand-{j}-{i}", {
+            "name": f"Candidate {j}-{i}", "skills": rng.sample(names, rng.randint(5, 20)),
+            "total_years_of_experience": round(rng.uniform(0, 15), 1)}) for i in range(per_job)])
+    insert = time.perf_counter() - t0
+    timings = []
+    for _ in range(20):
+        t0 = time.perf_counter()
+        hits = store.find_candidates("job-3", skills=[rng.choice(names)], min_years=5)
+        timings.append(time.perf_counter() - t0)
+    timings.sort()
+    return {"candidates": per_job * jobs, "insert_s": round(insert, 2),
+            "query_p50_ms": round(timings[len(timings) // 2] * 1000, 2),
+            "query_max_ms": round(timings[-1] * 1000, 2), "last_hits": len(hits),
+            "db_mb": round(os.path.getsize(path) / 1e6, 1)}
+
+
+if __name__ == "__main__":
+    import argparse
+    from pprint import pprint
+
+    ap = argparse.ArgumentParser(description="Candidate store: migrate, query, benchmark.")
+    sub = ap.add_subparsers(dest="cmd", required=True)
+    mig = sub.add_parser("migrate", help="Import the existing JSON folders")
+    mig.add_argument("--resume-dir", default=RESUME_JSON_DIR)
+    mig.add_argument("--jd-dir", default=JD_JSON_DIR)
+    q = sub.add_parser("query", help="Find candidates by job, skills and experience")
+    q.add_argument("--job")
+    q.add_argument("--skill", action="append", default=[])
+    q.add_argument("--min-years", type=float)
+    q.add_argument("--max-years", type=float)
+    q.add_argument("--limit", type=int, default=50)
+    sub.add_parser("summary")
+    b = sub.add_parser("bench")
+    b.add_argument("--n", type=int, default=100_000)
+    args = ap.parse_args()
+
+    if args.cmd == "migrate":
+        print(f"[Candidate Store] Migrated {migrate_json(get_store(), args.resume_dir, args.jd_dir)}")
+    elif args.cmd == "query":
+        t0 = time.perf_counter()
+        rows = get_store().find_candidates(args.job, args.skill, args.min_years, args.max_years, args.limit)
+        pprint(rows)
+        print(f"[Candidate Store] {len(rows)} rows in {(time.perf_counter() - t0) * 1000:.1f} ms")
+    elif args.cmd == "summary":
+        pprint(get_store().summary())
+    else:
+        pprint(benchmark(args.n))
@@ -0,0 +1,468 @@
+# candidate_table.py
+"""
+Compact, columnar in-memory form of many parsed resumes.
+
+    table = CandidateTable.from_resumes(resumes, ids)      # or candidate_store.load_table(job_id)
+    pool = table.pool()                                     # scoring reads the arrays, no copy
+    table[i]["skills"], table[i].to_dict()                  # materialized only when asked for
+
+A parsed resume is a nested dict of mostly repeated strings (skills, titles, company
+names, dates, boilerplate duty lines). Here every distinct value is stored once in
+a shared StringTable, and each field is an int32 column of ids into it:
+
+- scalar fields (name, email, total_years_of_experience, …): one id per candidate;
+- list fields (skills, certifications, …): ids back to back, with per-candidate
+  offsets (CSR), as CandidatePool already stores skills;
+- past_roles / education: a CSR of records, each sub-field (title, company, dates,
+  job_duties) a column over all records;
+- anything else, including keys this module doesn't know, is kept as a JSON value.
+
+Skills are also interned as skill_key ids (deduplicated per candidate), exactly the
+`vocab` / `skill_ids` / `offsets` layout of scoring.CandidatePool, together with the
+years and degree-level columns. pool() hands those arrays over as they are.
+
+CandidateRecord (a __slots__ view of one row) behaves like the original dict for
+reading (`r["skills"]`, `r.get("past_roles")`, `dict(r)`), decoding one field at a
+time. to_dict() gives back the resume in the current JSON schema. `python
+candidate_table.py --bench 100000` compares memory with the plain dicts.
+"""
+
+import json
+from array import array
+
+import numpy as np
+
+from skill_matcher import skill_key
+from experience import batch_experience
+
+ABSENT = -1
+EMPTY  = -2                    # an empty list, without a CSR entry of its own
+SCALAR_FIELDS = ("name", "email", "phone", "total_years_of_experience", "JOB_ID")
+LIST_FIELDS   = ("skills", "certifications", "projects", "soft_skills", "other_notes")
+RECORD_FIELDS = {
+    "past_roles": ("title", "company", "location", "start_year_month", "end_year_month",
+                   "start_month_year", "end_month_year", "start_date", "end_date", "job_duties"),
+    "education": ("degree", "institution", "year"),
+}
+
+
+class _Json(str):
+    """A nested value (dict, or list holding dicts) kept as its JSON text."""
+    __slots__ = ()
+
+
+class StringTable:
+    """Interns JSON scalars: each distinct value is stored once and referred to by int id."""
+
+    __slots__ = ("values", "_ids", "_str_ids")
+
+    def __init__(self):
+        self.values = []
+        self._ids = {}
+        self._str_ids = {}                  # fast path: plain strings are most values
+
+    def add(self, value) -> int:
+        if type(value) is str:
+            vid = self._str_ids.get(value)
+            if vid is None:
+                vid = self._str_ids[value] = len(self.values)
+                self.values.append(value)
+            return vid
+        if isinstance(value, (dict, list)):
+            value = _Json(json.dumps(value, ensure_ascii=False, separators=(",", ":")))
+        key = (type(value), value)          # keeps 1, 1.0, True and "1" apart
+        vid = self._ids.get(key)
+        if vid is None:
+            vid = self._ids[key] = len(self.values)
+            self.values.append(value)
+        return vid
+
+    def get(self, vid: int):
+        value = self.values[vid]
+        return json.loads(value) if type(value) is _Json else value
+
+    def __len__(self):
+        return len(self.values)
+
+# ---------- columns ---------------------------------------------------------
+class Cells:
+    """
+    One JSON value per row in int32 arrays: ref >= 0 is a StringTable id, ABSENT is a
+    missing key, EMPTY is [], and ref <= -3 is list number (-ref - 3), stored CSR in
+    items/offsets.
+    """
+
+    __slots__ = ("refs", "items", "offsets")
+
+    def __init__(self):
+        # array builders: 4–8 bytes per entry while appending, not a Python int object each.
+        self.refs, self.items, self.offsets = array("i"), array("i"), array("i", [0])
+
+    def append(self, strings: StringTable, value, present: bool = True):
+        if not present:
+            self.refs.append(ABSENT)
+        elif isinstance(value, list) and not value:
+            self.refs.append(EMPTY)
+        elif isinstance(value, list) and not any(isinstance(v, (dict, list)) for v in value):
+            self.refs.append(-3 - (len(self.offsets) - 1))
+            self.items.extend(strings.add(v) for v in value)
+            self.offsets.append(len(self.items))
+        else:
+            self.refs.append(strings.add(value))
+
+    def freeze(self) -> "Cells":
+        self.refs = np.frombuffer(self.refs, dtype=np.int32)
+        self.items = np.frombuffer(self.items, dtype=np.int32)
+        self.offsets = np.frombuffer(self.offsets, dtype=np.int32)
+        return self
+
+    def has(self, row: int) -> bool:
+        return self.refs[row] != ABSENT
+
+    def get(self, strings: StringTable, row: int):
+        ref = int(self.refs[row])
+        if ref >= 0:
+            return strings.get(ref)
+        if ref == EMPTY:
+            return []
+        k = -ref - 3
+        return [strings.get(int(v)) for v in self.items[self.offsets[k]:self.offsets[k + 1]]]
+
+    @property
+    def nbytes(self) -> int:
+        return self.refs.nbytes + self.items.nbytes + self.offsets.nbytes
+
+
+class _Records:
+    """A list-of-dicts field: per-candidate offsets into rows, one Cells per sub-field."""
+
+    __slots__ = ("keys", "offsets", "cells", "extra")
+
+    def __init__(self, keys):
+        self.keys = keys
+        self.offsets = array("i", [0])
+        self.cells = {k: Cells() for k in keys}
+        self.extra = Cells()                    # unknown sub-keys (or a non-dict entry)
+
+    def append(self, strings: StringTable, entries):
+        for entry in entries:
+            if not isinstance(entry, dict):
+                for c in self.cells.values():
+                    c.append(strings, None, False)
+                self.extra.append(strings, {"__value__": entry})
+                continue
+            for k, c in self.cells.items():
+                c.append(strings, entry.get(k), k in entry)
+            rest = {k: v for k, v in entry.items() if k not in self.cells}
+            self.extra.append(strings, rest, bool(rest))
+        self.offsets.append(self.offsets[-1] + len(entries))
+
+    def freeze(self) -> "_Records":
+        self.offsets = np.frombuffer(self.offsets, dtype=np.int32)
+        for c in (*self.cells.values(), self.extra):
+            c.freeze()
+        # Sub-fields no record has (most of the alternative date keys) cost nothing.
+        self.cells = {k: c for k, c in self.cells.items() if (c.refs != ABSENT).any()}
+        return self
+
+    def get(self, strings: StringTable, i: int) -> list:
+        out = []
+        for row in range(self.offsets[i], self.offsets[i + 1]):
+            entry = {k: c.get(strings, row) for k, c in self.cells.items() if c.has(row)}
+            if self.extra.has(row):
+                rest = self.extra.get(strings, row)
+                if "__value__" in rest and not entry:
+                    out.append(rest["__value__"])
+                    continue
+                entry.update(rest)
+            out.append(entry)
+        return out
+
+    @property
+    def nbytes(self) -> int:
+        return self.offsets.nbytes + self.extra.nbytes + sum(c.nbytes for c in self.cells.values())
+
+# ---------- table -----------------------------------------------------------
+class CandidateTable:
+    """Parsed resumes as columns over a shared StringTable; see the module docstring."""
+
+    def __init__(self):
+        self.ids = []
+        self.strings = StringTable()
+        self.scalars = {f: Cells() for f in SCALAR_FIELDS}
+        self.lists = {f: Cells() for f in LIST_FIELDS}
+        self.records = {f: _Records(keys) for f, keys in RECORD_FIELDS.items()}
+        self.extra = Cells()                    # top-level keys not listed above
+        self.order = array("i")                 # per candidate: StringTable id of its key order
+        # Scoring columns, in scoring.CandidatePool's layout.
+        self.vocab = {}
+        self.skill_ids, self.skill_offsets = array("i"), array("q", [0])
+        self.years, self.degree = [], []
+        self._skill_key = {}                    # StringTable id -> vocab id (or None)
+        self._frozen = False
+
+    def __len__(self):
+        return len(self.ids)
+
+    def append(self, candidate_id, resume: dict):
+        """Add one parsed resume; the dict isn't kept."""
+        from scoring import degree_level, _degree_text
+
+        assert not self._frozen, "CandidateTable is frozen"
+        strings = self.strings
+        self.ids.append(candidate_id if candidate_id is not None else resume.get("name") or f"candidate_{len(self.ids)}")
+        for f, c in self.scalars.items():
+            c.append(strings, resume.get(f), f in resume)
+        for f, c in self.lists.items():
+            c.append(strings, resume.get(f), f in resume)
+        for f, r in self.records.items():
+            value = resume.get(f)
+            r.append(strings, value if isinstance(value, list) else [])
+        known = set(SCALAR_FIELDS) | set(LIST_FIELDS) | set(RECORD_FIELDS)
+        rest = {k: v for k, v in resume.items()
+                if k not in known or (k in RECORD_FIELDS and not isinstance(v, list))}
+        self.extra.append(strings, rest, bool(rest))
+        self.order.append(strings.add("\t".join(resume)))
+
+        row = set()
+        skills = resume.get("skills")
+        for s in skills if isinstance(skills, list) else []:
+            if not isinstance(s, str) or not s:
+                continue
+            sid = strings.add(s)
+            vid = self._skill_key.get(sid)
+            if vid is None:
+                vid = self._skill_key[sid] = self.vocab.setdefault(skill_key(s), len(self.vocab))
+            row.add(vid)
+        self.skill_ids.extend(row)
+        self.skill_offsets.append(len(self.skill_ids))
+        y = resume.get("total_years_of_experience")
+        self.years.append(float(y) if isinstance(y, (int, float)) else np.nan)
+        self.degree.append(max((degree_level(_degree_text(e)) for e in resume.get("education") or []),
+                               default=0))
+
+    def freeze(self) -> "CandidateTable":
+        """Convert the builders to arrays. Call once, after the last append()."""
+        if self._frozen:
+            return self
+        for c in (*self.scalars.values(), *self.lists.values(), self.extra):
+            c.freeze()
+        for r in self.records.values():
+            r.freeze()
+        self.order = np.frombuffer(self.order, dtype=np.int32)
+        self.skill_ids = np.frombuffer(self.skill_ids, dtype=np.int32)
+        self.skill_offsets = np.frombuffer(self.skill_offsets, dtype=np.int64)
+        self.years = np.asarray(self.years, dtype=np.float32)
+        self.degree = np.asarray(self.degree, dtype=np.int8)
+        self._skill_key = None
+        self._frozen = True
+        return self
+
+    @classmethod
+    def from_resumes(cls, resumes, ids=None) -> "CandidateTable":
+        table = cls()
+        ids = [None] * len(resumes) if ids is None else list(ids)
+        for cid, r in zip(ids, resumes):
+            table.append(cid, r)
+        table.fill_years(lambda idx: [resumes[i] for i in idx])
+        return table.freeze()
+
+    @classmethod
+    def from_items(cls, items) -> "CandidateTable":
+        """From an iterable of (candidate_id, resume); resumes are dropped as they are consumed."""
+        table = cls()
+        for cid, r in items:
+            table.append(cid, r)
+        table.freeze()
+        table.fill_years()
+        return table
+
+    def fill_years(self, resumes_for=None):
+        """Parses without a total get one from their dated roles, as in CandidatePool.from_resumes."""
+        years = np.asarray(self.years, dtype=np.float32)
+        todo = np.flatnonzero(np.isnan(years))
+        if self._frozen:
+            roles = self.records["past_roles"]
+            todo = [i for i in todo if roles.offsets[i + 1] > roles.offsets[i]]
+            fetch = resumes_for or (lambda idx: [{"past_roles": roles.get(self.strings, i)} for i in idx])
+        else:
+            fetch = resumes_for
+            todo = [i for i, r in zip(todo, fetch(todo)) if r.get("past_roles")] if len(todo) else []
+        if len(todo):
+            years[todo] = batch_experience(fetch(todo))["total_years"]
+        self.years = years
+
+    # -- reading -------------------------------------------------------------
+    def pool(self):
+        """scoring.CandidatePool over this table's arrays (shared, not copied)."""
+        from scoring import CandidatePool
+        return CandidatePool(self.ids, self.vocab, self.skill_ids, self.skill_offsets, self.years, self.degree)
+
+    def __getitem__(self, i: int) -> "CandidateRecord":
+        if not -len(self) <= i < len(self):
+            raise IndexError(i)
+        return CandidateRecord(self, i % len(self))
+
+    def __iter__(self):
+        return (CandidateRecord(self, i) for i in range(len(self)))
+
+    def field(self, i: int, name: str):
+        """One field of candidate i, decoded; KeyError if the resume didn't have it."""
+        if name in self.scalars and self.scalars[name].has(i):
+            return self.scalars[name].get(self.strings, i)
+        if name in self.lists and self.lists[name].has(i):
+            return self.lists[name].get(self.strings, i)
+        if self.extra.has(i):
+            rest = self.extra.get(self.strings, i)
+            if name in rest:
+                return rest[name]
+        if name in self.records and name in self.keys(i):
+            return self.records[name].get(self.strings, i)
+        raise KeyError(name)
+
+    def keys(self, i: int) -> list:
+        text = self.strings.values[int(self.order[i])]
+        return text.split("\t") if text else []
+
+    def to_dict(self, i: int) -> dict:
+        return {k: self.field(i, k) for k in self.keys(i)}
+
+    def nbytes(self) -> dict:
+        """Approximate bytes held: arrays, plus the distinct values in the string table."""
+        import sys
+        columns = sum(c.nbytes for c in (*self.scalars.values(), *self.lists.values(), self.extra))
+        columns += sum(r.nbytes for r in self.records.values())
+        scoring_cols = self.skill_ids.nbytes + self.skill_offsets.nbytes + self.years.nbytes + self.degree.nbytes
+        strings = sum(sys.getsizeof(v) for v in self.strings.values) + sys.getsizeof(self.strings.values)
+        return {"columns": columns + self.order.nbytes, "scoring": scoring_cols, "strings": strings,
+                "distinct_values": len(self.strings),
+                "total": columns + self.order.nbytes + scoring_cols + strings}
+
+
+class CandidateRecord:
+    """Read-only, lazily decoded view of one candidate; reads like the parsed-resume dict."""
+
+    __slots__ = ("table", "index")
+
+    def __init__(self, table: CandidateTable, index: int):
+        self.table, self.index = table, index
+
+    @property
+    def candidate_id(self):
+        return self.table.ids[self.index]
+
+    def __getitem__(self, name):
+        return self.table.field(self.index, name)
+
+    def get(self, name, default=None):
+        try:
+            return self.table.field(self.index, name)
+        except KeyError:
+            return default
+
+    def __contains__(self, name):
+        return name in self.table.keys(self.index)
+
+    def keys(self):
+        return self.table.keys(self.index)
+
+    def __iter__(self):
+        return iter(self.keys())
+
+    def __len__(self):
+        return len(self.keys())
+
+    def items(self):
+        return self.to_dict().items()
+
+    def to_dict(self) -> dict:
+        return self.table.to_dict(self.index)
+
+    def __repr__(self):
+        return f"CandidateRecord({self.candidate_id!r})"
+
+# ---------- benchmark -------------------------------------------------------
+def _deep_size(obj, seen=None) -> int:
+    import sys
+    seen = set() if seen is None else seen
+    if id(obj) in seen:
+        return 0
+    seen.add(id(obj))
+    size = sys.getsizeof(obj)
+    if isinstance(obj, dict):
+        size += sum(_deep_size(k, seen) + _deep_size(v, seen) for k, v in obj.items())
+    elif isinstance(obj, (list, tuple)):
+        size += sum(_deep_size(v, seen) for v in obj)
+    return size
+
+
+def benchmark(n: int = 100_000, seed: int = 0) -> dict:
+    import time
+    import random
+    from skill_matcher import get_skill_matcher
+    from scoring import CandidatePool, score_pool, DEFAULT_JD_PATH
+
+    rng = random.Random(seed)
+    names = list(get_skill_matcher().names.values())
+    titles = ["Software Engineer", "Senior Developer", "Data Engineer", "QA Analyst", "Team Lead"]
+    companies = [f"Company {i}" for i in range(500)]
+    duties = [f"Worked on {rng.choice(names)} services and {rng.choice(names)} pipelines" for _ in range(2000)]
+    months = ["Jan", "Mar", "Jun", "Sep", "Nov"]
+    resumes = []
+    for i in range(n):
+        year = rng.randint(2005, 2018)
+        roles = []
+        for _ in range(rng.randint(1, 4)):
+            end = year + rng.randint(1, 3)
+            roles.append({"title": rng.choice(titles), "company": rng.choice(companies),
+                          "start_year_month": f"{rng.choice(months)} {year}",
+                          "end_year_month": f"{rng.choice(months)} {end}",
+                          "job_duties": rng.sample(duties, rng.randint(2, 6))})
+            year = end
+        resumes.append({"name": f"Candidate {i}", "email": f"c{i}@example.com", "phone": f"+1 555 {i:07d}",
+                        "skills": rng.sample(names, rng.randint(5, 25)),
+                        "education": [{"degree": rng.choice(["B.Tech", "MSc", "MCA"]),
+                                       "institution": f"University {rng.randint(1, 300)}",
+                                       "year": str(rng.randint(2000, 2015))}],
+                        "certifications": [], "past_roles": roles, "projects": [], "soft_skills": [],
+                        "other_notes": [], "total_years_of_experience": None})
+    # Each parse arrives as its own JSON document, so its strings are separate objects.
+    resumes = [json.loads(json.dumps(r)) for r in resumes]
+    dict_bytes = _deep_size(resumes)
+
+    t0 = time.perf_counter()
+    pool_from_dicts = CandidatePool.from_resumes(resumes)
+    from_dicts_s = time.perf_counter() - t0
+    t0 = time.perf_counter()
+    table = CandidateTable.from_resumes(resumes)
+    build_s = time.perf_counter() - t0
+    pool = table.pool()
+    with open(DEFAULT_JD_PATH, "r", encoding="utf-8") as f:
+        jd = json.load(f)
+    same = bool(np.array_equal(score_pool(jd, pool)["final"], score_pool(jd, pool_from_dicts)["final"]))
+    t0 = time.perf_counter()
+    roundtrip = all(table[i].to_dict() == resumes[i] for i in range(0, n, max(1, n // 1000)))
+    materialize_ms = (time.perf_counter() - t0) * 1000 / len(range(0, n, max(1, n // 1000)))
+    size = table.nbytes()
+    return {"candidates": n, "dict_mb": round(dict_bytes / 1e6, 1), "table_mb": round(size["total"] / 1e6, 1),
+            "bytes_per_candidate": {"dict": dict_bytes // n, "table": size["total"] // n},
+            "reduction": round(dict_bytes / size["total"], 1), "distinct_values": size["distinct_values"],
+            "build_s": round(build_s, 2), "pool_from_dicts_s": round(from_dicts_s, 2),
+            "pool_shares_arrays": pool.skill_ids is table.skill_ids, "scores_match": same,
+            "roundtrip_ok": roundtrip, "materialize_ms": round(materialize_ms, 3)}
+
+
+if __name__ == "__main__":
+    import sys
+    from pprint import pprint
+
+    if len(sys.argv) > 1 and sys.argv[1] == "--bench":
+        pprint(benchmark(int(sys.argv[2]) if len(sys.argv) > 2 else 100_000))
+    else:
+        resumes = []
+        for path in sys.argv[1:]:
+            with open(path, "r", encoding="utf-8") as f:
+                resumes.append(json.load(f))
+        table = CandidateTable.from_resumes(resumes, ids=sys.argv[1:])
+        pprint(table.nbytes())
+        print(all(table[i].to_dict() == r for i, r in enumerate(resumes)))
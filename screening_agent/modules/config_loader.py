@@ -0,0 +1,21 @@
+# config_loader.py
+"""Read config/config.yaml once per process (override the path with SCREENING_CONFIG)."""
+
+import os
+from functools import lru_cache
+
+BASE_DIR    = os.path.dirname(__file__)
+CONFIG_PATH = os.getenv("SCREENING_CONFIG", os.path.join(BASE_DIR, "../../config/config.yaml"))
+
+
+@lru_cache(maxsize=None)
+def load_config(path: str = CONFIG_PATH) -> dict:
+    import yaml
+    if not os.path.exists(path):
+        return {}
+    with open(path, "r", encoding="utf-8") as f:
+        return yaml.safe_load(f) or {}
+
+
+def get_section(name: str, path: str = CONFIG_PATH) -> dict:
+    return load_config(path).get(name) or {}
@@ -0,0 +1,106 @@
+# dedup.py
+"""
+Resume identity for parse reuse and duplicate detection.
+
+- file_hash: sha256 of the raw bytes (text_extraction.file_hash); the same upload again.
+- doc_hash: sha256 of the normalised text (case, punctuation and whitespace folded),
+  so a re-exported PDF or a DOCX→PDF conversion of the same resume is one document.
+- simhash: 64-bit SimHash over word 3-shingles. Re-uploads with trivial edits (new
+  phone number, a reworded bullet) land a few bits apart, unrelated resumes ~30.
+  Eight 8-bit bands are indexed in the candidate store; by pigeonhole any pair
+  within 7 bits shares a band, so near-duplicate lookup is an index probe plus
+  popcounts over the (few) documents sharing a band.
+"""
+
+import re
+import hashlib
+
+from text_extraction import extract_text, file_hash
+
+SIMHASH_BITS  = 64
+BANDS         = 8
+BAND_BITS     = SIMHASH_BITS // BANDS
+NEAR_DUP_BITS = 7          # max Hamming distance treated as a near-duplicate (must be < BANDS)
+SHINGLE       = 3
+_NON_WORD     = re.compile(r"[^0-9a-z]+")
+
+
+def normalize_text(text: str) -> str:
+    return _NON_WORD.sub(" ", text.lower()).strip()
+
+
+def content_hash(text: str) -> str:
+    return hashlib.sha256(normalize_text(text).encode("utf-8")).hexdigest()
+
+
+def _h64(token: str) -> int:
+    return int.from_bytes(hashlib.blake2b(token.encode("utf-8"), digest_size=8).digest(), "big")
+
+
+def simhash(text: str) -> int:
+    import numpy as np
+
+    words = normalize_text(text).split()
+    shingles = [" ".join(words[i:i + SHINGLE]) for i in range(max(1, len(words) - SHINGLE + 1))]
+    hashes = np.array([_h64(sh) for sh in shingles], dtype=np.uint64)
+    bits = (hashes[:, None] >> np.arange(SIMHASH_BITS, dtype=np.uint64)) & np.uint64(1)
+    votes = 2 * bits.sum(axis=0, dtype=np.int64) - len(shingles)      # +1 per set bit, -1 per clear
+    return sum(1 << int(b) for b in np.flatnonzero(votes > 0))
+
+
+def hamming(a: int, b: int) -> int:
+    return ((a ^ b) & ((1 << SIMHASH_BITS) - 1)).bit_count()
+
+
+def bands(h: int) -> list:
+    """[(band_no, band value), …] used as near-duplicate index keys."""
+    mask = (1 << BAND_BITS) - 1
+    return [(i, (h >> (i * BAND_BITS)) & mask) for i in range(BANDS)]
+
+
+def to_signed(h: int) -> int:
+    # SQLite INTEGER is signed 64-bit.
+    return h - (1 << SIMHASH_BITS) if h >= 1 << (SIMHASH_BITS - 1) else h
+
+
+def to_unsigned(h: int) -> int:
+    return h + (1 << SIMHASH_BITS) if h < 0 else h
+
+
+def fingerprint(path: str, text: str | None = None) -> dict:
+    """{"file_hash", "doc_hash", "simhash"} for a resume file (text comes from the text cache)."""
+    text = extract_text(path) if text is None else text
+    return {"file_hash": file_hash(path), "doc_hash": content_hash(text), "simhash": simhash(text)}
+
+
+class NearDupIndex:
+    """In-memory banded simhash index (same scheme as the candidate store's document_bands)."""
+
+    def __init__(self):
+        self.buckets = {}
+
+    def add(self, key, h: int):
+        for band in bands(h):
+            self.buckets.setdefault(band, []).append((key, h))
+
+    def query(self, h: int, max_bits: int = NEAR_DUP_BITS) -> list:
+        seen, out = set(), []
+        for band in bands(h):
+            for key, other in self.buckets.get(band, ()):
+                if key not in seen:
+                    seen.add(key)
+                    d = hamming(h, other)
+                    if d <= max_bits:
+                        out.append((key, d))
+        return sorted(out, key=lambda kd: kd[1])
+
+
+if __name__ == "__main__":
+    import sys
+    from itertools import combinations
+
+    prints = {p: fingerprint(p) for p in sys.argv[1:]}
+    for (a, fa), (b, fb) in combinations(prints.items(), 2):
+        d = hamming(fa["simhash"], fb["simhash"])
+        tag = "same" if fa["doc_hash"] == fb["doc_hash"] else ("near" if d <= NEAR_DUP_BITS else "")
+        print(f"{d:>3} bits {tag:<5} {a}  {b}")
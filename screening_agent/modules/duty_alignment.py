@@ -0,0 +1,227 @@
+# duty_alignment.py
+"""
+Attach bullet-point duties from resume text to the parsed past_roles.
+
+Role headers ("Title, Company" followed by a date-range line) are found in one
+pass. Each role's "title company" string is reduced once to a character-trigram
+signature held in an inverted index and to character counts. A header confirms
+the best few roles by trigram Dice overlap with the same SequenceMatcher
+ratio/threshold the parser has always used; every other role is skipped unless
+its quick_ratio bound (from the counts, no alignment) could still beat that. The
+assignments are those of the all-pairs loop, at a fraction of the ratio() calls.
+"""
+
+import re
+from collections import Counter
+from difflib import SequenceMatcher
+from logging_module import timed
+
+BULLETS        = ("•", "-", "*")
+SECTION_STOPS  = {"education", "skills", "certifications", "projects"}
+YEAR_RE        = re.compile(r"(19|20)\d{2}")
+RANGE_RE       = re.compile(r"–|-|—|to", re.IGNORECASE)
+SHORTLIST      = 3
+
+
+def similar(a, b):
+    """Returns similarity ratio between two strings."""
+    return SequenceMatcher(None, a.lower(), b.lower()).ratio()
+
+
+def _trigrams(text: str) -> set:
+    t = f"  {' '.join(text.lower().split())} "
+    return {t[i:i + 3] for i in range(len(t) - 2)}
+
+
+class RoleIndex:
+    """Precomputed trigram signatures and character counts of past_roles for header → role lookup."""
+
+    def __init__(self, roles):
+        self.roles = roles
+        self.composites = [f"{r.get('title', '')} {r.get('company', '')}" for r in roles]
+        self.lowered = [c.lower() for c in self.composites]
+        self.counts = [Counter(c) for c in self.lowered]
+        self.signatures = [_trigrams(c) for c in self.composites]
+        self.postings = {}
+        for idx, sig in enumerate(self.signatures):
+            for gram in sig:
+                self.postings.setdefault(gram, []).append(idx)
+
+    def _bound(self, header_counts: Counter, header_len: int, idx: int) -> float:
+        # SequenceMatcher.quick_ratio() from precomputed counts: an upper bound on ratio().
+        matches = sum(min(n, header_counts[ch]) for ch, n in self.counts[idx].items())
+        total = header_len + len(self.lowered[idx])
+        return 2.0 * matches / total if total else 1.0
+
+    def best_role(self, header: str, threshold: float = 0.75, shortlist: int = SHORTLIST):
+        """
+        The role the all-pairs loop picks: highest ratio() above threshold, earlier role
+        on ties. The best few roles by trigram Dice are confirmed first; any other role
+        is only ratio()-checked if its quick_ratio bound can still beat the best so far.
+        """
+        header_l = header.lower()
+        grams = _trigrams(header)
+        shared = {}
+        for gram in grams:
+            for idx in self.postings.get(gram, ()):
+                shared[idx] = shared.get(idx, 0) + 1
+        likely = sorted(shared, key=lambda i: (-2 * shared[i] / (len(grams) + len(self.signatures[i])), i))
+        likely = sorted(likely[:shortlist])
+        header_counts, header_len = Counter(header_l), len(header_l)
+        bounds = [self._bound(header_counts, header_len, i) for i in range(len(self.roles))]
+        rest = sorted(set(range(len(self.roles))) - set(likely), key=lambda i: (-bounds[i], i))
+        best, best_score = None, threshold
+        for idx in likely + rest:
+            earlier = best is not None and idx < best
+            if bounds[idx] < best_score or (bounds[idx] == best_score and not earlier):
+                continue                              # can't beat (or tie earlier than) the current best
+            score = SequenceMatcher(None, header_l, self.lowered[idx]).ratio()
+            if score > best_score or (score == best_score and earlier):
+                best, best_score = idx, score
+        return best
+
+
+def find_job_headers(lines):
+    """(line index, "header, date line") for every 2-line role/company + date pattern."""
+    headers = []
+    for i in range(len(lines) - 1):
+        current, next_line = lines[i], lines[i + 1]
+        if not current.startswith(BULLETS) and RANGE_RE.search(next_line) and YEAR_RE.search(next_line):
+            headers.append((i, f"{current}, {next_line}"))
+    return headers
+
+
+def block_duties(block_lines):
+    duties = []
+    for line in block_lines:
+        # Match bullet-style lines or paragraphs under job headers
+        if line.startswith(BULLETS) or len(line.split()) > 5:
+            if line.lower().strip() in SECTION_STOPS:
+                break
+            duties.append(line.lstrip("•-* ").strip())
+    return duties
+
+
+@timed("duty_alignment")
+def align_duties(text, parsed_json, similarity_threshold=0.75, verbose=True):
+    lines = [line.strip() for line in text.split('\n') if line.strip()]
+    job_lines = find_job_headers(lines)
+    job_lines.append((len(lines), "EOF"))  # Sentinel for range calculation
+    if verbose:
+        print("Job Lines", job_lines)
+
+    roles = parsed_json.get("past_roles", [])
+    index = RoleIndex(roles)
+    for idx in range(len(job_lines) - 1):
+        start_idx, header_line = job_lines[idx]
+        end_idx, _ = job_lines[idx + 1]
+        duties = block_duties(lines[start_idx + 1:end_idx])
+        best = index.best_role(header_line, similarity_threshold)
+        if best is not None:
+            roles[best]["duties"] = duties
+    return parsed_json
+
+
+def align_duties_legacy(text, parsed_json, similarity_threshold=0.75):
+    """The parser's original all-pairs implementation (resume_parser before the index, minus its
+    debug print), kept as the benchmark baseline."""
+    lines = [line.strip() for line in text.split('\n') if line.strip()]
+    job_lines = []
+    for i in range(len(lines) - 1):
+        current = lines[i]
+        next_line = lines[i + 1]
+
+        # Look for 2-line pattern: role/company + date
+        if not current.startswith(("•", "-", "*")):
+            if re.search(r"(19|20)\d{2}", next_line) and re.search(r"–|-|—|to", next_line, re.IGNORECASE):
+                job_lines.append((i, f"{current}, {next_line}"))
+
+    job_lines.append((len(lines), "EOF"))  # Sentinel for range calculation
+
+    # Prepare titles and companies from parsed_json
+    roles = parsed_json.get("past_roles", [])
+
+    for idx in range(len(job_lines) - 1):
+        start_idx, header_line = job_lines[idx]
+        end_idx, _ = job_lines[idx + 1]
+
+        block_lines = lines[start_idx + 1:end_idx]
+        duties = []
+        for line in block_lines:
+            # Match bullet-style lines or paragraphs under job headers
+            if line.startswith(("•", "-", "*")) or re.match(r"^\u2022", line) or len(line.split()) > 5:
+                if line.lower().strip() in ["education", "skills", "certifications", "projects"]:
+                    break
+                duties.append(line.lstrip("•-* \u2022").strip())
+
+        # Assign duties to best-matching role
+        best_match = None
+        highest_score = 0
+        for role in roles:
+            title = role.get("title", "")
+            company = role.get("company", "")
+            composite = f"{title} {company}"
+            score = similar(header_line, composite)
+            if score > highest_score and score > similarity_threshold:
+                highest_score = score
+                best_match = role
+
+        if best_match:
+            best_match["duties"] = duties
+
+    return parsed_json
+
+# ---------------------- benchmark -------------------------------------------
+_TITLES = ["Data Engineer", "Senior Data Scientist", "ML Engineer", "Software Engineer",
+           "Analytics Lead", "Backend Developer", "Platform Engineer", "Research Scientist",
+           "Data Analyst", "Engineering Manager"]
+_COMPANIES = ["Pfizer, USA", "Bright Horizons, USA", "Tata Consultancy Services, India",
+              "Acme Corp", "Beta Analytics", "Globex", "Initech", "Umbrella Health",
+              "Stark Industries", "Wayne Enterprises", "Hooli", "Vandelay Imports"]
+
+
+def synthetic_resume(n_roles: int, duties_per_role: int = 8, seed: int = 0):
+    import random
+    rng = random.Random(seed)
+    roles, lines = [], ["JANE CANDIDATE", "jane@example.com", "PROFESSIONAL EXPERIENCE"]
+    for k in range(n_roles):
+        title, company = rng.choice(_TITLES), f"{rng.choice(_COMPANIES)} {k}"
+        y = 2024 - k
+        roles.append({"title": title, "company": company})
+        lines += [f"{title}, {company}", f"Jan {y - 1} – Dec {y}"]
+        lines += [f"• Built and maintained pipeline number {j} for team {k} using Python and SQL"
+                  for j in range(duties_per_role)]
+    lines += ["EDUCATION", "Masters in Data Analytics Engineering", "Northeastern University 2019 - 2021"]
+    return "\n".join(lines), {"past_roles": roles}
+
+
+def benchmark(role_counts=(5, 20, 50, 100), repeats=3):
+    import copy
+    import time
+    rows = []
+    for n in role_counts:
+        text, parsed = synthetic_resume(n)
+        timings = {}
+        outputs = {}
+        for name, fn, kwargs in (("legacy", align_duties_legacy, {}),
+                                 ("indexed", align_duties, {"verbose": False})):
+            best = float("inf")
+            for _ in range(repeats):
+                data = copy.deepcopy(parsed)
+                t0 = time.perf_counter()
+                fn(text, data, **kwargs)
+                best = min(best, time.perf_counter() - t0)
+            timings[name], outputs[name] = best, data
+        same = outputs["legacy"] == outputs["indexed"]
+        rows.append({"roles": n, "legacy_ms": round(timings["legacy"] * 1000, 2),
+                     "indexed_ms": round(timings["indexed"] * 1000, 2),
+                     "speedup": round(timings["legacy"] / timings["indexed"], 1),
+                     "same_assignments": same})
+    return rows
+
+
+if __name__ == "__main__":
+    print(f"{'roles':>6} {'legacy_ms':>10} {'indexed_ms':>11} {'speedup':>8} {'same':>6}")
+    for r in benchmark():
+        print(f"{r['roles']:>6} {r['legacy_ms']:>10} {r['indexed_ms']:>11} {r['speedup']:>8} "
+              f"{str(r['same_assignments']):>6}")
@@ -0,0 +1,271 @@
+# experience.py
+"""
+Years of experience from parsed roles, without double-counting concurrent jobs.
+
+    total_years(resume["past_roles"])                      → 6.5 (overlaps merged)
+    exp = batch_experience(resumes, skills=jd["required_skills"])
+    exp["total_years"], exp["skill_years"]                 → float32 arrays for the scorer
+
+Dates are normalised to a month index (year * 12 + month - 1) by parse_month(), which
+understands "Jan 2020", "January, 2020", "01/2020", "2020-01", "2020", bare integer
+years (the stored LLM shape start_year / end_year) and "Present" / "Current". Results
+are cached per distinct string, so a pool of thousands of resumes parses each date
+form once. Year-only dates count from January, so "2016 – 2019" is three years. A
+missing end date means the role is current. Roles whose dates don't parse are
+skipped and counted (`experience_date_unparsed`), not silently dropped.
+
+Intervals are half-open [start, end) in months and merged per candidate, and for
+per-skill experience per (candidate, skill), where a role counts towards the
+skills the taxonomy finds in its title and duties. The batch path flattens every
+role of every candidate into NumPy arrays and merges them with one sort and a
+running maximum.
+"""
+
+import re
+import datetime
+from functools import lru_cache
+
+import numpy as np
+
+from logging_module import incr
+from skill_matcher import get_skill_matcher, skill_key
+
+PRESENT   = -1                    # parse_month() sentinel, resolved to the current month
+MIN_YEAR  = 1950
+MAX_YEAR  = 2100
+START_KEYS = ("start_year_month", "start_month_year", "start_year", "start_date", "start")
+END_KEYS   = ("end_year_month", "end_month_year", "end_year", "end_date", "end")
+
+MONTHS = {m: i + 1 for i, m in enumerate(
+    ("jan", "feb", "mar", "apr", "may", "jun", "jul", "aug", "sep", "oct", "nov", "dec"))}
+
+_PRESENT_RE   = re.compile(r"^(present|current(ly)?|now|today|ongoing|till date|to date|till now)$")
+_YEAR_RE      = re.compile(r"^(\d{4})$")
+_NAME_YEAR_RE = re.compile(r"^([a-z]{3,9})\.?[\s,'-]*(\d{4})$")
+_MM_YYYY_RE   = re.compile(r"^(\d{1,2})\s*[/.-]\s*(\d{4})$")
+_YYYY_MM_RE   = re.compile(r"^(\d{4})\s*[/.-]\s*(\d{1,2})(?:\s*[/.-]\s*\d{1,2})?$")
+
+
+def current_month() -> int:
+    today = datetime.date.today()
+    return today.year * 12 + today.month - 1
+
+
+def _month_index(year: int, month: int) -> int | None:
+    if MIN_YEAR <= year <= MAX_YEAR and 1 <= month <= 12:
+        return year * 12 + month - 1
+    return None
+
+
+@lru_cache(maxsize=65_536)
+def _parse_str(text: str) -> int | None:
+    if _PRESENT_RE.match(text):
+        return PRESENT
+    if m := _YEAR_RE.match(text):
+        return _month_index(int(m.group(1)), 1)
+    if m := _NAME_YEAR_RE.match(text):
+        month = MONTHS.get(m.group(1)[:3])
+        return _month_index(int(m.group(2)), month) if month else None
+    if m := _MM_YYYY_RE.match(text):
+        return _month_index(int(m.group(2)), int(m.group(1)))
+    if m := _YYYY_MM_RE.match(text):
+        return _month_index(int(m.group(1)), int(m.group(2)))
+    if not re.search(r"\d{4}", text):
+        return None
+    from dateutil import parser as dateparser
+    try:
+        # Fixed default: missing parts become January, not today's month.
+        d = dateparser.parse(text, default=datetime.datetime(2000, 1, 1), fuzzy=True)
+    except (ValueError, OverflowError):
+        return None
+    return _month_index(d.year, d.month)
+
+
+def parse_month(value) -> int | None:
+    """Month index for a role date, PRESENT for an ongoing role, None if unparseable."""
+    if value is None or isinstance(value, bool):
+        return None
+    if isinstance(value, (int, float)):
+        return _month_index(int(value), 1)
+    text = " ".join(str(value).strip().lower().split())
+    return _parse_str(text) if text else None
+
+
+def _first(role: dict, keys) -> object:
+    for k in keys:
+        v = role.get(k)
+        if v not in (None, ""):
+            return v
+    return None
+
+
+def role_interval(role: dict, now: int | None = None) -> tuple[int, int] | None:
+    """[start, end) in months for one role; None (and counted) when it can't be dated."""
+    if not isinstance(role, dict):
+        return None
+    now = current_month() if now is None else now
+    start = parse_month(_first(role, START_KEYS))
+    end_raw = _first(role, END_KEYS)
+    end = PRESENT if end_raw is None else parse_month(end_raw)
+    if start is None or start == PRESENT or end is None:
+        incr("experience_date_unparsed")
+        return None
+    end = now if end == PRESENT else end
+    if end < start:
+        incr("experience_date_unparsed")
+        return None
+    return start, end
+
+
+def merge_intervals(intervals) -> list:
+    """Union of [start, end) intervals as a sorted list of disjoint intervals."""
+    merged = []
+    for start, end in sorted(intervals):
+        if merged and start <= merged[-1][1]:
+            if end > merged[-1][1]:
+                merged[-1][1] = end
+        else:
+            merged.append([start, end])
+    return [tuple(iv) for iv in merged]
+
+
+def total_years(roles, now: int | None = None) -> float | None:
+    """Years covered by the roles, concurrent roles counted once; None if none can be dated."""
+    intervals = [iv for iv in (role_interval(r, now) for r in roles or []) if iv]
+    if not intervals:
+        return None
+    return round(sum(e - s for s, e in merge_intervals(intervals)) / 12, 1)
+
+# ---------- batch -----------------------------------------------------------
+def _merged_months(group: np.ndarray, start: np.ndarray, end: np.ndarray, n_groups: int) -> np.ndarray:
+    """
+    Months covered per group after merging overlapping intervals. Groups are offset so
+    one global running maximum of the end never crosses from one group into the next.
+    """
+    if not len(group):
+        return np.zeros(n_groups, dtype=np.int64)
+    span = int(end.max()) + 1
+    s = group * span + start
+    e = group * span + end
+    order = np.lexsort((e, s))
+    s, e, g = s[order], e[order], group[order]
+    reach = np.maximum.accumulate(e)
+    # A new merged block starts where an interval begins after everything before it ended.
+    new = np.empty(len(s), dtype=bool)
+    new[0] = True
+    new[1:] = s[1:] > reach[:-1]
+    first = np.flatnonzero(new)
+    last = np.append(first[1:] - 1, len(s) - 1)
+    months = reach[last] - s[first]
+    return np.bincount(g[first], weights=months, minlength=n_groups).astype(np.int64)
+
+
+@lru_cache(maxsize=65_536)
+def _skill_ids(text: str) -> frozenset:
+    return frozenset(sid for sid, _, _ in get_skill_matcher().finditer(text))
+
+
+def _role_skill_ids(role: dict) -> frozenset:
+    duties = role.get("job_duties") or role.get("duties") or []
+    return _skill_ids(" ".join([str(role.get("title") or ""),
+                                *(duties if isinstance(duties, list) else [str(duties)])]))
+
+
+def batch_experience(resumes, skills=None, now: int | None = None) -> dict:
+    """
+    Experience for many candidates at once.
+
+    Returns {"total_years": float32[n] (NaN when no role can be dated),
+             "skill_years": float32[n, len(skills)] or None,
+             "dated_roles": int, "undated_roles": int}.
+    """
+    now = current_month() if now is None else now
+    cand, starts, ends, role_skills = [], [], [], []
+    undated = 0
+    for i, r in enumerate(resumes):
+        for role in r.get("past_roles") or []:
+            iv = role_interval(role, now)
+            if iv is None:
+                undated += 1
+                continue
+            cand.append(i)
+            starts.append(iv[0])
+            ends.append(iv[1])
+            if skills:
+                role_skills.append(_role_skill_ids(role))
+    n = len(resumes)
+    cand = np.asarray(cand, dtype=np.int64)
+    starts = np.asarray(starts, dtype=np.int64)
+    ends = np.asarray(ends, dtype=np.int64)
+
+    months = _merged_months(cand, starts, ends, n)
+    has_role = np.bincount(cand, minlength=n)[:n] > 0 if len(cand) else np.zeros(n, dtype=bool)
+    total = np.where(has_role, months / 12.0, np.nan).astype(np.float32)
+
+    skill_years = None
+    if skills:
+        cols = {}
+        for col, s in enumerate(skills):
+            cols.setdefault(skill_key(s), []).append(col)
+        pair_role, pair_col = [], []
+        for j, ids in enumerate(role_skills):
+            for sid in ids & cols.keys():
+                for col in cols[sid]:
+                    pair_role.append(j)
+                    pair_col.append(col)
+        pair_role = np.asarray(pair_role, dtype=np.int64)
+        pair_col = np.asarray(pair_col, dtype=np.int64)
+        m = len(skills)
+        group = cand[pair_role] * m + pair_col if len(pair_role) else pair_role
+        per = _merged_months(group, starts[pair_role], ends[pair_role], n * m)
+        skill_years = (per.reshape(n, m) / 12.0).astype(np.float32)
+
+    return {"total_years": total, "skill_years": skill_years,
+            "dated_roles": int(len(cand)), "undated_roles": undated}
+
+
+def benchmark(n: int = 10_000, roles: int = 4, seed: int = 0) -> dict:
+    import time
+    import random
+
+    rng = random.Random(seed)
+    months = ["Jan", "Mar", "June", "Sept", "Nov"]
+    resumes = []
+    for i in range(n):
+        year = rng.randint(2000, 2018)
+        past = []
+        for _ in range(roles):
+            end = year + rng.randint(1, 4)
+            past.append({"title": rng.choice(["Python Developer", "Data Engineer with SQL", "Java Engineer"]),
+                         "start_year_month": f"{rng.choice(months)} {year}",
+                         "end_year_month": "Present" if end > 2025 else f"{rng.choice(months)} {end}"})
+            year = end - rng.randint(0, 1)          # some roles overlap the next one
+        resumes.append({"past_roles": past})
+    t0 = time.perf_counter()
+    loop = [total_years(r["past_roles"]) for r in resumes]
+    loop_s = time.perf_counter() - t0
+    t0 = time.perf_counter()
+    out = batch_experience(resumes)
+    batch_s = time.perf_counter() - t0
+    t0 = time.perf_counter()
+    batch_experience(resumes, skills=["Python", "SQL", "Java"])
+    skills_s = time.perf_counter() - t0
+    same = all(abs(a - b) < 0.051 for a, b in zip(loop, out["total_years"]))
+    return {"candidates": n, "roles": n * roles, "per_resume_s": round(loop_s, 3),
+            "batch_s": round(batch_s, 3), "batch_with_skills_s": round(skills_s, 3),
+            "batch_matches_per_resume": same}
+
+
+if __name__ == "__main__":
+    import sys
+    import json
+
+    if len(sys.argv) > 1 and sys.argv[1] == "--bench":
+        print(benchmark(int(sys.argv[2]) if len(sys.argv) > 2 else 10_000))
+    else:
+        for path in sys.argv[1:]:
+            with open(path, "r", encoding="utf-8") as f:
+                resume = json.load(f)
+            roles = resume.get("past_roles") or []
+            print(f"{path}: {total_years(roles)} years over {len(roles)} roles; "
+                  f"merged {merge_intervals([iv for iv in (role_interval(r) for r in roles) if iv])}")
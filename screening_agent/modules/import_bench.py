@@ -0,0 +1,60 @@
+# import_bench.py
+"""
+Import-time benchmark: how long a fresh interpreter takes to import each module.
+
+    python screening_agent/modules/import_bench.py [--repeats 5] [module ...]
+
+Each import runs in its own subprocess (cold interpreter, warm OS file cache), so
+the numbers are what a CLI invocation or a freshly spawned worker actually pays.
+"""
+
+import os
+import sys
+import time
+import subprocess
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_MODULES = ["skill_matcher", "llm_cache", "openai_model", "local_model",
+                   "resume_scraper_nlp", "resume_parser", "jd_parser", "skill_match"]
+
+
+def time_import(module: str, repeats: int = 5) -> dict:
+    baseline = _best(["-c", "pass"], repeats)
+    samples = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        proc = subprocess.run([sys.executable, "-c", f"import {module}"], cwd=BASE_DIR,
+                              capture_output=True, text=True)
+        samples.append(time.perf_counter() - start)
+        if proc.returncode != 0:
+            err = proc.stderr.strip().splitlines()
+            return {"module": module, "error": err[-1] if err else f"exit {proc.returncode}"}
+    best = min(samples)
+    return {"module": module, "best_ms": round(best * 1000, 1),
+            "net_ms": round((best - baseline) * 1000, 1)}
+
+
+def _best(args, repeats):
+    samples = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        subprocess.run([sys.executable, *args], cwd=BASE_DIR, capture_output=True)
+        samples.append(time.perf_counter() - start)
+    return min(samples)
+
+
+if __name__ == "__main__":
+    import argparse
+
+    ap = argparse.ArgumentParser(description="Measure cold import time of screening modules.")
+    ap.add_argument("modules", nargs="*", default=DEFAULT_MODULES)
+    ap.add_argument("--repeats", type=int, default=5)
+    args = ap.parse_args()
+
+    print(f"{'module':<22} {'best_ms':>9} {'net_ms':>9}")
+    for module in args.modules:
+        row = time_import(module, args.repeats)
+        if "error" in row:
+            print(f"{module:<22} {'error':>9}  {row['error']}")
+        else:
+            print(f"{module:<22} {row['best_ms']:>9} {row['net_ms']:>9}")
@@ -1,9 +1,11 @@
 import json
 import os
-import time
 import uuid
-from local_model import _call_ollama
-from openai_model import generate as gpt_generate  # fallback
+from local_model import generate as llm_generate   # Ollama → GPT router
+from logging_module import stage, timed
+from candidate_store import SHARED, resolve_store, EXPORT_JSON
+from prompt_compaction import compact_jd
+from json_output import JD_SCHEMA, parse_json, validate_json
 
 # ---------- paths -----------------------------------------------------------
 BASE_DIR      = os.path.dirname(__file__)               # …/screening_agent/modules
@@ -19,7 +21,14 @@ def _ensure_output_dir():
     if not os.path.exists(OUTPUT_DIR):
         os.makedirs(OUTPUT_DIR, exist_ok=True)
 
-def _save_json(job_id: str, data: dict):
+@timed("save")
+def _save_json(job_id: str, data: dict, store=SHARED):
+    store = resolve_store(store)
+    if store is not None:
+        store.put_job(data, job_id)
+        print(f"[JD Parser] Saved JD {job_id} to the candidate store")
+    if not EXPORT_JSON:
+        return
     _ensure_output_dir()
     out_path = os.path.join(OUTPUT_DIR, f"{job_id}.json")
     with open(out_path, "w", encoding="utf-8") as f:
@@ -27,52 +36,48 @@ def _save_json(job_id: str, data: dict):
     print(f"[JD Parser] Saved JSON to {out_path}")
 
 # ---------- main extraction -------------------------------------------------
-def extract_jd_requirements(jd_text: str, max_retries: int = 3) -> dict:
+def extract_jd_requirements(jd_text: str, max_retries: int = 3, job_id: str | None = None,
+                            store=SHARED) -> dict:
     """
-    Extract structured JD requirements → dict, add JOB_ID, write to disk.
+    Extract structured JD requirements → dict, add JOB_ID (new unless given), write to disk
+    (the candidate store; `store=None` skips it).
     """
     prompt_template = load_prompt_template(PROMPT_PATH)
-    prompt = prompt_template.replace("{JD_TEXT}", jd_text)
+    prompt = prompt_template.replace("{JD_TEXT}", compact_jd(jd_text)[0])
     system = (
         "You are an HR assistant who extracts structured job requirements from "
         "job descriptions and always returns well-formatted JSON."
     )
-    jd_data=None
-    '''
-    # Try local model first
+    jd_data = None
+    # Router picks a healthy backend (Ollama first, GPT-4o-mini fallback); the last
+    # attempt goes straight to GPT, as the old local-retries-then-GPT loop did.
     for attempt in range(1, max_retries + 1):
-        print(f"[JD Parser] Attempt {attempt}: Extracting with local model…")
-        output = _call_ollama(prompt, system=system, max_tokens=1000, temperature=0.1)
+        only = ["openai"] if attempt == max_retries and max_retries > 1 else None
+        print(f"[JD Parser] Attempt {attempt}: Extracting JD requirements…")
+        with stage("llm_call", task="jd_extraction", attempt=attempt):
+            output = llm_generate(prompt, system=system, max_tokens=1000, temperature=0.1,
+                                  validate=validate_json, only=only, schema=JD_SCHEMA)
         try:
-            jd_data = json.loads(output)
-            print("[JD Parser] Parsed JSON from local model.")
+            with stage("json_parse", task="jd_extraction"):
+                jd_data = parse_json(output)
+            print("[JD Parser] Parsed JD JSON.")
             break
         except json.JSONDecodeError:
             print(f"[JD Parser] JSON parse failed (attempt {attempt}).")
-            time.sleep(1)
-            jd_data = None
-    '''
-    # Fallback → GPT-4o-mini
     if jd_data is None:
-        print("[JD Parser] Local model failed. Falling back to GPT-4o-mini…")
-        output = gpt_generate(prompt, system=system, max_tokens=1000, temperature=0.4)
-        try:
-            jd_data = json.loads(output)
-            print("[JD Parser] Parsed JSON with GPT-4o-mini.")
-        except json.JSONDecodeError:
-            raise ValueError("Could not parse JD JSON after retries + fallback.")
+        raise ValueError("Could not parse JD JSON after retries + fallback.")
 
     # ---------- add JOB_ID & persist ---------------------------------------
-    job_id = str(uuid.uuid4())          # universal unique ID
+    job_id = job_id or str(uuid.uuid4())          # universal unique ID
     jd_data["JOB_ID"] = job_id
-    _save_json(job_id, jd_data)
+    _save_json(job_id, jd_data, store)
 
     return jd_data
 
-def parse_jd_from_file(jd_path: str) -> dict:
+def parse_jd_from_file(jd_path: str, store=SHARED) -> dict:
     with open(jd_path, "r", encoding="utf-8") as f:
         jd_text = f.read()
-    return extract_jd_requirements(jd_text)
+    return extract_jd_requirements(jd_text, store=store)
 
 # ---------------------- CLI test block --------------------------------------
 if __name__ == "__main__":
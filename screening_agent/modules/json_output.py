@@ -0,0 +1,204 @@
+# json_output.py
+"""
+Structured JSON output for the extraction and scoring prompts.
+
+- JSON schemas for the JD, resume and skill-score responses (strict-mode compatible:
+  every property required, no extra properties, nullable fields typed [..., "null"]).
+- Backend-native constrained decoding: Ollama `format` and OpenAI `response_format`
+  (config/config.yaml → structured_output picks schema / json / off per backend).
+- parse_json(): json.loads, and when that fails a local repair pass — code fences and
+  prose around the object, trailing commas, and output cut off at max_tokens (unclosed
+  strings / brackets are closed, an incomplete last element is dropped). Each repair
+  is a re-generation saved and is counted as `llm_retries_avoided` in the metrics run.
+"""
+
+import re
+import json
+
+from config_loader import get_section
+from logging_module import incr
+
+_FENCE = re.compile(r"```(?:json|JSON)?\s*(.*?)(?:```|$)", re.S)
+
+# ---------- schemas ---------------------------------------------------------
+def _nullable(*types) -> dict:
+    return {"type": [*types, "null"]}
+
+
+def _strings() -> dict:
+    return {"type": "array", "items": {"type": "string"}}
+
+
+def _object(props: dict, title: str | None = None) -> dict:
+    schema = {"type": "object", "properties": props, "required": list(props),
+              "additionalProperties": False}
+    if title:
+        schema["title"] = title
+    return schema
+
+
+JD_SCHEMA = _object({
+    "required_skills": _strings(),
+    "preferred_skills": _strings(),
+    "min_experience_years": _nullable("integer"),
+    "max_experience_years": _nullable("integer", "string"),
+    "required_qualifications": _strings(),
+    "domain": _nullable("string"),
+    "soft_skills": _strings(),
+    "other_notes": _strings(),
+}, "jd_requirements")
+
+RESUME_SCHEMA = _object({
+    "name": _nullable("string"),
+    "email": _nullable("string"),
+    "phone": _nullable("string"),
+    "skills": _strings(),
+    "past_roles": {"type": "array", "items": _object({
+        "title": _nullable("string"), "company": _nullable("string"),
+        "start_month_year": _nullable("string"), "end_month_year": _nullable("string"),
+        "job_duties": _nullable("string")})},
+    "education": {"type": "array", "items": _object({
+        "degree": _nullable("string"), "institution": _nullable("string"),
+        "year": _nullable("string", "integer")})},
+    "certifications": _strings(),
+    "projects": _strings(),
+    "soft_skills": _strings(),
+    "other_notes": _strings(),
+}, "resume")
+
+_SKILL_SCORE = _object({"score": {"type": "integer"},
+                        "reason": {"type": "string"}})
+
+
+def skill_scores_schema(skills: list) -> dict:
+    """{skill: {"score", "reason"}} for exactly these skills."""
+    return _object({s: _SKILL_SCORE for s in skills}, "skill_scores")
+
+
+def skill_batch_schema(keys: list, skills: list) -> dict:
+    """{candidate key: {skill: {"score", "reason"}}} for a scoring batch."""
+    per_candidate = _object({s: _SKILL_SCORE for s in skills})
+    return _object({k: per_candidate for k in keys}, "skill_scores_batch")
+
+# ---------- backend request options -----------------------------------------
+def _mode(backend: str) -> str:
+    return str(get_section("structured_output").get(backend, "schema")).lower()
+
+
+def ollama_format(schema: dict | None):
+    """Value for the Ollama `format` field (a schema, "json"), or None to leave it unset."""
+    mode = _mode("ollama")
+    if schema is None or mode == "off":
+        return None
+    return schema if mode == "schema" else "json"
+
+
+def openai_response_format(schema: dict | None) -> dict | None:
+    """Value for OpenAI `response_format`, or None to leave it unset."""
+    mode = _mode("openai")
+    if schema is None or mode == "off":
+        return None
+    if mode == "schema":
+        return {"type": "json_schema",
+                "json_schema": {"name": schema.get("title", "output"), "strict": True,
+                                "schema": {k: v for k, v in schema.items() if k != "title"}}}
+    return {"type": "json_object"}
+
+# ---------- tolerant parsing ------------------------------------------------
+def _scan(text: str):
+    """
+    Copy the first JSON value out of text, dropping trailing commas. Returns
+    (out, open_stack, in_string, cuts); cuts are (offset, stack) points where the prefix
+    ends on a complete element, so a truncated value can be closed there.
+    """
+    out, stack, cuts = [], [], []
+    in_str = esc = False
+    for ch in text:
+        if in_str:
+            out.append(ch)
+            if esc:
+                esc = False
+            elif ch == "\\":
+                esc = True
+            elif ch == '"':
+                in_str = False
+            continue
+        if ch == '"':
+            in_str = True
+        elif ch in "{[":
+            stack.append(ch)
+            out.append(ch)
+            cuts.append((len(out), tuple(stack)))
+            continue
+        elif ch in "}]":
+            while out and out[-1].isspace():
+                out.pop()
+            if out and out[-1] == ",":
+                out.pop()
+            out.append("}" if stack and stack.pop() == "{" else "]")
+            if not stack:
+                return "".join(out), (), False, []
+            cuts.append((len(out), tuple(stack)))
+            continue
+        elif ch == ",":
+            cuts.append((len(out), tuple(stack)))
+        out.append(ch)
+    return "".join(out), tuple(stack), in_str, cuts
+
+
+def _close(prefix: str, stack) -> str:
+    prefix = prefix.rstrip().rstrip(",")
+    return prefix + "".join("}" if c == "{" else "]" for c in reversed(stack))
+
+
+def repair(text: str):
+    """Best-effort parse of a malformed model response; raises ValueError if nothing fits."""
+    fenced = _FENCE.search(text)
+    body = fenced.group(1) if fenced else text
+    starts = [i for i in (body.find("{"), body.find("[")) if i >= 0]
+    if not starts:
+        raise ValueError("no JSON object or array in model output")
+    out, stack, in_str, cuts = _scan(body[min(starts):])
+    if not stack:
+        attempts = [out]
+    else:           # truncated: close as-is unless mid-string, else drop back to a complete element
+        attempts = ([] if in_str else [_close(out, stack)]) + [_close(out[:i], st) for i, st in reversed(cuts)]
+    for attempt in attempts:
+        try:
+            return json.loads(attempt, strict=False)
+        except json.JSONDecodeError:
+            continue
+    raise ValueError("model output could not be repaired into JSON")
+
+
+def parse_json(text: str, record: bool = True):
+    """
+    json.loads(text), falling back to repair(). Raises json.JSONDecodeError (as
+    json.loads would) only when repair fails too. `record=False` for validators.
+    """
+    try:
+        return json.loads(text)
+    except json.JSONDecodeError as e:
+        error = e
+    try:
+        parsed = repair(text)
+    except ValueError:
+        if record:
+            incr("json_repair_failed")
+        raise error
+    if record:
+        incr("llm_retries_avoided")
+        print(f"[JSON Output] Repaired malformed model output ({error})")
+    return parsed
+
+
+def validate_json(text: str):
+    """`validate=` hook for the LLM cache: accept anything parse_json can read."""
+    return parse_json(text, record=False)
+
+
+if __name__ == "__main__":
+    import sys
+
+    raw = open(sys.argv[1], encoding="utf-8").read() if len(sys.argv) > 1 else sys.stdin.read()
+    print(json.dumps(parse_json(raw), indent=2))
@@ -0,0 +1,209 @@
+# llm_cache.py
+"""
+Content-addressed on-disk cache shared by the Ollama and OpenAI backends.
+
+Key = sha256(model, system, prompt, temperature, max_tokens[, schema]); a
+schema-constrained call never shares an entry with a free-form one. Entries live in a
+single SQLite file so parallel workers can share it. Eviction is by age
+(LLM_CACHE_MAX_AGE_DAYS) and total size (LLM_CACHE_MAX_MB, least recently used
+first). Set LLM_CACHE_DISABLED=1, or pass use_cache=False, to bypass it.
+"""
+
+import os
+import json
+import time
+import sqlite3
+import hashlib
+import threading
+
+from logging_module import incr
+
+BASE_DIR          = os.path.dirname(__file__)
+CACHE_PATH        = os.getenv("LLM_CACHE_PATH", os.path.join(BASE_DIR, "../../data/cache/llm_cache.sqlite"))
+CACHE_DISABLED    = os.getenv("LLM_CACHE_DISABLED", "0") == "1"
+CACHE_MAX_MB      = float(os.getenv("LLM_CACHE_MAX_MB", "512"))
+CACHE_MAX_AGE_DAYS = float(os.getenv("LLM_CACHE_MAX_AGE_DAYS", "30"))
+EVICT_EVERY       = 100          # run eviction once per this many writes
+
+
+def make_key(model: str, system: str | None, prompt: str, temperature: float, max_tokens: int,
+             schema: dict | None = None) -> str:
+    parts = [model, system or "", prompt, float(temperature), int(max_tokens)]
+    if schema is not None:
+        # Canonical dump, so key order in the schema dict doesn't matter. Free-form
+        # calls keep the keys they had before structured output existed.
+        parts.append(json.dumps(schema, sort_keys=True, separators=(",", ":"), ensure_ascii=False))
+    blob = json.dumps(parts, ensure_ascii=False)
+    return hashlib.sha256(blob.encode("utf-8")).hexdigest()
+
+
+class LLMCache:
+    def __init__(self, path: str = CACHE_PATH,
+                 max_bytes: int = int(CACHE_MAX_MB * 1024 * 1024),
+                 max_age_s: float = CACHE_MAX_AGE_DAYS * 86400):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.max_age_s = max_age_s
+        self.stats = {"hits": 0, "misses": 0, "writes": 0, "evicted": 0, "bypassed": 0}
+        self._lock = threading.Lock()
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._db = sqlite3.connect(path, timeout=30, check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS llm_cache ("
+            " key TEXT PRIMARY KEY, model TEXT, response TEXT, size INTEGER,"
+            " created_at REAL, accessed_at REAL)"
+        )
+        self._db.execute("CREATE INDEX IF NOT EXISTS idx_llm_cache_accessed ON llm_cache(accessed_at)")
+        self._db.commit()
+
+    def get(self, key: str) -> str | None:
+        now = time.time()
+        with self._lock:
+            row = self._db.execute(
+                "SELECT response, created_at FROM llm_cache WHERE key = ?", (key,)).fetchone()
+            if row is None or now - row[1] > self.max_age_s:
+                self.stats["misses"] += 1
+                return None
+            self._db.execute("UPDATE llm_cache SET accessed_at = ? WHERE key = ?", (now, key))
+            self._db.commit()
+            self.stats["hits"] += 1
+            return row[0]
+
+    def peek(self, key: str) -> str | None:
+        """Like get(), but a miss is not counted (used to probe alternative backends)."""
+        with self._lock:
+            row = self._db.execute(
+                "SELECT created_at FROM llm_cache WHERE key = ?", (key,)).fetchone()
+        if row is None or time.time() - row[0] > self.max_age_s:
+            return None
+        return self.get(key)
+
+    def put(self, key: str, model: str, response: str):
+        now = time.time()
+        with self._lock:
+            self._db.execute(
+                "INSERT OR REPLACE INTO llm_cache VALUES (?, ?, ?, ?, ?, ?)",
+                (key, model, response, len(response.encode("utf-8")), now, now))
+            self._db.commit()
+            self.stats["writes"] += 1
+            if self.stats["writes"] % EVICT_EVERY == 0:
+                self._evict_locked()
+
+    def evict(self) -> int:
+        with self._lock:
+            return self._evict_locked()
+
+    def _evict_locked(self) -> int:
+        cur = self._db.execute("DELETE FROM llm_cache WHERE created_at < ?",
+                               (time.time() - self.max_age_s,))
+        removed = cur.rowcount
+        total = self._db.execute("SELECT COALESCE(SUM(size), 0) FROM llm_cache").fetchone()[0]
+        if total > self.max_bytes:
+            for key, size in self._db.execute(
+                    "SELECT key, size FROM llm_cache ORDER BY accessed_at").fetchall():
+                if total <= self.max_bytes:
+                    break
+                self._db.execute("DELETE FROM llm_cache WHERE key = ?", (key,))
+                total -= size
+                removed += 1
+        self._db.commit()
+        self.stats["evicted"] += removed
+        return removed
+
+    def clear(self):
+        with self._lock:
+            self._db.execute("DELETE FROM llm_cache")
+            self._db.commit()
+
+    def summary(self) -> dict:
+        with self._lock:
+            entries, size = self._db.execute(
+                "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM llm_cache").fetchone()
+        lookups = self.stats["hits"] + self.stats["misses"]
+        return {**self.stats, "entries": entries, "bytes": size,
+                "hit_rate": round(self.stats["hits"] / lookups, 3) if lookups else None}
+
+
+_cache = None
+
+def get_cache() -> LLMCache:
+    global _cache
+    if _cache is None:
+        _cache = LLMCache()
+    return _cache
+
+
+def _acceptable(response: str, validate) -> bool:
+    if validate is None:
+        return True
+    try:
+        validate(response)
+        return True
+    except Exception:
+        return False
+
+
+def cached_generate(model: str, prompt: str, system: str | None, max_tokens: int,
+                    temperature: float, call, use_cache: bool = True, validate=None,
+                    schema: dict | None = None) -> str:
+    """
+    Return the cached response for this request, or run `call()` and store its result.
+    Only successful responses are cached, and only if `validate(response)` (when given)
+    doesn't raise, so a malformed answer is retried rather than replayed from cache.
+    """
+    if CACHE_DISABLED or not use_cache:
+        if not CACHE_DISABLED:
+            get_cache().stats["bypassed"] += 1
+        return call()
+    cache = get_cache()
+    key = make_key(model, system, prompt, temperature, max_tokens, schema)
+    hit = cache.get(key)
+    if hit is not None:
+        incr("llm_cache_hit")
+        return hit
+    response = call()
+    if _acceptable(response, validate):
+        cache.put(key, model, response)
+    return response
+
+
+async def acached_generate(model: str, prompt: str, system: str | None, max_tokens: int,
+                           temperature: float, acall, use_cache: bool = True,
+                           validate=None, schema: dict | None = None) -> str:
+    """Async twin of cached_generate; `acall` is a coroutine function."""
+    if CACHE_DISABLED or not use_cache:
+        if not CACHE_DISABLED:
+            get_cache().stats["bypassed"] += 1
+        return await acall()
+    cache = get_cache()
+    key = make_key(model, system, prompt, temperature, max_tokens, schema)
+    hit = cache.get(key)
+    if hit is not None:
+        incr("llm_cache_hit")
+        return hit
+    response = await acall()
+    if _acceptable(response, validate):
+        cache.put(key, model, response)
+    return response
+
+
+def lookup(model: str, prompt: str, system: str | None, max_tokens: int,
+           temperature: float, schema: dict | None = None) -> str | None:
+    """Cached response for this request if one exists; never calls a backend."""
+    if CACHE_DISABLED:
+        return None
+    return get_cache().peek(make_key(model, system, prompt, temperature, max_tokens, schema))
+
+
+if __name__ == "__main__":
+    import sys
+    from pprint import pprint
+
+    cache = get_cache()
+    if len(sys.argv) > 1 and sys.argv[1] == "--clear":
+        cache.clear()
+        print(f"[llm_cache] Cleared {cache.path}")
+    elif len(sys.argv) > 1 and sys.argv[1] == "--evict":
+        print(f"[llm_cache] Evicted {cache.evict()} entries")
+    pprint(cache.summary())
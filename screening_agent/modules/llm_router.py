@@ -0,0 +1,273 @@
+# llm_router.py
+"""
+Health-aware routing across LLM backends.
+
+Each backend gets a circuit breaker (closed → open after N consecutive failures →
+half-open after a cool-down, where one trial call decides). An optional background
+probe trips or re-arms breakers without waiting for real traffic, and an optional
+hedge fires the next backend when the current one exceeds a latency budget.
+"""
+
+import time
+import asyncio
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+
+CLOSED, OPEN, HALF_OPEN = "closed", "open", "half_open"
+
+
+class CircuitBreaker:
+    def __init__(self, failure_threshold: int = 3, reset_timeout: float = 30.0):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = CLOSED
+        self.failures = 0
+        self.opened_at = 0.0
+        self._trial_running = False
+        self._lock = threading.Lock()
+
+    def _cool_down(self):
+        if self.state == OPEN and time.monotonic() - self.opened_at >= self.reset_timeout:
+            self.state = HALF_OPEN
+
+    def ready(self) -> bool:
+        """Would a call be let through right now? (does not claim the half-open trial)"""
+        with self._lock:
+            self._cool_down()
+            return self.state == CLOSED or (self.state == HALF_OPEN and not self._trial_running)
+
+    def allow(self) -> bool:
+        with self._lock:
+            self._cool_down()
+            if self.state == CLOSED:
+                return True
+            if self.state == HALF_OPEN and not self._trial_running:
+                self._trial_running = True      # let exactly one trial call through
+                return True
+            return False
+
+    def record_success(self):
+        with self._lock:
+            self.state, self.failures, self._trial_running = CLOSED, 0, False
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            self._trial_running = False
+            if self.state == HALF_OPEN or self.failures >= self.failure_threshold:
+                self.state, self.opened_at = OPEN, time.monotonic()
+
+    def release(self):
+        """Give back a claimed half-open trial without judging the backend (e.g. the call was cancelled)."""
+        with self._lock:
+            self._trial_running = False
+
+    def trip(self):
+        with self._lock:
+            self.state, self.opened_at, self._trial_running = OPEN, time.monotonic(), False
+
+    def rearm(self):
+        # Probe says the backend is back: allow a trial call right away.
+        with self._lock:
+            if self.state == OPEN:
+                self.state = HALF_OPEN
+
+
+class BackendStats:
+    def __init__(self, window: int = 500):
+        self.calls = 0
+        self.errors = 0
+        self.latencies = deque(maxlen=window)
+        self._lock = threading.Lock()
+
+    def record(self, seconds: float, ok: bool):
+        with self._lock:
+            self.calls += 1
+            if ok:
+                self.latencies.append(seconds)
+            else:
+                self.errors += 1
+
+    def summary(self) -> dict:
+        with self._lock:
+            lat = sorted(self.latencies)
+            calls, errors = self.calls, self.errors
+
+        def pct(p):
+            return round(lat[min(len(lat) - 1, int(p * len(lat)))] * 1000, 1) if lat else None
+
+        return {
+            "calls": calls,
+            "errors": errors,
+            "error_rate": round(errors / calls, 3) if calls else None,
+            "mean_ms": round(sum(lat) / len(lat) * 1000, 1) if lat else None,
+            "p50_ms": pct(0.50),
+            "p95_ms": pct(0.95),
+        }
+
+
+class Backend:
+    def __init__(self, name: str, call, probe=None,
+                 failure_threshold: int = 3, reset_timeout: float = 30.0):
+        self.name = name
+        self.call = call            # call(prompt, system, max_tokens, temperature, **kw) -> str
+        self.probe = probe          # probe() -> bool, optional
+        self.breaker = CircuitBreaker(failure_threshold, reset_timeout)
+        self.stats = BackendStats()
+
+
+class NoBackendAvailable(RuntimeError):
+    pass
+
+
+class CircuitOpen(RuntimeError):
+    pass
+
+
+class Router:
+    def __init__(self, backends: list, hedge_after: float | None = None,
+                 probe_interval: float = 0.0):
+        self.backends = backends
+        self.hedge_after = hedge_after or None
+        self.probe_interval = probe_interval
+        self.hedges = {"fired": 0, "won": 0}
+        self._pool = ThreadPoolExecutor(max_workers=max(2, 2 * len(backends)),
+                                        thread_name_prefix="llm-router")
+        self._probe_thread = None
+        if probe_interval > 0 and any(b.probe for b in backends):
+            self._probe_thread = threading.Thread(target=self._probe_loop, daemon=True,
+                                                  name="llm-health-probe")
+            self._probe_thread.start()
+
+    # ---------- health ------------------------------------------------------
+    def _probe_loop(self):
+        while True:
+            self.probe_once()
+            time.sleep(self.probe_interval)
+
+    def probe_once(self):
+        for b in self.backends:
+            if not b.probe:
+                continue
+            try:
+                healthy = b.probe()
+            except Exception:
+                healthy = False
+            if healthy:
+                b.breaker.rearm()
+            elif b.breaker.state != OPEN:
+                print(f"[llm_router] Health probe failed for {b.name}; opening circuit.")
+                b.breaker.trip()
+
+    def backend(self, name: str) -> Backend | None:
+        return next((b for b in self.backends if b.name == name), None)
+
+    def available(self, name: str) -> bool:
+        """Would a call to `name` be let through now (cool-down applied, trial not claimed)?"""
+        b = self.backend(name)
+        return b is not None and b.breaker.ready()
+
+    # ---------- calls -------------------------------------------------------
+    @staticmethod
+    def _claim(backend: Backend, force: bool):
+        if not backend.breaker.allow() and not force:
+            raise CircuitOpen(f"circuit for {backend.name} is open")
+
+    @staticmethod
+    def _done(backend: Backend, start: float, ok: bool):
+        backend.stats.record(time.perf_counter() - start, ok=ok)
+        if ok:
+            backend.breaker.record_success()
+        else:
+            backend.breaker.record_failure()
+
+    def _invoke(self, backend: Backend, args, kwargs, force: bool = False):
+        self._claim(backend, force)
+        start = time.perf_counter()
+        try:
+            out = backend.call(*args, **kwargs)
+        except Exception:
+            self._done(backend, start, ok=False)
+            raise
+        self._done(backend, start, ok=True)
+        return out
+
+    async def ainvoke(self, backend: Backend, acall, force: bool = False):
+        """
+        Async counterpart of a single routed call: `await acall()` behind the same
+        breaker (half-open lets one trial through) and into the same BackendStats.
+        """
+        self._claim(backend, force)
+        start = time.perf_counter()
+        try:
+            out = await acall()
+        except asyncio.CancelledError:
+            backend.breaker.release()        # says nothing about the backend; free a half-open trial
+            raise
+        except Exception:
+            self._done(backend, start, ok=False)
+            raise
+        self._done(backend, start, ok=True)
+        return out
+
+    def generate(self, prompt: str, system: str | None = None, max_tokens: int = 1000,
+                 temperature: float = 0.4, only: list[str] | None = None, **kwargs) -> str:
+        """
+        Call the first healthy backend, falling through on errors. Backends whose
+        circuit is open are skipped; if every circuit is open the last one is tried anyway.
+        """
+        pool = [b for b in self.backends if only is None or b.name in only]
+        if not pool:
+            raise NoBackendAvailable(f"No backend matches {only}")
+        ready = [b for b in pool if b.breaker.ready()]
+        args = (prompt, system, max_tokens, temperature)
+        if not ready:
+            return self._invoke(pool[-1], args, kwargs, force=True)
+        if self.hedge_after and len(ready) > 1:
+            return self._hedged(ready, args, kwargs)
+        last_exc = None
+        for b in ready:
+            try:
+                return self._invoke(b, args, kwargs)
+            except Exception as e:
+                print(f"[llm_router] {b.name} failed ({type(e).__name__}: {e}); trying next backend.")
+                last_exc = e
+        raise last_exc
+
+    def _hedged(self, ready, args, kwargs):
+        pending, futures = list(ready), {}
+        last_exc = None
+
+        def launch():
+            b = pending.pop(0)
+            futures[self._pool.submit(self._invoke, b, args, kwargs)] = b
+
+        launch()
+        while futures:
+            done, _ = wait(futures, timeout=self.hedge_after if pending else None,
+                           return_when=FIRST_COMPLETED)
+            if not done:
+                # Latency budget blown: race the next backend against the slow one.
+                self.hedges["fired"] += 1
+                launch()
+                continue
+            for f in done:
+                backend = futures.pop(f)
+                try:
+                    out = f.result()
+                except Exception as e:
+                    print(f"[llm_router] {backend.name} failed ({type(e).__name__}: {e}).")
+                    last_exc = e
+                    continue
+                if backend is not ready[0]:
+                    self.hedges["won"] += 1
+                return out
+            if not futures and pending:
+                launch()            # everything in flight failed: fail over immediately
+        raise last_exc
+
+    def stats(self) -> dict:
+        out = {b.name: {**b.stats.summary(), "circuit": b.breaker.state} for b in self.backends}
+        out["hedges"] = dict(self.hedges)
+        return out
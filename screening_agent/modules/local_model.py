@@ -2,50 +2,170 @@
 """
 local_generate(prompt, system, …) will try the local Ollama model first.
 If Ollama is unreachable or OLLAMA_DISABLED=1, it falls back to GPT‑4o‑mini.
+Routing goes through llm_router: a circuit breaker (plus optional background
+health probe) stops a dead Ollama box from costing a timeout on every call.
 """
 
-import os, json, textwrap, requests
-from requests.exceptions import RequestException, Timeout
+import os, json, time, textwrap, requests
+from logging_module import record_llm_call, incr
 from openai_model import generate as gpt_generate   # fallback
+from openai_model import agenerate as gpt_agenerate
+from openai_model import MODEL as GPT_MODEL
+from llm_cache import cached_generate, acached_generate, lookup as cache_lookup
+from async_llm import run_limited, http_client, estimate_tokens
+from llm_router import Router, Backend, CircuitOpen
+from json_output import ollama_format
 
 OLLAMA_DISABLED = os.getenv("OLLAMA_DISABLED", "0") == "1"
 OLLAMA_HOST     = os.getenv("OLLAMA_HOST", "http://localhost:11434")
 OLLAMA_MODEL    = os.getenv("OLLAMA_MODEL", "orca-mini")
+OLLAMA_TIMEOUT  = float(os.getenv("OLLAMA_TIMEOUT", "20"))
+OLLAMA_PROBE_S  = float(os.getenv("OLLAMA_PROBE_S", "15"))      # 0 = no background probe
+HEDGE_AFTER_S   = float(os.getenv("LLM_HEDGE_AFTER_S", "0"))    # 0 = no hedged requests
 URL             = f"{OLLAMA_HOST}/api/generate"
 HEADERS         = {"Content-Type": "application/json"}
+SESSION         = requests.Session()     # keep-alive pool for the sync path
+DEFAULT_SYSTEM  = "You are an HR assistant who writes concise draft job descriptions."
 
-print(f"[local_model] {OLLAMA_MODEL} Disabled Flag = {OLLAMA_DISABLED}")
-
-def _call_ollama(prompt: str, system: str | None, max_tokens: int, temperature: float):
-    print("[local_model] → Trying Ollama")
-    payload = {
-        "model": OLLAMA_MODEL,
-        "prompt": textwrap.dedent(prompt).strip(),
-        "stream": False,
-        "options": {"num_predict": max_tokens, "temperature": temperature},
-    }
-    if system:
-        payload["system"] = system
-    r = requests.post(URL, headers=HEADERS, data=json.dumps(payload), timeout=20)
-    r.raise_for_status()
-    return r.json()["response"].strip()
+def _record(body: dict, latency_s: float) -> str:
+    # Ollama reports token counts as prompt_eval_count / eval_count.
+    record_llm_call("ollama", OLLAMA_MODEL, latency_s,
+                    body.get("prompt_eval_count"), body.get("eval_count"))
+    return body["response"].strip()
+
+def _call_ollama(prompt: str, system: str | None, max_tokens: int, temperature: float,
+                 use_cache: bool = True, validate=None, schema=None):
+    prompt = textwrap.dedent(prompt).strip()
+    fmt = ollama_format(schema)
+
+    def _call():
+        print("[local_model] → Trying Ollama")
+        payload = {
+            "model": OLLAMA_MODEL,
+            "prompt": prompt,
+            "stream": False,
+            "options": {"num_predict": max_tokens, "temperature": temperature},
+        }
+        if system:
+            payload["system"] = system
+        if fmt is not None:
+            payload["format"] = fmt
+        t0 = time.perf_counter()
+        r = SESSION.post(URL, headers=HEADERS, data=json.dumps(payload), timeout=OLLAMA_TIMEOUT)
+        r.raise_for_status()
+        return _record(r.json(), time.perf_counter() - t0)
+
+    return cached_generate(f"ollama:{OLLAMA_MODEL}", prompt, system, max_tokens, temperature,
+                           _call, use_cache=use_cache, validate=validate, schema=schema)
+
+def _call_gpt(prompt: str, system: str | None, max_tokens: int, temperature: float, **kwargs):
+    return gpt_generate(prompt, system or DEFAULT_SYSTEM, max_tokens=max_tokens,
+                        temperature=temperature, **kwargs)
+
+def _probe_ollama() -> bool:
+    return SESSION.get(f"{OLLAMA_HOST}/api/tags", timeout=2).ok
+
+_router = None
+
+def get_router() -> Router:
+    """Process-wide Ollama → GPT router (created on first use)."""
+    global _router
+    if _router is None:
+        print(f"[local_model] {OLLAMA_MODEL} Disabled Flag = {OLLAMA_DISABLED}")
+        backends = [Backend("openai", _call_gpt)]
+        if not OLLAMA_DISABLED:
+            backends.insert(0, Backend("ollama", _call_ollama, probe=_probe_ollama))
+        _router = Router(backends, hedge_after=HEDGE_AFTER_S, probe_interval=OLLAMA_PROBE_S)
+    return _router
+
+def _cached_any(prompt, system, max_tokens, temperature, schema=None):
+    # A cached answer from either backend avoids probing Ollama at all on re-runs.
+    key_prompt = textwrap.dedent(prompt).strip()
+    candidates = [(f"openai:{GPT_MODEL}", system or DEFAULT_SYSTEM)]
+    if not OLLAMA_DISABLED:
+        candidates.insert(0, (f"ollama:{OLLAMA_MODEL}", system))
+    for model, sys_prompt in candidates:
+        hit = cache_lookup(model, key_prompt, sys_prompt, max_tokens, temperature, schema)
+        if hit is not None:
+            return hit
+    return None
 
 def generate(prompt: str,
              system: str | None = None,
              max_tokens: int = 1000,
-             temperature: float = 0.4) -> str:
+             temperature: float = 0.4,
+             use_cache: bool = True,
+             validate=None,
+             only: list[str] | None = None,
+             schema: dict | None = None) -> str:
     """
     Unified interface for draft / feedback loops.
-    Tries Ollama; falls back to GPT‑4o‑mini on failure or when disabled.
+    Tries Ollama; falls back to GPT‑4o‑mini on failure, open circuit or when disabled.
+    Both backends go through the shared LLM cache unless use_cache=False.
+    `only` restricts routing to the named backends ("ollama", "openai").
+    `schema` (json_output) asks both backends for schema-constrained JSON.
     """
-    if not OLLAMA_DISABLED:
+    if use_cache:
+        hit = _cached_any(prompt, system, max_tokens, temperature, schema)
+        if hit is not None:
+            incr("llm_cache_hit")
+            return hit
+    return get_router().generate(prompt, system, max_tokens, temperature, only=only,
+                                 use_cache=use_cache, validate=validate, schema=schema)
+
+
+async def _acall_ollama(prompt: str, system: str | None, max_tokens: int, temperature: float,
+                        use_cache: bool = True, validate=None, schema=None):
+    prompt = textwrap.dedent(prompt).strip()
+    fmt = ollama_format(schema)
+
+    async def _call():
+        payload = {
+            "model": OLLAMA_MODEL,
+            "prompt": prompt,
+            "stream": False,
+            "options": {"num_predict": max_tokens, "temperature": temperature},
+        }
+        if system:
+            payload["system"] = system
+        if fmt is not None:
+            payload["format"] = fmt
+        t0 = time.perf_counter()
+        r = await http_client().post(URL, headers=HEADERS, content=json.dumps(payload),
+                                     timeout=OLLAMA_TIMEOUT)
+        r.raise_for_status()
+        return _record(r.json(), time.perf_counter() - t0)
+
+    tokens = estimate_tokens(system) + estimate_tokens(prompt) + max_tokens
+    return await acached_generate(f"ollama:{OLLAMA_MODEL}", prompt, system, max_tokens, temperature,
+                                  lambda: run_limited("ollama", tokens, _call),
+                                  use_cache=use_cache, validate=validate, schema=schema)
+
+async def agenerate(prompt: str,
+                    system: str | None = None,
+                    max_tokens: int = 1000,
+                    temperature: float = 0.4,
+                    use_cache: bool = True,
+                    validate=None,
+                    schema: dict | None = None) -> str:
+    """Async generate(): Ollama over the shared connection pool, GPT fallback on failure."""
+    import httpx
+
+    if use_cache:
+        hit = _cached_any(prompt, system, max_tokens, temperature, schema)
+        if hit is not None:
+            incr("llm_cache_hit")
+            return hit
+    router = get_router()
+    ollama = router.backend("ollama")
+    if ollama is not None:
         try:
-            return _call_ollama(prompt, system, max_tokens, temperature)
-        except (RequestException, Timeout) as e:
-            # Log once, then continue to fallback
+            return await router.ainvoke(ollama, lambda: _acall_ollama(
+                prompt, system, max_tokens, temperature, use_cache=use_cache, validate=validate, schema=schema))
+        except CircuitOpen:
+            pass
+        except httpx.HTTPError as e:
             print("[local_model] Ollama unavailable – using GPT‑4o‑mini. Reason:", e)
-    else:
-        print("[local_model] Ollama disabled, using GPT‑4o directly")
-    # --- Fallback ---
-    fallback_system = system or "You are an HR assistant who writes concise draft job descriptions."
-    return gpt_generate(prompt, fallback_system, max_tokens=max_tokens, temperature=temperature)
+    return await router.ainvoke(router.backend("openai"), lambda: gpt_agenerate(
+        prompt, system or DEFAULT_SYSTEM, max_tokens=max_tokens, temperature=temperature,
+        use_cache=use_cache, validate=validate, schema=schema), force=True)
@@ -0,0 +1,300 @@
+# logging_module.py
+"""
+Structured per-stage instrumentation for the screening pipeline.
+
+    with stage("text_extraction", path=p): ...
+    @timed("duty_alignment")
+    def align_duties(...): ...
+    record_llm_call("openai", MODEL, latency_s, prompt_tokens, completion_tokens)
+
+Off by default (SCREENING_METRICS=1 or enable()). While off, stage() hands back
+one shared no-op context and every other call returns on a single flag check,
+so instrumented code costs well under a microsecond per stage. While on, events accumulate in
+the current run (start_run / end_run, or the `run()` context) and each run is
+written to data/traces/<run_id>.jsonl with a summary record at the end.
+"""
+
+import os
+import json
+import time
+import uuid
+import threading
+import functools
+import contextvars
+from bisect import bisect_left
+
+ENABLED   = os.getenv("SCREENING_METRICS", "0") == "1"
+TRACE_DIR = os.getenv("SCREENING_TRACE_DIR",
+                      os.path.join(os.path.dirname(__file__), "../../data/traces"))
+
+# USD per 1M tokens (input, output). Local models are free.
+PRICING = {
+    "gpt-4o-mini": (0.15, 0.60),
+    "gpt-4o":      (2.50, 10.00),
+}
+LATENCY_BUCKETS_MS = (1, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000, 30000, 60000)
+
+_parent = contextvars.ContextVar("stage_parent", default=None)
+
+
+def enable(flag: bool = True):
+    global ENABLED
+    ENABLED = flag
+
+
+def estimate_cost(model: str, prompt_tokens: int | None, completion_tokens: int | None) -> float:
+    price_in, price_out = PRICING.get(model, (0.0, 0.0))
+    return ((prompt_tokens or 0) * price_in + (completion_tokens or 0) * price_out) / 1_000_000
+
+# ---------- aggregation -----------------------------------------------------
+class Histogram:
+    """Fixed-bucket latency histogram (ms); quantiles are bucket upper bounds, capped at max."""
+
+    def __init__(self, buckets=LATENCY_BUCKETS_MS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.count, self.total, self.max = 0, 0.0, 0.0
+
+    def observe(self, ms: float):
+        self.counts[bisect_left(self.buckets, ms)] += 1
+        self.count += 1
+        self.total += ms
+        self.max = max(self.max, ms)
+
+    def quantile(self, q: float) -> float:
+        if not self.count:
+            return 0.0
+        rank, seen = q * self.count, 0
+        for i, c in enumerate(self.counts):
+            seen += c
+            if seen >= rank and c:
+                return min(float(self.buckets[i]), self.max) if i < len(self.buckets) else self.max
+        return self.max
+
+    def to_dict(self) -> dict:
+        return {"count": self.count, "total_ms": round(self.total, 3),
+                "mean_ms": round(self.total / self.count, 3) if self.count else 0.0,
+                "p50_ms": self.quantile(0.5), "p95_ms": self.quantile(0.95),
+                "max_ms": round(self.max, 3),
+                "buckets": {(f"le_{b}" if i < len(self.buckets) else "inf"): c
+                            for i, (b, c) in enumerate(zip((*self.buckets, None), self.counts)) if c}}
+
+
+class Run:
+    """Events and aggregates for one screening job."""
+
+    def __init__(self, job_id: str | None = None, **attrs):
+        self.run_id = job_id or uuid.uuid4().hex[:12]
+        self.attrs = attrs
+        self.started = time.time()
+        self.events = []
+        self.stages = {}        # name -> Histogram
+        self.backends = {}      # backend -> Histogram
+        self.tokens = {}        # backend -> {"prompt_tokens": n, "completion_tokens": n, "cost_usd": x}
+        self.counters = {}
+        self._lock = threading.Lock()
+
+    def emit(self, event: dict):
+        with self._lock:
+            self.events.append(event)
+            if event["type"] == "stage":
+                self.stages.setdefault(event["stage"], Histogram()).observe(event["ms"])
+            elif event["type"] == "llm":
+                b = event["backend"]
+                self.backends.setdefault(b, Histogram()).observe(event["ms"])
+                t = self.tokens.setdefault(b, {"prompt_tokens": 0, "completion_tokens": 0, "cost_usd": 0.0})
+                t["prompt_tokens"] += event.get("prompt_tokens") or 0
+                t["completion_tokens"] += event.get("completion_tokens") or 0
+                t["cost_usd"] += event.get("cost_usd") or 0.0
+
+    def incr(self, name: str, n: int = 1):
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + n
+
+    def summary(self) -> dict:
+        with self._lock:
+            return {
+                "type": "summary", "run_id": self.run_id,
+                "wall_s": round(time.time() - self.started, 3),
+                "stages": {k: h.to_dict() for k, h in self.stages.items()},
+                "llm": {k: {**h.to_dict(), **self.tokens[k],
+                            "cost_usd": round(self.tokens[k]["cost_usd"], 6)}
+                        for k, h in self.backends.items()},
+                "counters": dict(self.counters),
+            }
+
+    def write(self, trace_dir: str = None) -> str:
+        trace_dir = trace_dir or TRACE_DIR
+        os.makedirs(trace_dir, exist_ok=True)
+        path = os.path.join(trace_dir, f"{self.run_id}.jsonl")
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(json.dumps({"type": "run", "run_id": self.run_id, "started": self.started,
+                                **self.attrs}) + "\n")
+            for ev in self.events:
+                f.write(json.dumps(ev, default=str) + "\n")
+            f.write(json.dumps(self.summary()) + "\n")
+        return path
+
+
+_run: Run | None = None
+_run_lock = threading.Lock()
+
+
+def current_run() -> Run:
+    """Active run; one is started implicitly the first time something is recorded."""
+    global _run
+    if _run is None:
+        with _run_lock:
+            if _run is None:
+                _run = Run()
+    return _run
+
+
+def start_run(job_id: str | None = None, **attrs) -> Run:
+    global _run
+    with _run_lock:
+        _run = Run(job_id, **attrs)
+    return _run
+
+
+def end_run(write: bool = True, show: bool = True) -> dict | None:
+    """Close the active run: write its JSONL trace, print the summary table, return the summary."""
+    global _run
+    with _run_lock:
+        active, _run = _run, None
+    if active is None or not ENABLED:
+        return None
+    summary = active.summary()
+    if write:
+        path = active.write()
+        print(f"[Metrics] Trace written to {path}")
+    if show:
+        print(format_summary(summary))
+    return summary
+
+
+class run:
+    """`with run(job_id): ...` → start_run / end_run."""
+
+    def __init__(self, job_id: str | None = None, write: bool = True, show: bool = True, **attrs):
+        self.job_id, self.write, self.show, self.attrs = job_id, write, show, attrs
+        self.summary = None
+
+    def __enter__(self):
+        return start_run(self.job_id, **self.attrs) if ENABLED else None
+
+    def __exit__(self, *exc):
+        self.summary = end_run(self.write, self.show)
+
+# ---------- recording -------------------------------------------------------
+class _NoopStage:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def set(self, **attrs):
+        pass
+
+
+_NOOP = _NoopStage()
+
+
+class _Stage:
+    __slots__ = ("name", "attrs", "t0", "token")
+
+    def __init__(self, name, attrs):
+        self.name, self.attrs = name, attrs
+
+    def set(self, **attrs):
+        """Attach attributes discovered inside the stage (e.g. cache hit, item count)."""
+        self.attrs.update(attrs)
+
+    def __enter__(self):
+        self.token = _parent.set(self.name)
+        self.t0 = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        ms = (time.perf_counter() - self.t0) * 1000
+        _parent.reset(self.token)
+        event = {"type": "stage", "stage": self.name, "ts": time.time(), "ms": round(ms, 3),
+                 "parent": _parent.get(), **self.attrs}
+        if exc_type is not None:
+            event["error"] = exc_type.__name__
+        current_run().emit(event)
+        return False
+
+
+def stage(name: str, **attrs):
+    """Timing context for one pipeline stage; a shared no-op when metrics are off."""
+    if not ENABLED:
+        return _NOOP
+    return _Stage(name, attrs)
+
+
+def timed(name: str):
+    """Decorator form of stage()."""
+    def deco(fn):
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            if not ENABLED:
+                return fn(*args, **kwargs)
+            with _Stage(name, {}):
+                return fn(*args, **kwargs)
+        return wrapper
+    return deco
+
+
+def record_llm_call(backend: str, model: str, latency_s: float,
+                    prompt_tokens: int | None = None, completion_tokens: int | None = None, **attrs):
+    """One completed (non-cached) LLM request: latency, token usage and estimated cost."""
+    if not ENABLED:
+        return
+    current_run().emit({
+        "type": "llm", "backend": backend, "model": model, "ts": time.time(),
+        "ms": round(latency_s * 1000, 3), "parent": _parent.get(),
+        "prompt_tokens": prompt_tokens, "completion_tokens": completion_tokens,
+        "cost_usd": round(estimate_cost(model, prompt_tokens, completion_tokens), 8), **attrs,
+    })
+
+
+def incr(name: str, n: int = 1):
+    """Bump a named counter (cache hits, retries, …) in the current run."""
+    if ENABLED:
+        current_run().incr(name, n)
+
+# ---------- reporting -------------------------------------------------------
+def format_summary(summary: dict) -> str:
+    lines = [f"[Metrics] Run {summary['run_id']}  wall {summary['wall_s']}s",
+             f"{'stage':<22} {'count':>6} {'total_ms':>11} {'mean_ms':>9} {'p50':>7} {'p95':>7} {'max_ms':>9}"]
+    for name, h in sorted(summary["stages"].items(), key=lambda kv: -kv[1]["total_ms"]):
+        lines.append(f"{name:<22} {h['count']:>6} {h['total_ms']:>11.1f} {h['mean_ms']:>9.1f} "
+                     f"{h['p50_ms']:>7.0f} {h['p95_ms']:>7.0f} {h['max_ms']:>9.1f}")
+    if summary["llm"]:
+        lines.append(f"{'llm backend':<22} {'calls':>6} {'p50':>7} {'p95':>7} "
+                     f"{'prompt_tok':>11} {'compl_tok':>10} {'cost_usd':>10}")
+        for name, h in summary["llm"].items():
+            lines.append(f"{name:<22} {h['count']:>6} {h['p50_ms']:>7.0f} {h['p95_ms']:>7.0f} "
+                         f"{h['prompt_tokens']:>11} {h['completion_tokens']:>10} {h['cost_usd']:>10.4f}")
+    if summary["counters"]:
+        lines.append("counters: " + ", ".join(f"{k}={v}" for k, v in sorted(summary["counters"].items())))
+    return "\n".join(lines)
+
+
+def load_trace(path: str) -> list:
+    with open(path, "r", encoding="utf-8") as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+if __name__ == "__main__":
+    import sys
+
+    if len(sys.argv) < 2:
+        print("usage: python logging_module.py data/traces/<run_id>.jsonl")
+        sys.exit(1)
+    records = load_trace(sys.argv[1])
+    print(format_summary(next(r for r in reversed(records) if r["type"] == "summary")))
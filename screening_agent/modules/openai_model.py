@@ -1,22 +1,86 @@
 # openai_model.py
-from dotenv import load_dotenv
-from openai import OpenAI
+import time
 import textwrap
+from logging_module import record_llm_call
+from llm_cache import cached_generate, acached_generate
+from async_llm import run_limited, estimate_tokens, openai_client
+from json_output import openai_response_format
 
-load_dotenv()
-client = OpenAI()
 MODEL = "gpt-4o-mini"     # or "gpt-4o"
+_client = None
+
+def get_client():
+    """OpenAI client, created (and .env loaded) on first use rather than at import."""
+    global _client
+    if _client is None:
+        from dotenv import load_dotenv
+        from openai import OpenAI
+        load_dotenv()
+        _client = OpenAI()
+    return _client
+
+def _record(resp, latency_s: float):
+    usage = getattr(resp, "usage", None)
+    record_llm_call("openai", MODEL, latency_s,
+                    getattr(usage, "prompt_tokens", None), getattr(usage, "completion_tokens", None))
+
+def _format_kwargs(schema: dict | None) -> dict:
+    response_format = openai_response_format(schema)
+    return {"response_format": response_format} if response_format else {}
 
 def generate(prompt: str,
              system: str,
              max_tokens: int = 1500,
-             temperature: float = 0.4) -> str:
+             temperature: float = 0.4,
+             use_cache: bool = True,
+             validate=None,
+             schema: dict | None = None) -> str:
+    """`schema` requests structured output (response_format) for JSON answers."""
+    prompt = textwrap.dedent(prompt).strip()
+    extra = _format_kwargs(schema)
+
+    def _call():
+        t0 = time.perf_counter()
+        resp = get_client().chat.completions.create(
+            model=MODEL,
+            messages=[{"role": "system", "content": system},
+                      {"role": "user", "content": prompt}],
+            temperature=temperature,
+            max_tokens=max_tokens,
+            **extra
+        )
+        _record(resp, time.perf_counter() - t0)
+        return resp.choices[0].message.content.strip()
+
+    return cached_generate(f"openai:{MODEL}", prompt, system, max_tokens, temperature,
+                           _call, use_cache=use_cache, validate=validate, schema=schema)
+
+
+async def agenerate(prompt: str,
+                    system: str,
+                    max_tokens: int = 1500,
+                    temperature: float = 0.4,
+                    use_cache: bool = True,
+                    validate=None,
+                    schema: dict | None = None) -> str:
+    """Async generate(); the client, concurrency and RPM/TPM limits come from async_llm (per event loop)."""
     prompt = textwrap.dedent(prompt).strip()
-    resp = client.chat.completions.create(
-        model=MODEL,
-        messages=[{"role": "system", "content": system},
-                  {"role": "user", "content": prompt}],
-        temperature=temperature,
-        max_tokens=max_tokens
-    )
-    return resp.choices[0].message.content.strip()
+    extra = _format_kwargs(schema)
+
+    async def _call():
+        t0 = time.perf_counter()
+        resp = await openai_client().chat.completions.create(
+            model=MODEL,
+            messages=[{"role": "system", "content": system},
+                      {"role": "user", "content": prompt}],
+            temperature=temperature,
+            max_tokens=max_tokens,
+            **extra
+        )
+        _record(resp, time.perf_counter() - t0)
+        return resp.choices[0].message.content.strip()
+
+    tokens = estimate_tokens(system) + estimate_tokens(prompt) + max_tokens
+    return await acached_generate(f"openai:{MODEL}", prompt, system, max_tokens, temperature,
+                                  lambda: run_limited("openai", tokens, _call),
+                                  use_cache=use_cache, validate=validate, schema=schema)
@@ -0,0 +1,238 @@
+# prompt_compaction.py
+"""
+Shrink resume / JD text before it is substituted into an extraction prompt.
+
+    text, report = compact_resume(raw_text)
+    text, report = compact_jd(raw_text)
+
+1. Normalise: bullet glyphs → "-", runs of spaces/tabs → one space, blank-line runs → one.
+2. Drop boilerplate lines (page numbers, "Curriculum Vitae", "References available on
+   request") and boilerplate sections (declarations; JD benefits / how-to-apply / EEO).
+3. Drop page furniture: a contact/name line repeated later in the document, any other
+   line of the top block (a headline) only where it repeats right after a page break,
+   a section header repeated after a page break (its body is merged into the first
+   one), and consecutive duplicate lines.
+4. Fit the token budget by trimming the lowest-priority sections first, from the bottom
+   up (older roles and trailing bullets go before the contact block or skills).
+
+Sections come from resume_scraper_nlp.split_sections (the same headers the NLP parser
+uses); tokens are counted with async_llm.estimate_tokens. Budgets and priorities live in
+config/config.yaml → prompt_compaction. The report holds tokens before/after/saved and
+what was dropped; saved tokens are also counted in the metrics run.
+"""
+
+import re
+
+from async_llm import estimate_tokens
+from config_loader import get_section
+from logging_module import stage, incr
+from resume_scraper_nlp import SECTION_HEADERS, split_sections
+from text_extraction import PAGE_BREAK
+
+CHARS_PER_TOKEN = 4          # same rule of thumb as estimate_tokens
+
+DEFAULTS = {
+    "enabled": True,
+    "resume": {
+        "budget_tokens": 1500,
+        # Highest first; "header" is everything above the first section heading.
+        "priority": ["header", "experience", "skills", "education", "certifications", "projects"],
+        "drop_sections": ["declaration", "references"],
+    },
+    "jd": {
+        "budget_tokens": 1200,
+        "priority": ["header", "requirements", "responsibilities", "preferred", "about"],
+        "drop_sections": ["benefits", "apply", "eeo"],
+    },
+}
+
+# Headings only compaction cares about; matched like SECTION_HEADERS (line starts with).
+RESUME_EXTRA_HEADERS = {
+    'declaration': ['declaration'],
+    'references': ['references', 'referees'],
+}
+JD_HEADERS = {
+    'about': ['about us', 'about the company', 'about the team', 'who we are', 'company overview'],
+    'responsibilities': ['responsibilities', 'key responsibilities', 'what you will do',
+                         "what you'll do", 'the role', 'role overview', 'duties'],
+    'requirements': ['requirements', 'qualifications', 'required skills', 'must have',
+                     'what you bring', "what we're looking for", 'what we are looking for',
+                     'who you are', 'skills'],
+    'preferred': ['preferred', 'nice to have', 'good to have', 'bonus points'],
+    'benefits': ['benefits', 'perks', 'what we offer', 'compensation and benefits', 'why join us'],
+    'apply': ['how to apply', 'to apply'],
+    'eeo': ['equal opportunity', 'equal employment opportunity', 'eeo statement'],
+}
+
+BOILERPLATE = [re.compile(p, re.I) for p in (
+    r"^page \d+( of \d+)?$",
+    r"^\d{1,2}( ?/ ?\d{1,2})?$",                       # bare page numbers
+    r"^(curriculum vitae|resume|résumé|cv)$",
+    r"^references( are)? (available )?(up)?on request\.?$",
+    r"^i hereby declare\b",
+    r"^confidential\b.{0,40}$",
+)]
+_BULLETS = re.compile(r"^[•●▪■‣⁃◦➢✓✔*·]+\s*")
+_SPACES  = re.compile(r"[ \t\u00a0\u200b]+")
+_CONTACT = re.compile(r"@|https?://|www\.|linkedin|github|(\d[\s().-]*){7}", re.I)
+
+
+def _cfg(kind: str) -> tuple[bool, dict]:
+    section = get_section("prompt_compaction")
+    return section.get("enabled", DEFAULTS["enabled"]), {**DEFAULTS[kind], **(section.get(kind) or {})}
+
+# ---------- cleaning --------------------------------------------------------
+def normalize_lines(text: str) -> list:
+    """Cleaned lines; page breaks are kept as PAGE_BREAK lines for _clean_blocks."""
+    out = []
+    for raw in text.replace("\r\n", "\n").replace("\r", "\n").split("\n"):
+        for k, line in enumerate(raw.split(PAGE_BREAK)):
+            if k:
+                out.append(PAGE_BREAK)
+            line = _SPACES.sub(" ", _BULLETS.sub("- ", line.strip())).strip()
+            if line or (out and out[-1]):
+                out.append(line)
+    return out
+
+
+def _is_boilerplate(line: str) -> bool:
+    return any(p.search(line) for p in BOILERPLATE)
+
+
+def _key(line: str) -> str:
+    return line.lower().strip(" :-")
+
+
+def _clean_blocks(blocks: list, drop_sections: set, report: dict) -> list:
+    """[(section, header, lines)] with boilerplate, page furniture and repeated headers removed."""
+    top = [l for l in blocks[0][2] if l and l != PAGE_BREAK]
+    # Contact furniture (name, email, phone, links) is dropped wherever it repeats; other
+    # top lines, e.g. a "Data Scientist" headline, only right after a page break, since
+    # the same words are often a role title further down.
+    contact = {_key(l) for l in top[:1] + [l for l in top if _CONTACT.search(l)]}
+    top_lines = {_key(l) for l in top}
+    merged, order = {}, []
+    after_break = False
+    for i, (section, header, body) in enumerate(blocks):
+        name = section or "header"
+        if header is not None:
+            after_break = False                                                # a heading is content
+        if name in drop_sections:
+            report["dropped"].append(name)
+            continue
+        lines = []
+        for line in body:
+            if line == PAGE_BREAK:
+                after_break = True
+                continue
+            key = _key(line)
+            if line and (_is_boilerplate(line)
+                         or (i and (key in contact or (after_break and key in top_lines)))
+                         or (lines and key == _key(lines[-1]))):
+                report["lines_dropped"] += 1
+                continue
+            if not line and (not lines or not lines[-1]):
+                continue
+            lines.append(line)
+            if line:
+                after_break = False
+        if name in merged:
+            if _key(header) == _key(merged[name][1]):
+                report["lines_dropped"] += 1                                   # repeated header
+            else:
+                lines.insert(0, header)                                        # "Skills: Go, Rust" carries content
+            merged[name][2].extend(lines)
+        else:
+            merged[name] = (section, header, lines)
+            order.append(name)
+    return [merged[n] for n in order]
+
+
+def _render(blocks: list) -> str:
+    parts = []
+    for _, header, lines in blocks:
+        body = "\n".join(lines).strip()
+        if header is None and not body:
+            continue
+        parts.append(f"{header}\n{body}" if header is not None else body)
+    return "\n\n".join(p.strip() for p in parts if p.strip())
+
+# ---------- budget ----------------------------------------------------------
+def _fit(blocks: list, priority: list, budget: int, report: dict) -> list:
+    """Trim lines from the end of the lowest-priority sections until the text fits."""
+    budget_chars = budget * CHARS_PER_TOKEN
+    size = len(_render(blocks))
+    if size <= budget_chars:
+        return blocks
+    rank = {name: i for i, name in enumerate(priority)}
+    victims = sorted(range(len(blocks)),
+                     key=lambda i: -rank.get(blocks[i][0] or "header", len(priority)))
+    removed = set()
+    for i in victims:
+        if size <= budget_chars:
+            break
+        section, header, lines = blocks[i]
+        while lines and size > budget_chars:
+            size -= len(lines.pop()) + 1
+            report["lines_trimmed"] += 1
+        if size > budget_chars:
+            removed.add(i)
+            size -= len(header or "") + 2
+            report["dropped"].append(section or "header")
+    return [b for i, b in enumerate(blocks) if i not in removed]
+
+
+def compact(text: str, headers: dict, budget: int, priority: list, drop_sections) -> tuple[str, dict]:
+    report = {"tokens_before": estimate_tokens(text), "dropped": [], "lines_dropped": 0, "lines_trimmed": 0}
+    blocks = split_sections("\n".join(normalize_lines(text)), headers)
+    blocks = _clean_blocks(blocks, set(drop_sections or ()), report)
+    blocks = _fit(blocks, priority, budget, report) if budget else blocks
+    out = _render(blocks)
+    if budget and estimate_tokens(out) > budget:                   # one section alone is over budget
+        out = out[:budget * CHARS_PER_TOKEN].rsplit("\n", 1)[0]
+        report["truncated"] = True
+    report["tokens_after"] = estimate_tokens(out)
+    report["tokens_saved"] = max(0, report["tokens_before"] - report["tokens_after"])
+    return out, report
+
+
+def _compact_kind(kind: str, text: str, headers: dict, budget: int | None) -> tuple[str, dict]:
+    enabled, cfg = _cfg(kind)
+    if not enabled or not text:
+        n = estimate_tokens(text)
+        return text, {"tokens_before": n, "tokens_after": n, "tokens_saved": 0}
+    with stage("prompt_compaction", kind=kind) as st:
+        out, report = compact(text, headers, budget if budget is not None else cfg["budget_tokens"],
+                              cfg["priority"], cfg["drop_sections"])
+        st.set(tokens_before=report["tokens_before"], tokens_after=report["tokens_after"])
+    incr("prompt_tokens_saved", report["tokens_saved"])
+    print(f"[Compaction] {kind}: {report['tokens_before']} → {report['tokens_after']} tokens "
+          f"(saved {report['tokens_saved']})")
+    return out, report
+
+
+def compact_resume(text: str, budget: int | None = None) -> tuple[str, dict]:
+    return _compact_kind("resume", text, {**SECTION_HEADERS, **RESUME_EXTRA_HEADERS}, budget)
+
+
+def compact_jd(text: str, budget: int | None = None) -> tuple[str, dict]:
+    return _compact_kind("jd", text, JD_HEADERS, budget)
+
+
+if __name__ == "__main__":
+    import argparse
+    from text_extraction import extract_text
+
+    ap = argparse.ArgumentParser(description="Show the compacted prompt text for resumes / JDs.")
+    ap.add_argument("paths", nargs="+")
+    ap.add_argument("--jd", action="store_true", help="Treat the files as job descriptions")
+    ap.add_argument("--budget", type=int, default=None, help="Token budget (default: config)")
+    ap.add_argument("--show", action="store_true", help="Print the compacted text")
+    args = ap.parse_args()
+
+    fn = compact_jd if args.jd else compact_resume
+    for p in args.paths:
+        out, report = fn(extract_text(p), args.budget)
+        print(f"{p}: {report}")
+        if args.show:
+            print(out, end="\n\n")
@@ -0,0 +1,403 @@
+# rescoring.py
+"""
+Incremental re-scoring when a JD or the scoring config changes.
+
+    snapshot(store, job_id, jd, candidates)                 # after a screening run
+    result = rerank(store, job_id, new_jd)                  # after the recruiter edits the JD
+    result["diff"], result["recomputed"], result["ranked"]
+
+A screening run persists, per job, the state score_pool() derives everything
+from: one boolean column per JD skill (required or preferred), each candidate's
+years of experience and degree level, and the four sub-score columns (candidate_store
+→ score_state). LLM skill scores are kept per (candidate, skill) in llm_skill_scores.
+
+diff_jd() / diff_config() then say what an edit touches, and rerank() recomputes
+only that:
+
+- a skill moved between required and preferred reuses its column as is;
+- a skill new to the JD gets its column from the store's skill index, not the resumes;
+- min/max years re-score the experience column; qualifications the degree column;
+- weights or min_required_coverage only re-combine the sub-scores;
+- candidates added to the job since the snapshot are parsed into the state once;
+  re-put ones (re-parse, escalation) are re-parsed and removed ones dropped, by
+  comparing each row's store version (row id, updated_at) with the snapshot's.
+
+Scores match a full score_pool() on the same candidates, and the ranking applies
+the same pre-filter as rank_top_k (unless ranking.prefilter is off), so it matches
+a fresh pipeline ranking. With llm_score, only
+(shortlisted candidate, required skill) pairs without a stored LLM score are sent
+to skill_match, so moving "React.js" into required_skills costs one skill per
+shortlisted candidate instead of a re-screen.
+
+The JD shape is the extracted JSON in data/JD_JSON_Extracted.
+"""
+
+import io
+import json
+import time
+
+import numpy as np
+
+from config_loader import get_section
+from logging_module import stage, incr
+from skill_matcher import skill_key
+import scoring
+
+SKILL_LISTS = ("required_skills", "preferred_skills")
+EXPERIENCE_FIELDS = ("min_experience_years", "max_experience_years")
+COMPONENTS = scoring.SUB_SCORES
+
+
+def _keys(skills) -> list:
+    return [skill_key(s) for s in skills or [] if isinstance(s, str) and s.strip()]
+
+
+def _columns(pool: scoring.CandidatePool, keys) -> dict:
+    """skill_key -> bool[n]: which candidates of the pool list that skill."""
+    rows = np.repeat(np.arange(len(pool), dtype=np.int64), np.diff(pool.offsets))
+    out = {}
+    for key in keys:
+        col = np.zeros(len(pool), dtype=bool)
+        vid = pool.vocab.get(key)
+        if vid is not None:
+            col[rows[pool.skill_ids == vid]] = True
+        out[key] = col
+    return out
+
+# ---------- diffs -----------------------------------------------------------
+def diff_jd(old: dict, new: dict) -> dict:
+    """
+    What changed between two extracted JDs, by skill_key (so "ReactJS" → "React.js" is
+    not an edit): added / removed / moved skills per list, and whether the experience
+    range or qualifications changed. "components" lists the sub-scores to recompute.
+    """
+    old_lists = {name: _keys(old.get(name)) for name in SKILL_LISTS}
+    new_lists = {name: _keys(new.get(name)) for name in SKILL_LISTS}
+    diff = {"added": {}, "removed": {}, "moved": {}}
+    for name in SKILL_LISTS:
+        before, after = set(old_lists[name]), set(new_lists[name])
+        other = SKILL_LISTS[1 - SKILL_LISTS.index(name)]
+        diff["added"][name] = sorted(after - before - set(old_lists[other]))
+        diff["removed"][name] = sorted(before - after - set(new_lists[other]))
+        for key in sorted(after - before):
+            if key in old_lists[other]:
+                diff["moved"][key] = [other, name]
+    diff["experience"] = any(old.get(f) != new.get(f) for f in EXPERIENCE_FIELDS)
+    diff["qualifications"] = scoring.jd_required_level(old) != scoring.jd_required_level(new)
+    components = [name for name in SKILL_LISTS if old_lists[name] != new_lists[name]]
+    if diff["experience"]:
+        components.append("experience")
+    if diff["qualifications"]:
+        components.append("qualifications")
+    diff["components"] = components
+    diff["changed"] = bool(components)
+    return diff
+
+
+def diff_config(old: dict, new: dict) -> dict:
+    """Scoring-config changes: weights and the coverage cut-off only re-combine; experience settings re-score."""
+    diff = {
+        "weights": scoring._weights(old).tolist() != scoring._weights(new).tolist(),
+        "min_required_coverage": old.get("min_required_coverage", 0.0) != new.get("min_required_coverage", 0.0),
+        "experience": (old.get("experience") or {}) != (new.get("experience") or {}),
+    }
+    diff["components"] = ["experience"] if diff["experience"] else []
+    diff["changed"] = any(diff[k] for k in ("weights", "min_required_coverage", "experience"))
+    return diff
+
+# ---------- state -----------------------------------------------------------
+class ScoreState:
+    """Per-candidate, per-requirement columns for one job."""
+
+    def __init__(self, jd: dict, config: dict, ids: list, years, degree, skills: dict, subs, versions=None):
+        self.jd, self.config = jd, config
+        self.ids = ids                  # candidate ids, row order of every column
+        self.versions = versions        # store version per row ([row id, updated_at]); None = unknown
+        self.years = years              # float32, as CandidatePool (NaN unknown)
+        self.degree = degree            # int8 degree level
+        self.skills = skills            # skill_key -> bool[n]; every skill the JD has listed
+        self.subs = subs                # float32[n, len(SUB_SCORES)]
+
+    def __len__(self):
+        return len(self.ids)
+
+    @classmethod
+    def build(cls, jd: dict, pool: scoring.CandidatePool, config: dict | None = None) -> "ScoreState":
+        config = get_section("scoring") if config is None else config
+        keys = list(dict.fromkeys(_keys(jd.get("required_skills")) + _keys(jd.get("preferred_skills"))))
+        state = cls(jd, config, list(pool.ids), pool.years, pool.degree, _columns(pool, keys), None)
+        state.subs = np.empty((len(pool), len(COMPONENTS)), dtype=np.float32)
+        for name in COMPONENTS:
+            state.recompute(name)
+        return state
+
+    def _coverage(self, skills) -> np.ndarray:
+        keys = _keys(skills)
+        if not keys:
+            return np.ones(len(self), dtype=np.float32)
+        return np.mean([self.skills[k] for k in keys], axis=0).astype(np.float32)
+
+    def recompute(self, component: str):
+        col = COMPONENTS.index(component)
+        if component in SKILL_LISTS:
+            self.subs[:, col] = self._coverage(self.jd.get(component))
+        elif component == "experience":
+            self.subs[:, col] = scoring.experience_scores(
+                self.years, self.jd.get("min_experience_years"), self.jd.get("max_experience_years"), self.config)
+        else:
+            self.subs[:, col] = scoring.qualification_scores(self.degree, scoring.jd_required_level(self.jd))
+
+    def ranked(self, top_k: int | None = None, filters: dict | None = None) -> list:
+        """Best first; with `filters` (config ranking section) only prefilter() survivors, as rank_top_k."""
+        final = scoring.final_scores(self.subs, self.config)
+        order = np.argsort(-final, kind="stable")
+        if filters is not None:
+            keys = list(dict.fromkeys(_keys(self.jd.get("required_skills"))))
+            counts = np.sum([self.skills[k] for k in keys], axis=0) if keys else np.zeros(len(self), dtype=np.int64)
+            keep = scoring.constraint_mask(self.jd, counts, self.years, self.degree, filters)
+            order = order[keep[order]]
+        order = order[:top_k]
+        required = self.jd.get("required_skills") or []
+        req_cols = [self.skills.get(skill_key(s)) for s in required]
+        return [{"candidate": self.ids[i], "index": int(i), "score": round(float(final[i]), 4),
+                 "sub_scores": {k: round(float(self.subs[i, c]), 4) for c, k in enumerate(COMPONENTS)},
+                 "missing_required": [s for s, col in zip(required, req_cols) if col is None or not col[i]]}
+                for i in (int(j) for j in order)]
+
+    def extend(self, items: list):
+        """Append newly added candidates [(candidate_id, resume)]; only they are parsed into columns."""
+        pool = scoring.CandidatePool.from_resumes([r for _, r in items], ids=[c for c, _ in items])
+        keys = list(self.skills)
+        new = ScoreState(self.jd, self.config, list(pool.ids), pool.years, pool.degree, _columns(pool, keys),
+                         np.empty((len(pool), len(COMPONENTS)), dtype=np.float32))
+        for name in COMPONENTS:
+            new.recompute(name)
+        self.ids += new.ids
+        self.years = np.concatenate([self.years, new.years])
+        self.degree = np.concatenate([self.degree, new.degree])
+        self.skills = {k: np.concatenate([self.skills[k], new.skills[k]]) for k in keys}
+        self.subs = np.concatenate([self.subs, new.subs])
+
+    def drop(self, stale: np.ndarray):
+        """Remove the rows flagged in the boolean mask `stale`."""
+        keep = ~stale
+        self.ids = [cid for cid, k in zip(self.ids, keep) if k]
+        self.years, self.degree, self.subs = self.years[keep], self.degree[keep], self.subs[keep]
+        self.skills = {k: col[keep] for k, col in self.skills.items()}
+
+    # -- persistence ---------------------------------------------------------
+    def save(self, store, job_id: str):
+        keys = list(self.skills)
+        buf = io.BytesIO()
+        np.savez_compressed(buf, years=self.years, degree=self.degree, subs=self.subs,
+                            skills=np.packbits(np.stack([self.skills[k] for k in keys], axis=1), axis=0)
+                            if keys else np.zeros((0, 0), dtype=np.uint8))
+        store.put_score_state(job_id, {"jd": self.jd, "config": self.config, "ids": self.ids,
+                                       "skills": keys, "versions": self.versions,
+                                       "saved_at": time.time()}, buf.getvalue())
+
+    @classmethod
+    def load(cls, store, job_id: str) -> "ScoreState | None":
+        row = store.get_score_state(job_id)
+        if row is None:
+            return None
+        meta, blob = row
+        arrays = np.load(io.BytesIO(blob))
+        n, keys = len(meta["ids"]), meta["skills"]
+        bits = np.unpackbits(arrays["skills"], axis=0, count=n).astype(bool) if keys else None
+        return cls(meta["jd"], meta["config"], meta["ids"], arrays["years"], arrays["degree"],
+                   {k: bits[:, i] for i, k in enumerate(keys)}, arrays["subs"], meta.get("versions"))
+
+# ---------- entry points ----------------------------------------------------
+def snapshot(store, job_id: str, jd: dict, candidates=None, ranked=None, config: dict | None = None) -> ScoreState:
+    """
+    Score every candidate of the job once and persist the columns. `candidates` is
+    [(candidate_id, resume)] (default: the job's candidates in the store); LLM skill
+    scores found on `ranked` rows are stored per skill for reuse.
+    """
+    with stage("rescore_snapshot", job=job_id):
+        if candidates is None:
+            pool = store.load_table(job_id).pool()
+        else:
+            candidates = list(candidates)
+            pool = scoring.CandidatePool.from_resumes([r for _, r in candidates], ids=[c for c, _ in candidates])
+        state = ScoreState.build(jd, pool, config)
+        versions = store.candidate_versions(job_id)
+        state.versions = [versions.get(cid) for cid in state.ids]
+        state.save(store, job_id)
+    if ranked:
+        store.put_llm_skill_scores(job_id, {r["candidate"]: r["llm_skill_scores"] for r in ranked
+                                            if r.get("llm_skill_scores")})
+    return state
+
+
+def _llm_fill(store, job_id: str, jd: dict, ranked: list, llm_score) -> dict:
+    """Attach stored LLM skill scores to the shortlist and score only the missing (candidate, skill) pairs."""
+    required = [s for s in jd.get("required_skills") or [] if isinstance(s, str) and s.strip()]
+    cids = [r["candidate"] for r in ranked]
+    stored = store.llm_skill_scores(job_id, cids)
+    missing = {}                                        # frozenset(skills) -> [candidate ids]
+    for cid in cids:
+        have = stored.get(cid, {})
+        todo = frozenset(s for s in required if skill_key(s) not in have)
+        if todo:
+            missing.setdefault(todo, []).append(cid)
+    pairs = sum(len(k) * len(v) for k, v in missing.items())
+    reused = len(cids) * len(required) - pairs
+    if missing and llm_score is None:
+        from skill_match import score_skills_batch as llm_score
+    for skills, group in missing.items():
+        ordered = [s for s in required if s in skills]
+        fresh = llm_score(ordered, {cid: store.get_candidate(job_id, cid) or {} for cid in group})
+        store.put_llm_skill_scores(job_id, fresh)
+    if missing:
+        stored = store.llm_skill_scores(job_id, cids)
+    for r in ranked:
+        have = stored.get(r["candidate"], {})
+        r["llm_skill_scores"] = {s: have[skill_key(s)] for s in required if skill_key(s) in have}
+    incr("llm_skill_pairs_reused", reused)
+    return {"pairs_reused": reused, "pairs_scored": pairs}
+
+
+def rerank(store, job_id: str, jd: dict | None = None, config: dict | None = None, top_k: int | None = None,
+           llm_score: bool | None = False, save: bool = True, llm_fn=None) -> dict:
+    """
+    Re-rank a job after a JD and/or scoring-config edit, recomputing only what the
+    edit touches. Builds the snapshot first if the job has none. Returns {"ranked",
+    "diff", "config_diff", "recomputed", "added_candidates", "updated_candidates", "llm", "seconds"}.
+    """
+    t0 = time.perf_counter()
+    state = ScoreState.load(store, job_id)
+    if state is None:
+        base = store.get_job(job_id)
+        if base is None and jd is None:
+            raise ValueError(f"Unknown job {job_id}")
+        print(f"[Rescoring] No score state for job {job_id}; scoring all candidates once")
+        state = snapshot(store, job_id, base or jd, config=config)
+    jd = {**(jd or state.jd), "JOB_ID": job_id}
+    config = get_section("scoring") if config is None else config
+    jd_diff = diff_jd(state.jd, jd)
+    cfg_diff = diff_config(state.config, config)
+
+    with stage("rescore", job=job_id, candidates=len(state)):
+        # Rows re-put (re-parse, escalation) or deleted since the snapshot are dropped; the
+        # re-put ones come back with the new ones. Old snapshots without versions redo every row.
+        current = store.candidate_versions(job_id)
+        known = state.versions or [None] * len(state)
+        stale = np.fromiter((v is None or current.get(cid) != v for cid, v in zip(state.ids, known)),
+                            dtype=bool, count=len(state))
+        kept = {cid for cid, s in zip(state.ids, stale) if not s}
+        todo = [cid for cid in current if cid not in kept]
+        updated = sum(cid in current for cid, s in zip(state.ids, stale) if s)
+        if stale.any():
+            state.drop(stale)
+        added = store.get_candidates(job_id, todo) if todo else []
+        new_keys = [k for name in SKILL_LISTS for k in _keys(jd.get(name)) if k not in state.skills]
+        if new_keys:
+            members = store.skill_members(job_id, new_keys)
+            for key in new_keys:
+                ids = members.get(key, set())
+                state.skills[key] = np.fromiter((cid in ids for cid in state.ids), dtype=bool, count=len(state))
+        state.jd, state.config = jd, config
+        recomputed = list(dict.fromkeys(jd_diff["components"] + cfg_diff["components"]))
+        for name in recomputed:
+            state.recompute(name)
+        if added:
+            state.extend(added)
+        state.versions = [current.get(cid) for cid in state.ids]
+        ranking = get_section("ranking")
+        ranked = state.ranked(top_k or get_section("pipeline").get("shortlist_k", 20),
+                              ranking if ranking.get("prefilter", True) else None)
+    llm = _llm_fill(store, job_id, jd, ranked, llm_fn) if llm_score else None
+    if save:
+        state.save(store, job_id)
+        store.put_job(jd, job_id)
+        store.put_scores(job_id, ranked)
+    seconds = round(time.perf_counter() - t0, 4)
+    print(f"[Rescoring] Job {job_id}: recomputed {recomputed or 'nothing'}"
+          f"{f', {len(new_keys)} new skill columns' if new_keys else ''}"
+          f"{f', {len(added) - updated} new / {updated} updated candidates' if added else ''} in {seconds}s")
+    return {"ranked": ranked, "diff": jd_diff, "config_diff": cfg_diff, "recomputed": recomputed,
+            "new_skill_columns": new_keys, "added_candidates": len(added) - updated,
+            "updated_candidates": updated, "llm": llm, "seconds": seconds}
+
+
+def benchmark(n: int = 20_000, seed: int = 0) -> dict:
+    """Full re-score vs incremental after moving a preferred skill to required, on a temp store."""
+    import random
+    import tempfile
+    import os
+    from candidate_store import CandidateStore
+    from skill_matcher import get_skill_matcher
+
+    rng = random.Random(seed)
+    names = list(get_skill_matcher().names.values())
+    with open(scoring.DEFAULT_JD_PATH, "r", encoding="utf-8") as f:
+        jd = json.load(f)
+    names += jd["required_skills"] + jd["preferred_skills"]
+    store = CandidateStore(os.path.join(tempfile.mkdtemp(prefix="rescoring_"), "bench.sqlite"))
+    job_id = jd["JOB_ID"]
+    store.put_job(jd, job_id)
+    store.put_candidates(job_id, [(f"cand-{i}", {
+        "skills": rng.sample(names, rng.randint(5, 25)),
+        "total_years_of_experience": round(rng.uniform(0, 15), 1),
+        "education": [{"degree": rng.choice(["B.Tech", "MSc", "MCA", ""])}]}) for i in range(n)])
+
+    t0 = time.perf_counter()
+    snapshot(store, job_id, jd)
+    snapshot_s = time.perf_counter() - t0
+    edited = json.loads(json.dumps(jd))
+    moved = edited["preferred_skills"].pop(0)
+    edited["required_skills"].append(moved)
+    edited["min_experience_years"] = 5
+    t0 = time.perf_counter()
+    out = rerank(store, job_id, edited, top_k=20)
+    incremental_s = time.perf_counter() - t0
+    t0 = time.perf_counter()
+    stored = store.load_candidates(job_id)
+    pool = scoring.CandidatePool.from_resumes([r for _, r in stored], ids=[c for c, _ in stored])
+    if get_section("ranking").get("prefilter", True):          # as the pipeline ranks
+        full = scoring.rank_top_k(edited, pool, 20)
+    else:
+        full = scoring.rank_candidates(edited, None, top_k=20, pool=pool)
+    full_s = time.perf_counter() - t0
+    same = [r["candidate"] for r in full] == [r["candidate"] for r in out["ranked"]]
+    return {"candidates": n, "moved": moved, "snapshot_s": round(snapshot_s, 3),
+            "full_rescore_s": round(full_s, 3), "incremental_s": round(incremental_s, 3),
+            "recomputed": out["recomputed"], "same_top_20": same}
+
+
+if __name__ == "__main__":
+    import argparse
+    from pprint import pprint
+
+    ap = argparse.ArgumentParser(description="Re-rank a stored job after editing its JD or the scoring config.")
+    ap.add_argument("--job", help="Job id in the candidate store")
+    ap.add_argument("--jd-json", help="Edited JD JSON (default: the stored JD, i.e. config-only change)")
+    ap.add_argument("--top", type=int, default=None)
+    ap.add_argument("--llm-score", action="store_true", help="LLM-score only the new (candidate, skill) pairs")
+    ap.add_argument("--diff", action="store_true", help="Only print what the edit changes")
+    ap.add_argument("--bench", type=int, metavar="N", help="Time full vs incremental re-scoring of N candidates")
+    args = ap.parse_args()
+
+    if args.bench:
+        pprint(benchmark(args.bench))
+    else:
+        from candidate_store import get_store
+        if not args.job:
+            ap.error("--job is required")
+        new_jd = None
+        if args.jd_json:
+            with open(args.jd_json, "r", encoding="utf-8") as f:
+                new_jd = json.load(f)
+        store = get_store()
+        if args.diff:
+            state = ScoreState.load(store, args.job)
+            old = state.jd if state else store.get_job(args.job)
+            pprint(diff_jd(old or {}, new_jd or old or {}))
+        else:
+            out = rerank(store, args.job, new_jd, top_k=args.top, llm_score=args.llm_score)
+            pprint({k: v for k, v in out.items() if k != "ranked"})
+            for i, r in enumerate(out["ranked"], start=1):
+                missing = ", ".join(r["missing_required"]) or "-"
+                print(f"{i:>3}. {r['candidate']:<30} {r['score']:.3f}  missing: {missing}")
@@ -2,74 +2,28 @@ import os
 import json
 import pprint
 import time
-from pdfminer.high_level import extract_text
-from docx import Document
+from text_extraction import extract_text
 from local_model import _call_ollama
 from openai_model import generate as gpt_generate  # fallback
-import re
-from difflib import SequenceMatcher
+from duty_alignment import align_duties
+from logging_module import stage, timed
+from candidate_store import SHARED, resolve_store, candidate_key, EXPORT_JSON
+from dedup import content_hash, simhash
+from prompt_compaction import compact_resume
+from json_output import RESUME_SCHEMA, parse_json, validate_json
 
 PROMPT_PATH = os.path.join(os.path.dirname(__file__), "../prompts/resume_extraction.txt")
 OUTPUT_DIR = os.path.join(os.path.dirname(__file__), "../../data/Resume_Parsing")
 
 
 
-def similar(a, b):
-    """Returns similarity ratio between two strings."""
-    return SequenceMatcher(None, a.lower(), b.lower()).ratio()
-
 def extract_job_duties_from_text(text, parsed_json, similarity_threshold=0.75):
     """
     Extracts bullet-pointed duties from resume text and attaches them to parsed_json["past_roles"].
     It handles multiple resume formats and is robust to formatting variation.
+    Matching uses the indexed role signatures in duty_alignment (same threshold and ratio as before).
     """
-    lines = [line.strip() for line in text.split('\n') if line.strip()]
-    job_lines = []
-    for i in range(len(lines) - 1):
-        current = lines[i]
-        next_line = lines[i + 1]
-
-        # Look for 2-line pattern: role/company + date
-        if not current.startswith(("•", "-", "*")):
-            if re.search(r"(19|20)\d{2}", next_line) and re.search(r"–|-|—|to", next_line, re.IGNORECASE):
-                job_lines.append((i, f"{current}, {next_line}"))
-
-    job_lines.append((len(lines), "EOF"))  # Sentinel for range calculation
-
-    print("Job Lines", job_lines)
-
-    # Prepare titles and companies from parsed_json
-    roles = parsed_json.get("past_roles", [])
-
-    for idx in range(len(job_lines) - 1):
-        start_idx, header_line = job_lines[idx]
-        end_idx, _ = job_lines[idx + 1]
-
-        block_lines = lines[start_idx + 1:end_idx]
-        duties = []
-        for line in block_lines:
-            # Match bullet-style lines or paragraphs under job headers
-            if line.startswith(("•", "-", "*")) or re.match(r"^\u2022", line) or len(line.split()) > 5:
-                if line.lower().strip() in ["education", "skills", "certifications", "projects"]:
-                    break
-                duties.append(line.lstrip("•-* \u2022").strip())
-
-        # Assign duties to best-matching role
-        best_match = None
-        highest_score = 0
-        for role in roles:
-            title = role.get("title", "")
-            company = role.get("company", "")
-            composite = f"{title} {company}"
-            score = similar(header_line, composite)
-            if score > highest_score and score > similarity_threshold:
-                highest_score = score
-                best_match = role
-
-        if best_match:
-            best_match["duties"] = duties
-
-    return parsed_json
+    return align_duties(text, parsed_json, similarity_threshold)
 
 
 
@@ -77,39 +31,39 @@ def load_prompt_template(path):
     with open(path, 'r', encoding='utf-8') as f:
         return f.read()
 
-def pdf_to_text(pdf_path):
-    return extract_text(pdf_path)
-
-def docx_to_text(docx_path):
-    doc = Document(docx_path)
-    return '\n'.join([para.text for para in doc.paragraphs])
-
-def save_resume_json(job_id, candidate_id, resume_data):
-    folder = os.path.join(OUTPUT_DIR, job_id)
-    os.makedirs(folder, exist_ok=True)
-    file_path = os.path.join(folder, f"{candidate_id}.json")
-    with open(file_path, 'w', encoding='utf-8') as f:
-        json.dump(resume_data, f, indent=2)
-    print(f"[Resume Parser] Saved resume JSON to {file_path}")
-
-def extract_resume_info(resume_text, job_id, max_retries=3):
+@timed("save")
+def save_resume_json(job_id, candidate_id, resume_data, store=SHARED):
+    store = resolve_store(store)
+    if store is not None:
+        store.put_candidate(job_id, candidate_id, resume_data)
+        print(f"[Resume Parser] Saved resume {candidate_id} for job {job_id} to the candidate store")
+    if EXPORT_JSON:
+        folder = os.path.join(OUTPUT_DIR, job_id)
+        os.makedirs(folder, exist_ok=True)
+        file_path = os.path.join(folder, f"{candidate_id}.json")
+        with open(file_path, 'w', encoding='utf-8') as f:
+            json.dump(resume_data, f, indent=2)
+        print(f"[Resume Parser] Saved resume JSON to {file_path}")
+
+def extract_resume_info(resume_text, job_id, candidate_id=None, max_retries=3, store=SHARED):
     prompt_template = load_prompt_template(PROMPT_PATH)
-    prompt = prompt_template.replace("{RESUME_TEXT}", resume_text)
+    # Duty alignment below still works on the full text; only the prompt is compacted.
+    prompt = prompt_template.replace("{RESUME_TEXT}", compact_resume(resume_text)[0])
     system = "You are an HR assistant who extracts structured candidate data from resumes and always returns well-formatted JSON."
 
     # --- Skipping local model block for now ---
     print("[Resume Parser] Using GPT-4o-mini fallback.")
-    #output = gpt_generate(prompt, system=system, max_tokens=1000, temperature=0.2)
+    with stage("llm_call", task="resume_extraction"):
+        output = gpt_generate(prompt, system=system, max_tokens=1000, temperature=0.2,
+                              validate=validate_json, schema=RESUME_SCHEMA)
     try:
-        #resume_data = json.loads(output)
-        with open('data\\Resume_Parsing\\67c32787-fb6b-45f2-8f76-826118d37577\\HRITHIK SARDA.json','r') as f:
-            resume_data=json.load(f)
-        #print(resume_data)
+        with stage("json_parse", task="resume_extraction"):
+            resume_data = parse_json(output)
         if isinstance(resume_data, dict):
             resume_data["JOB_ID"] = job_id
             resume_json=extract_job_duties_from_text(resume_text,resume_data)
             print("[Resume Parser] Successfully parsed resume using fallback GPT-4o-mini.")
-            save_resume_json(job_id, resume_json['name'], resume_json)
+            save_resume_json(job_id, candidate_id or candidate_key(resume_json), resume_json, store)
             return resume_data
         else:
             print(f"[Resume Parser] Fallback output is not a JSON object: {output}")
@@ -117,16 +71,24 @@ def extract_resume_info(resume_text, job_id, max_retries=3):
         print(f"[Resume Parser] Fallback GPT-4o-mini also failed to produce JSON. Output was:\n{output}\n")
         raise ValueError("Unable to parse resume as valid JSON after all retries and fallback.")
 
-def parse_resume_from_file(resume_path, job_id, candidate_id="candidate"):
-    if resume_path.endswith('.pdf'):
-        resume_text = pdf_to_text(resume_path)
-    elif resume_path.endswith('.docx'):
-        resume_text = docx_to_text(resume_path)
-    else:
-        with open(resume_path, 'r', encoding='utf-8') as f:
-            resume_text = f.read()
-    #print(resume_text)
-    return extract_resume_info(resume_text, job_id, candidate_id)
+def parse_resume_from_file(resume_path, job_id, candidate_id=None, reuse=True, store=SHARED):
+    """
+    LLM-parse a resume for job_id; a resume already LLM-parsed for any job is reused, not re-sent.
+    `store=None` neither reuses nor saves anything (the shared candidate store by default).
+    """
+    resume_text = extract_text(resume_path)
+    store = resolve_store(store)
+    doc_hash = content_hash(resume_text)
+    doc = store.get_document(doc_hash) if reuse and store is not None else None
+    if doc and doc["tier"] == "llm" and doc["parsed"]:
+        print(f"[Resume Parser] Reusing stored parse of {resume_path} (document {doc_hash[:12]}).")
+        resume_data = {**doc["parsed"], "JOB_ID": job_id}
+        save_resume_json(job_id, candidate_id or candidate_key(resume_data), resume_data, store)
+        return resume_data
+    resume_data = extract_resume_info(resume_text, job_id, candidate_id, store=store)
+    if isinstance(resume_data, dict) and store is not None:
+        store.put_document({"doc_hash": doc_hash, "simhash": simhash(resume_text)}, resume_data, "llm")
+    return resume_data
 
 # ---------------------- CLI test runner ----------------------
 if __name__ == "__main__":
@@ -1,25 +1,35 @@
 import os,sys
 import re
-import spacy
-from pdfminer.high_level import extract_text
-from docx import Document
-from dateutil import parser as dateparser
+import glob
+import json
+import time
+from functools import lru_cache
 from pprint import pprint
+from skill_matcher import get_skill_matcher
+from text_extraction import extract_text
+from experience import total_years
+from logging_module import timed
 
-# Initialize spaCy once
-NLP = spacy.load("en_core_web_sm")
+SPACY_MODEL = "en_core_web_sm"
+# Only NER is used; everything else in the pipeline is dead weight at load and run time.
+SPACY_EXCLUDE = ["parser", "tagger", "attribute_ruler", "lemmatizer", "senter", "morphologizer"]
 
+
+@lru_cache(maxsize=None)
+def get_nlp():
+    """spaCy pipeline, loaded once per process on first use (not at import)."""
+    import spacy
+    return spacy.load(SPACY_MODEL, exclude=SPACY_EXCLUDE)
+
+
+def __getattr__(name):
+    # `resume_scraper_nlp.NLP` used to be loaded at import; it now loads on first access.
+    if name == "NLP":
+        return get_nlp()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+# Skills (and their aliases) live in config/skills_taxonomy.json, see skill_matcher.py.
 # You should expand these lists for production!
-SKILLS_LIST = [
-    'Python', 'SQL', 'PySpark', 'Shell', 'R', 'NLTK', 'TensorFlow', 'Pandas', 'Scikit-Learn', 'NumPy',
-    'TFDV', 'PyTorch', 'Airflow', 'ML Flow', 'statsmodels', 'Dask', 'pydantic', 'DASH', 'AWS',
-    'Azure', 'GCP', 'Snowflake', 'Apache Spark', 'Hadoop', 'dbt', 'Talend', 'Informatica', 'SSIS',
-    'TIDAL', 'Oracle', 'SQL Server', 'PostgreSQL', 'MySQL', 'Teradata', 'MongoDB', 'Cosmos DB',
-    'NoSQL', 'Apache Kafka', 'Apache Flink', 'Docker', 'Kubernetes', 'Terraform', 'GitHub Actions',
-    'CI/CD', 'Power BI', 'Tableau', 'EDA', 'Statistical Modeling', 'Trend Analysis', 'matplotlib',
-    'seaborn', 'Plotly', 'Agile-Scrum', 'Kanban', 'Data Modelling', 'Data Warehousing', 'GDPR/HIPAA compliance',
-    'OpenAI embeddings', 'ChromaDB', 'RAG pipelines', 'Supervised & Unsupervised Learning', 'Feature Engineering', 'Model Evaluation metrics'
-]
 DEGREE_KEYWORDS = [
     'bachelor', 'master', 'doctor', 'phd', 'msc', 'bachelors', 'masters', 'engineering', 'm.tech', 'b.tech'
 ]
@@ -33,21 +43,9 @@ SECTION_HEADERS = {
 }
 
 
-def pdf_to_text(pdf_path):
-    return extract_text(pdf_path)
-
-def docx_to_text(docx_path):
-    doc = Document(docx_path)
-    return '\n'.join([para.text for para in doc.paragraphs])
-
 def extract_text_from_file(path):
-    if path.endswith('.pdf'):
-        return pdf_to_text(path)
-    elif path.endswith('.docx'):
-        return docx_to_text(path)
-    else:
-        with open(path, 'r', encoding='utf-8') as f:
-            return f.read()
+    # PDF/DOCX/TXT dispatch, page caps and the content-hash text cache live in text_extraction.
+    return extract_text(path)
 
 def extract_email(text):
     match = re.search(r'[\w\.-]+@[\w\.-]+', text)
@@ -66,48 +64,36 @@ def extract_name(text):
                 return line_strip
     return None
 
+def header_key(line, headers=SECTION_HEADERS):
+    line_clean = line.strip().lower()
+    for key, variants in headers.items():
+        if any(line_clean.startswith(h) for h in variants):
+            return key
+    return None
+
+def split_sections(text, headers=SECTION_HEADERS):
+    """
+    Ordered [(section, header_line, body_lines), …] blocks. The first block holds the
+    lines before any header (section and header_line None); a section may repeat.
+    """
+    blocks = [(None, None, [])]
+    for line in text.split('\n'):
+        section = header_key(line, headers)
+        if section:
+            blocks.append((section, line, []))
+        else:
+            blocks[-1][2].append(line)
+    return blocks
+
+@timed("section_split")
 def extract_sections(text):
-    lines = text.split('\n')
     section_map = {}
-    current_section = None
-    buffer = []
-
-    def header_key(line):
-        line_clean = line.strip().lower()
-        for key, variants in SECTION_HEADERS.items():
-            if any(line_clean.startswith(h) for h in variants):
-                return key
-        return None
-
-    for line in lines:
-        section = header_key(line)
-        if section:
-            if current_section and buffer:
-                section_map[current_section] = '\n'.join(buffer).strip()
-                buffer = []
-            current_section = section
-        elif current_section:
-            buffer.append(line)
-    # Capture last section
-    if current_section and buffer:
-        section_map[current_section] = '\n'.join(buffer).strip()
+    for section, _, buffer in split_sections(text):
+        # A repeated header replaces the earlier body, as it always has.
+        if section and buffer:
+            section_map[section] = '\n'.join(buffer).strip()
     return section_map
 
-def extract_skills(skills_text):
-    skills_found = set()
-    text_lower = skills_text.lower()
-    for skill in SKILLS_LIST:
-        if re.search(r'\b' + re.escape(skill.lower()) + r'\b', text_lower):
-            skills_found.add(skill)
-    # Add anything in a comma/list line in skills section
-    for line in skills_text.split('\n'):
-        if ',' in line:
-            for word in line.split(','):
-                word_clean = word.strip()
-                if word_clean and word_clean not in skills_found:
-                    skills_found.add(word_clean)
-    return list(skills_found)
-
 def extract_education(edu_text):
     education = []
     lines = [line.strip() for line in edu_text.split('\n') if line.strip()]
@@ -139,7 +125,13 @@ def extract_certifications(cert_text):
 
 
 def extract_skills(skills_text):
-    skills = []
+    """
+    Canonical taxonomy skills found anywhere in the section, plus every listed item
+    that isn't exactly one taxonomy skill (kept as written, title-cased), so free text
+    like "Built ETL in Python and Airflow" survives next to Python and Airflow.
+    """
+    matcher = get_skill_matcher()
+    skills = set(matcher.find_skills(skills_text))
     for line in skills_text.split('\n'):
         line = line.strip()
         if not line or line.lower().startswith("skill"):
@@ -147,10 +139,9 @@ def extract_skills(skills_text):
         # Split by common separators
         for skill in re.split(r'[,\•;|]', line):
             skill = skill.strip()
-            if skill:
-                skills.append(skill)
-    # Remove duplicates, standardize capitalization
-    return sorted(set([s.title() for s in skills]))
+            if skill and matcher.exact(skill) is None:
+                skills.add(skill.title())
+    return sorted(skills)
 
 
 def extract_experience(exp_text):
@@ -170,22 +161,10 @@ def extract_experience(exp_text):
     return exp
 
 def calc_total_exp(experiences):
-    
-    years = []
-    for role in experiences:
-        try:
-            start = dateparser.parse(role.get("start_year_month"))
-            end_str = role.get("end_year_month")
-            end = dateparser.parse(end_str) if end_str and end_str.lower() != "present" else None
-            if end:
-                years.append((end - start).days / 365.25)
-            else:
-                from datetime import datetime
-                years.append((datetime.now() - start).days / 365.25)
-        except Exception:
-            continue
-    return round(sum(years), 1) if years else None
+    # Cached date parsing and overlap merging live in experience.py.
+    return total_years(experiences)
 
+@timed("nlp_parse")
 def nlp_resume_parse(resume_path):
     text = extract_text_from_file(resume_path)
     sections = extract_sections(text)
@@ -216,13 +195,96 @@ def nlp_resume_parse(resume_path):
     }
     return out
 
+# ---------- batch mode ------------------------------------------------------
+RESUME_EXTENSIONS = ('.pdf', '.docx', '.txt')
+
+def iter_resume_paths(target):
+    """Expand a file, directory or glob pattern into a sorted list of resume paths."""
+    if os.path.isdir(target):
+        paths = []
+        for root, _, files in os.walk(target):
+            paths.extend(os.path.join(root, f) for f in files)
+    elif os.path.isfile(target):
+        paths = [target]
+    else:
+        paths = glob.glob(target, recursive=True)
+    return sorted(p for p in paths if p.lower().endswith(RESUME_EXTENSIONS))
+
+def _parse_one(resume_path):
+    # Runs inside a worker: never raise, so one corrupt file can't abort the batch.
+    start = time.perf_counter()
+    try:
+        result = {'path': resume_path, 'ok': True, 'data': nlp_resume_parse(resume_path)}
+    except Exception as e:
+        result = {'path': resume_path, 'ok': False, 'error': f"{type(e).__name__}: {e}"}
+    result['seconds'] = round(time.perf_counter() - start, 4)
+    return result
+
+def batch_parse(paths, out=sys.stdout, workers=None, chunksize=4):
+    """
+    Parse many resumes with a process pool, writing one JSON line per file to `out`
+    as soon as it finishes (completion order, not input order). Returns a stats dict.
+    """
+    from multiprocessing import Pool
+
+    workers = workers or os.cpu_count() or 1
+    ok = failed = 0
+    start = time.perf_counter()
+    if workers == 1:
+        results = map(_parse_one, paths)
+        pool = None
+    else:
+        pool = Pool(processes=workers)
+        results = pool.imap_unordered(_parse_one, paths, chunksize=chunksize)
+    try:
+        for result in results:
+            out.write(json.dumps(result, ensure_ascii=False) + '\n')
+            out.flush()
+            if result['ok']:
+                ok += 1
+            else:
+                failed += 1
+    finally:
+        if pool is not None:
+            pool.close()
+            pool.join()
+    elapsed = time.perf_counter() - start
+    return {
+        'files': ok + failed,
+        'ok': ok,
+        'failed': failed,
+        'workers': workers,
+        'chunksize': chunksize,
+        'seconds': round(elapsed, 3),
+        'files_per_sec': round((ok + failed) / elapsed, 2) if elapsed > 0 else None,
+    }
+
 # CLI for quick test
 if __name__ == "__main__":
-    
-    if len(sys.argv) > 1:
-        resume_path = sys.argv[1]
-    else:
-        resume_path = "data\\resumes\\Hrithik_Resume.pdf"
-        print(f"No file specified, using default: {resume_path}")
-    
-    pprint(nlp_resume_parse(resume_path))
+    import argparse
+
+    ap = argparse.ArgumentParser(description='NLP resume parser (single file or batch).')
+    ap.add_argument('target', nargs='?', default="data\\resumes\\Hrithik_Resume.pdf",
+                    help='Resume file, directory or glob pattern')
+    ap.add_argument('--workers', type=int, default=None, help='Worker processes (default: CPU count)')
+    ap.add_argument('--chunksize', type=int, default=4, help='Files handed to a worker at a time')
+    ap.add_argument('--out', default=None, help='JSONL output path for batch mode (default: stdout)')
+    args = ap.parse_args()
+
+    if os.path.isfile(args.target) and args.out is None:
+        pprint(nlp_resume_parse(args.target))
+        sys.exit(0)
+
+    paths = iter_resume_paths(args.target)
+    if not paths:
+        print(f"No resumes found for {args.target}", file=sys.stderr)
+        sys.exit(1)
+    out = open(args.out, 'w', encoding='utf-8') if args.out else sys.stdout
+    try:
+        stats = batch_parse(paths, out=out, workers=args.workers, chunksize=args.chunksize)
+    finally:
+        if out is not sys.stdout:
+            out.close()
+    print(f"[NLP Parser] {stats['ok']}/{stats['files']} parsed, {stats['failed']} failed "
+          f"in {stats['seconds']}s ({stats['files_per_sec']} files/sec, "
+          f"{stats['workers']} workers)", file=sys.stderr)
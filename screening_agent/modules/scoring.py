@@ -0,0 +1,401 @@
+# scoring.py
+"""
+Deterministic, no-LLM scoring of many candidates against one JD.
+
+Candidates are packed once into a CandidatePool (flat int32 skill-id array with
+per-candidate offsets, years of experience, highest degree level). score_pool()
+then builds the candidates × JD-requirements matrices and every sub-score with
+NumPy in a single batched pass, so ranking cost is a handful of array ops
+regardless of pool size. Weights come from the `scoring` section of config.yaml.
+"""
+
+import os
+import re
+import json
+import heapq
+from functools import lru_cache
+
+import numpy as np
+
+from config_loader import get_section
+from skill_matcher import get_skill_matcher, skill_key
+from experience import batch_experience
+
+SUB_SCORES = ("required_skills", "preferred_skills", "experience", "qualifications")
+DEFAULT_WEIGHTS = {"required_skills": 0.50, "preferred_skills": 0.15,
+                   "experience": 0.25, "qualifications": 0.10}
+DEFAULT_JD_PATH = os.path.join(os.path.dirname(__file__),
+                               "../../data/JD_JSON_Extracted/67c32787-fb6b-45f2-8f76-826118d37577.json")
+
+# ---------- normalisation helpers -------------------------------------------
+_DEGREE_PATTERNS = [
+    (3, re.compile(r"\b(ph\.?\s?d|doctor(ate)?|d\.?phil)\b", re.I)),
+    (2, re.compile(r"\b(master'?s?|m\.?\s?sc|m\.?\s?tech|m\.?\s?s|m\.?\s?e|m\.?\s?a|mba|mca|post\s?graduate)\b", re.I)),
+    (1, re.compile(r"\b(bachelor'?s?|b\.?\s?sc|b\.?\s?tech|b\.?\s?e|b\.?\s?s|b\.?\s?a|bca|undergraduate)\b", re.I)),
+]
+
+@lru_cache(maxsize=50_000)
+def degree_level(text: str) -> int:
+    """0 = none/unknown, 1 = bachelor, 2 = master, 3 = doctorate."""
+    for level, pattern in _DEGREE_PATTERNS:
+        if pattern.search(text):
+            return level
+    return 0
+
+def _degree_text(entry) -> str:
+    if isinstance(entry, dict):
+        return str(entry.get("degree", ""))
+    return str(entry)
+
+def jd_required_level(jd: dict) -> int:
+    # Qualifications are alternatives ("BE/BTech", "MCA", ...): the lowest one listed is enough.
+    levels = [degree_level(q) for q in jd.get("required_qualifications") or []]
+    levels = [lv for lv in levels if lv]
+    return min(levels) if levels else 0
+
+# ---------- candidate pool --------------------------------------------------
+class CandidatePool:
+    """Columnar view of parsed resumes, built once and reused for every JD."""
+
+    def __init__(self, ids, vocab, skill_ids, offsets, years, degree):
+        self.ids = ids                  # candidate identifiers (name or path)
+        self.vocab = vocab              # skill key -> int id
+        self.skill_ids = skill_ids      # int32, all candidates' skill ids back to back
+        self.offsets = offsets          # int64, len n+1; candidate i owns skill_ids[offsets[i]:offsets[i+1]]
+        self.years = years              # float32, NaN when unknown
+        self.degree = degree            # int8 highest degree level
+
+    def __len__(self):
+        return len(self.ids)
+
+    @classmethod
+    def from_resumes(cls, resumes, ids=None):
+        vocab = {}
+        flat, offsets, years, degree = [], [0], [], []
+        for i, r in enumerate(resumes):
+            row = {vocab.setdefault(skill_key(s), len(vocab)) for s in r.get("skills") or [] if s}
+            flat.extend(row)
+            offsets.append(len(flat))
+            y = r.get("total_years_of_experience")
+            years.append(float(y) if isinstance(y, (int, float)) else np.nan)
+            degree.append(max((degree_level(_degree_text(e)) for e in r.get("education") or []),
+                              default=0))
+        if ids is None:
+            ids = [r.get("name") or f"candidate_{i}" for i, r in enumerate(resumes)]
+        years = np.asarray(years, dtype=np.float32)
+        # Parses without a total (or from older runs) get one from their dated roles.
+        todo = [i for i in np.flatnonzero(np.isnan(years)) if resumes[i].get("past_roles")]
+        if todo:
+            years[todo] = batch_experience([resumes[i] for i in todo])["total_years"]
+        return cls(list(ids), vocab,
+                   np.asarray(flat, dtype=np.int32),
+                   np.asarray(offsets, dtype=np.int64),
+                   years,
+                   np.asarray(degree, dtype=np.int8))
+
+    def subset(self, idx) -> "CandidatePool":
+        """Pool of the given candidate indices (same vocab), e.g. the survivors of a pre-filter."""
+        idx = np.asarray(idx, dtype=np.int64)
+        lengths = np.diff(self.offsets)[idx]
+        offsets = np.zeros(len(idx) + 1, dtype=np.int64)
+        np.cumsum(lengths, out=offsets[1:])
+        # Position of every kept skill id in the flat array: row start + 0..length-1.
+        gather = np.repeat(self.offsets[idx] - offsets[:-1], lengths) + np.arange(offsets[-1])
+        return CandidatePool([self.ids[i] for i in idx], self.vocab, self.skill_ids[gather],
+                             offsets, self.years[idx], self.degree[idx])
+
+    def skill_matrix(self, skills) -> np.ndarray:
+        """Boolean candidates × skills matrix for the given JD skill list."""
+        n, m = len(self), len(skills)
+        out = np.zeros((n, m), dtype=bool)
+        if not m or not len(self.skill_ids):
+            return out
+        # Aliases ("JS", "JavaScript") share a vid: fill one column per distinct vid,
+        # then copy it to every JD column that maps to it.
+        vids = [self.vocab.get(skill_key(s)) for s in skills]
+        distinct = list(dict.fromkeys(v for v in vids if v is not None))
+        if not distinct:
+            return out
+        lookup = np.full(len(self.vocab), -1, dtype=np.int32)
+        lookup[distinct] = np.arange(len(distinct), dtype=np.int32)
+        cols = lookup[self.skill_ids]
+        rows = np.repeat(np.arange(n, dtype=np.int64), np.diff(self.offsets))
+        hit = cols >= 0
+        found = np.zeros((n, len(distinct)), dtype=bool)
+        found[rows[hit], cols[hit]] = True
+        mapped = [col for col, v in enumerate(vids) if v is not None]
+        out[:, mapped] = found[:, lookup[[vids[c] for c in mapped]]]
+        return out
+
+# ---------- scoring ---------------------------------------------------------
+def _weights(config: dict) -> np.ndarray:
+    w = {**DEFAULT_WEIGHTS, **(config.get("weights") or {})}
+    arr = np.array([float(w[k]) for k in SUB_SCORES], dtype=np.float32)
+    total = arr.sum()
+    return arr / total if total > 0 else arr
+
+def experience_scores(years: np.ndarray, min_years, max_years, config: dict) -> np.ndarray:
+    exp_cfg = config.get("experience") or {}
+    penalty = float(exp_cfg.get("over_max_penalty_per_year", 0.05))
+    missing = float(exp_cfg.get("missing_score", 0.0))
+    lo = float(min_years) if isinstance(min_years, (int, float)) else 0.0
+    hi = float(max_years) if isinstance(max_years, (int, float)) and max_years else np.inf
+    with np.errstate(invalid="ignore", divide="ignore"):
+        score = np.where(years >= lo, 1.0, years / lo if lo > 0 else 1.0)
+        score = np.where(years > hi, 1.0 - penalty * (years - hi), score)
+    score = np.clip(score, 0.0, 1.0)
+    return np.where(np.isnan(years), missing, score).astype(np.float32)
+
+def qualification_scores(degree: np.ndarray, required_level: int) -> np.ndarray:
+    if not required_level:
+        return np.ones(len(degree), dtype=np.float32)
+    return np.minimum(degree.astype(np.float32) / required_level, 1.0)
+
+def final_scores(subs: np.ndarray, config: dict) -> np.ndarray:
+    """Weighted sum of the n × len(SUB_SCORES) sub-score matrix, with the coverage cut-off."""
+    # Column by column in float64 rather than a BLAS matmul, whose blocking can give
+    # identical rows different last bits and break the lower-index tie order.
+    w = _weights(config).astype(np.float64)
+    final = np.zeros(len(subs), dtype=np.float64)
+    for j, weight in enumerate(w):
+        final += weight * subs[:, j].astype(np.float64)
+    min_cov = float(config.get("min_required_coverage", 0.0))
+    if min_cov > 0:
+        final = np.where(subs[:, 0] < min_cov, 0.0, final)
+    return final
+
+def score_pool(jd: dict, pool: CandidatePool, config: dict | None = None) -> dict:
+    """
+    Score every candidate in the pool against the JD. Returns arrays keyed by
+    sub-score name plus "final" and "order" (candidate indices, best first).
+    """
+    config = get_section("scoring") if config is None else config
+    required = jd.get("required_skills") or []
+    preferred = jd.get("preferred_skills") or []
+    req_m = pool.skill_matrix(required)
+    pref_m = pool.skill_matrix(preferred)
+    n = len(pool)
+
+    subs = np.empty((n, len(SUB_SCORES)), dtype=np.float32)
+    subs[:, 0] = req_m.mean(axis=1) if required else 1.0
+    subs[:, 1] = pref_m.mean(axis=1) if preferred else 1.0
+    subs[:, 2] = experience_scores(pool.years, jd.get("min_experience_years"),
+                                   jd.get("max_experience_years"), config)
+    subs[:, 3] = qualification_scores(pool.degree, jd_required_level(jd))
+
+    final = final_scores(subs, config)
+    order = np.argsort(-final, kind="stable")
+    out = {name: subs[:, i] for i, name in enumerate(SUB_SCORES)}
+    out.update(final=final, order=order, required_matrix=req_m, preferred_matrix=pref_m)
+    return out
+
+def _ranked_row(pool: CandidatePool, res: dict, i: int, idx: int, required: list) -> dict:
+    return {
+        "candidate": pool.ids[i],
+        "index": idx,
+        "score": round(float(res["final"][i]), 4),
+        "sub_scores": {k: round(float(res[k][i]), 4) for k in SUB_SCORES},
+        "missing_required": [s for s, hit in zip(required, res["required_matrix"][i]) if not hit],
+    }
+
+def rank_candidates(jd: dict, resumes: list, top_k: int | None = None,
+                    config: dict | None = None, pool: CandidatePool | None = None) -> list:
+    """Convenience wrapper: ranked list of dicts with sub-scores and missing required skills."""
+    pool = pool or CandidatePool.from_resumes(resumes)
+    res = score_pool(jd, pool, config)
+    required = jd.get("required_skills") or []
+    return [_ranked_row(pool, res, int(idx), int(idx), required) for idx in res["order"][:top_k]]
+
+# ---------- pre-filter + top-K ----------------------------------------------
+class SkillIndex:
+    """Inverted index skill id → candidate indices (CSR), built once per pool."""
+
+    def __init__(self, pool: CandidatePool):
+        rows = np.repeat(np.arange(len(pool), dtype=np.int64), np.diff(pool.offsets))
+        order = np.argsort(pool.skill_ids)
+        self.postings = rows[order]
+        self.offsets = np.zeros(len(pool.vocab) + 1, dtype=np.int64)
+        np.cumsum(np.bincount(pool.skill_ids, minlength=len(pool.vocab)), out=self.offsets[1:])
+        self.vocab = pool.vocab
+
+    def candidates(self, skills) -> tuple[np.ndarray, np.ndarray]:
+        """(candidate indices, number of the given skills each has); only candidates with ≥ 1."""
+        ids = {self.vocab.get(skill_key(s)) for s in skills} - {None}
+        if not ids:
+            return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64)
+        hits = np.concatenate([self.postings[self.offsets[v]:self.offsets[v + 1]] for v in ids])
+        return np.unique(hits, return_counts=True)
+
+
+class TopK:
+    """Bounded min-heap of the k best (score, index) pairs; ties keep the lower index."""
+
+    def __init__(self, k: int):
+        self.k, self.heap = k, []
+
+    def push(self, score: float, idx: int):
+        item = (score, -idx)
+        if len(self.heap) < self.k:
+            heapq.heappush(self.heap, item)
+        elif item > self.heap[0]:
+            heapq.heapreplace(self.heap, item)
+
+    def threshold(self) -> float:
+        """Score a newcomer must beat once the heap is full (-inf until then)."""
+        return self.heap[0][0] if len(self.heap) == self.k else -np.inf
+
+    def items(self) -> list:
+        return [(score, -neg) for score, neg in sorted(self.heap, reverse=True)]
+
+
+def prefilter(jd: dict, pool: CandidatePool, index: SkillIndex | None = None,
+              filters: dict | None = None) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Candidates that pass the JD's hard constraints (`ranking` section of config.yaml):
+    at least min_required_skills of the required skills (from the inverted index, so
+    candidates sharing none are never touched), years ≥ min_experience_ratio × the JD
+    minimum (unknown years pass) and, with require_qualification, a degree at the JD
+    level (no parsed degree passes). Returns (indices, required-skill hit counts).
+    """
+    filters = get_section("ranking") if filters is None else filters
+    required = jd.get("required_skills") or []
+    if min(int(filters.get("min_required_skills", 1)), len(required)) > 0:
+        index = index or SkillIndex(pool)
+        idx, counts = index.candidates(required)
+    else:
+        idx = np.arange(len(pool), dtype=np.int64)
+        counts = pool.skill_matrix(required).sum(axis=1) if required else np.zeros(len(pool), dtype=np.int64)
+    keep = constraint_mask(jd, counts, pool.years[idx], pool.degree[idx], filters)
+    return idx[keep], counts[keep]
+
+
+def constraint_mask(jd: dict, counts: np.ndarray, years: np.ndarray, degree: np.ndarray,
+                    filters: dict | None = None) -> np.ndarray:
+    """prefilter()'s hard constraints as a mask, from required-skill hit counts, years and degree level."""
+    filters = get_section("ranking") if filters is None else filters
+    required = jd.get("required_skills") or []
+    min_skills = min(int(filters.get("min_required_skills", 1)), len(required))
+    keep = counts >= min_skills
+    min_years = jd.get("min_experience_years")
+    ratio = float(filters.get("min_experience_ratio", 0.0))
+    if isinstance(min_years, (int, float)) and min_years > 0 and ratio > 0:
+        keep &= np.isnan(years) | (years >= ratio * min_years)
+    level = jd_required_level(jd)
+    if filters.get("require_qualification") and level:
+        keep &= (degree == 0) | (degree >= level)
+    return keep
+
+
+def rank_top_k(jd: dict, pool: CandidatePool, k: int, config: dict | None = None,
+               index: SkillIndex | None = None, filters: dict | None = None,
+               stats: dict | None = None) -> list:
+    """
+    Top-k of the pool, scored exactly like score_pool but only as far as needed.
+
+    Survivors of prefilter() get an upper bound (exact required / experience /
+    qualification sub-scores, preferred skills assumed all present) and are scored in
+    chunks of descending bound with score_pool on a sub-pool, feeding a bounded heap.
+    Scoring stops once no remaining bound can beat the k-th best, so the work after the
+    index lookup follows k and the score spread, not the applicant pool.
+    """
+    config = get_section("scoring") if config is None else config
+    filters = get_section("ranking") if filters is None else filters
+    stats = stats if stats is not None else {}
+    idx, counts = prefilter(jd, pool, index, filters)
+    stats.update(pool=len(pool), survivors=len(idx), scored=0, chunks=0)
+    if not len(idx) or k <= 0:
+        return []
+
+    required = jd.get("required_skills") or []
+    w = _weights(config)
+    coverage = counts / len(required) if required else np.ones(len(idx))
+    bound = (w[0] * coverage + w[1]
+             + w[2] * experience_scores(pool.years[idx], jd.get("min_experience_years"),
+                                        jd.get("max_experience_years"), config)
+             + w[3] * qualification_scores(pool.degree[idx], jd_required_level(jd)))
+    min_cov = float(config.get("min_required_coverage", 0.0))
+    if min_cov > 0:
+        bound = np.where(coverage < min_cov, 0.0, bound)
+    bound = bound + 1e-6                                  # float32 rounding in the exact score
+    order = np.lexsort((idx, -bound))                     # best bound first, lower index on ties
+    chunk = max(int(filters.get("chunk_size", 256)), k)
+
+    top, rows = TopK(k), {}
+    for start in range(0, len(order), chunk):
+        part = order[start:start + chunk]
+        if bound[part[0]] < top.threshold():
+            break
+        sub = pool.subset(idx[part])
+        res = score_pool(jd, sub, config)
+        for i in range(len(part)):
+            top.push(float(res["final"][i]), int(idx[part[i]]))
+            rows[int(idx[part[i]])] = (sub, res, i)
+        stats["scored"] += len(part)
+        stats["chunks"] += 1
+
+    ranked = []
+    for _, cand in top.items():
+        sub, res, i = rows[cand]
+        ranked.append(_ranked_row(sub, res, i, cand, required))
+    return ranked
+
+# ---------------------- benchmark -------------------------------------------
+def benchmark(n: int = 50_000, seed: int = 0) -> dict:
+    import time
+    import random
+
+    rng = random.Random(seed)
+    names = list(get_skill_matcher().names.values())
+    degrees = ["BSc Mathematics", "B.Tech Computer Science", "MSc Data Science", "MCA", "PhD Physics", ""]
+    resumes = [{
+        "name": f"cand_{i}",
+        "skills": rng.sample(names, rng.randint(5, 25)),
+        "total_years_of_experience": round(rng.uniform(0, 15), 1),
+        "education": [{"degree": rng.choice(degrees)}],
+    } for i in range(n)]
+    with open(DEFAULT_JD_PATH, "r", encoding="utf-8") as f:
+        jd = json.load(f)
+
+    t0 = time.perf_counter()
+    pool = CandidatePool.from_resumes(resumes)
+    build = time.perf_counter() - t0
+    t0 = time.perf_counter()
+    res = score_pool(jd, pool)
+    score = time.perf_counter() - t0
+    index = SkillIndex(pool)
+    stats = {}
+    t0 = time.perf_counter()
+    top = rank_top_k(jd, pool, 20, index=index, stats=stats)
+    top_s = time.perf_counter() - t0
+    return {"candidates": n, "pool_build_s": round(build, 3), "score_rank_s": round(score, 4),
+            "top_k_s": round(top_s, 4), "top_k_scored": stats["scored"],
+            "top": pool.ids[int(res["order"][0])], "top_k_same": top[0]["candidate"] == pool.ids[int(res["order"][0])]}
+
+if __name__ == "__main__":
+    import argparse
+    import glob
+    from pprint import pprint
+
+    ap = argparse.ArgumentParser(description="Rank parsed resumes against a JD without LLM calls.")
+    ap.add_argument("--jd-json", default=DEFAULT_JD_PATH)
+    ap.add_argument("--resume-dir", help="Folder of parsed resume JSON files (default: the candidate store)")
+    ap.add_argument("--top", type=int, default=10)
+    ap.add_argument("--bench", type=int, metavar="N", help="Rank N synthetic candidates and time it")
+    args = ap.parse_args()
+
+    if args.bench:
+        pprint(benchmark(args.bench))
+    else:
+        with open(args.jd_json, "r", encoding="utf-8") as f:
+            jd = json.load(f)
+        if args.resume_dir:
+            ids, resumes = [], []
+            for path in sorted(glob.glob(os.path.join(args.resume_dir, "*.json"))):
+                with open(path, "r", encoding="utf-8") as f:
+                    resumes.append(json.load(f))
+                ids.append(os.path.splitext(os.path.basename(path))[0])
+            pool = CandidatePool.from_resumes(resumes, ids=ids)
+        else:
+            from candidate_store import get_store
+            pool = get_store().load_table(jd.get("JOB_ID", "")).pool()
+        pprint(rank_top_k(jd, pool, args.top))
@@ -0,0 +1,218 @@
+# semantic_matcher.py
+"""
+Offline semantic matching between JDs and parsed resumes.
+
+Text is embedded locally with hashed character n-grams (no model download, no
+network), which is enough to connect "Postgres" with "PostgreSQL" or a duty line
+like "built ETL jobs in Airflow" with the skill "Airflow". Each candidate gets
+one vector per field (skills, duties, projects) stored in an append-only,
+memory-mapped float16 matrix, so a pool is embedded once and re-queried against
+any number of JDs. Field weights are applied at query time.
+"""
+
+import os
+import json
+import zlib
+import numpy as np
+
+from config_loader import get_section
+
+BASE_DIR      = os.path.dirname(__file__)
+INDEX_DIR     = os.path.join(BASE_DIR, "../../data/semantic_index")
+FIELDS        = ("skills", "duties", "projects")
+DEFAULTS      = {"dim": 1024, "ngram_min": 3, "ngram_max": 5,
+                 "field_weights": {"skills": 0.6, "duties": 0.3, "projects": 0.1}}
+
+# ---------- embedding -------------------------------------------------------
+def _settings() -> dict:
+    cfg = {**DEFAULTS, **get_section("semantic")}
+    cfg["field_weights"] = {**DEFAULTS["field_weights"], **(cfg.get("field_weights") or {})}
+    return cfg
+
+def embed(texts, dim: int = DEFAULTS["dim"], ngram_min: int = 3, ngram_max: int = 5) -> np.ndarray:
+    """L2-normalised hashed char n-gram vectors, one row per text (zeros for empty text)."""
+    out = np.zeros((len(texts), dim), dtype=np.float32)
+    for row, text in enumerate(texts):
+        counts = {}
+        for word in (text or "").lower().split():
+            padded = f" {word} "
+            for n in range(ngram_min, ngram_max + 1):
+                for i in range(len(padded) - n + 1):
+                    h = zlib.crc32(padded[i:i + n].encode("utf-8"))
+                    counts[h % dim] = counts.get(h % dim, 0) + 1
+        if counts:
+            idx = np.fromiter(counts.keys(), dtype=np.int64, count=len(counts))
+            val = np.fromiter(counts.values(), dtype=np.float32, count=len(counts))
+            out[row, idx] = 1.0 + np.log(val)          # sublinear tf
+    norms = np.linalg.norm(out, axis=1, keepdims=True)
+    np.divide(out, norms, out=out, where=norms > 0)
+    return out
+
+def resume_fields(resume: dict) -> dict:
+    """Flatten the parsed resume JSON into one text per indexed field."""
+    duties = []
+    for role in resume.get("past_roles") or []:
+        d = role.get("duties") or role.get("job_duties") or []
+        duties.extend(d if isinstance(d, list) else [d])
+        duties.append(role.get("title", ""))
+    projects = []
+    for p in resume.get("projects") or []:
+        projects.append(" ".join(str(v) for v in p.values()) if isinstance(p, dict) else str(p))
+    return {
+        "skills": " ; ".join(resume.get("skills") or []),
+        "duties": " ; ".join(str(d) for d in duties if d),
+        "projects": " ; ".join(projects),
+    }
+
+def jd_text(jd: dict) -> str:
+    parts = list(jd.get("required_skills") or []) + list(jd.get("preferred_skills") or [])
+    parts += [jd.get("domain") or ""] + list(jd.get("other_notes") or [])
+    return " ; ".join(str(p) for p in parts if p)
+
+# ---------- persisted index -------------------------------------------------
+class SemanticIndex:
+    """
+    Append-only on-disk index:
+      header.json   dim / fields / n-gram settings
+      ids.jsonl     one candidate id per row, in row order
+      vectors.f16   float16 rows of shape (len(FIELDS), dim), memory-mapped for queries
+    ids.jsonl is the commit record: vector rows past it (an add that died half-way)
+    are ignored and overwritten. Single writer; any number of readers.
+    """
+
+    def __init__(self, path: str = INDEX_DIR, dim: int | None = None):
+        cfg = _settings()
+        self.path = path
+        os.makedirs(path, exist_ok=True)
+        header_path = os.path.join(path, "header.json")
+        if os.path.exists(header_path):
+            with open(header_path, "r", encoding="utf-8") as f:
+                self.header = json.load(f)
+        else:
+            self.header = {"dim": dim or cfg["dim"], "fields": list(FIELDS),
+                           "ngram_min": cfg["ngram_min"], "ngram_max": cfg["ngram_max"]}
+            with open(header_path, "w", encoding="utf-8") as f:
+                json.dump(self.header, f, indent=2)
+        self.dim = self.header["dim"]
+        self._vec_path = os.path.join(path, "vectors.f16")
+        self._ids_path = os.path.join(path, "ids.jsonl")
+        self.ids, self._ids_bytes = [], 0
+        if os.path.exists(self._ids_path):
+            with open(self._ids_path, "rb") as f:
+                for line in f:
+                    if not line.endswith(b"\n"):         # torn write: not committed
+                        break
+                    self._ids_bytes += len(line)
+                    if line.strip():
+                        self.ids.append(json.loads(line))
+        self._pos = {cid: i for i, cid in enumerate(self.ids)}
+        self._mm = None
+
+    def __len__(self):
+        return len(self.ids)
+
+    def __contains__(self, candidate_id):
+        return candidate_id in self._pos
+
+    def _embed(self, texts):
+        return embed(texts, self.dim, self.header["ngram_min"], self.header["ngram_max"])
+
+    def add(self, resumes, ids) -> int:
+        """
+        Embed and append candidates not already indexed; returns how many were added.
+        An id repeated within the batch is indexed once, with its last resume.
+        """
+        batch = {}
+        for cid, r in zip(ids, resumes):
+            if cid not in self._pos:
+                batch[cid] = r
+        if not batch:
+            return 0
+        new = list(batch.items())
+        fields = self.header["fields"]
+        texts = [resume_fields(r) for _, r in new]
+        block = np.stack([self._embed([t[f] for t in texts]) for f in fields], axis=1)
+        row_bytes = len(fields) * self.dim * np.dtype(np.float16).itemsize
+        self._mm = None                                # release the map before resizing the file
+        # Vectors first, at the committed row count (dropping rows of an add that died
+        # before its ids landed), then the ids in one write at the committed length: that
+        # append commits the rows.
+        with open(self._vec_path, "ab") as f:
+            f.truncate(len(self.ids) * row_bytes)
+            f.write(block.astype(np.float16).tobytes())
+            f.flush()
+            os.fsync(f.fileno())
+        lines = "".join(json.dumps(cid) + "\n" for cid, _ in new).encode("utf-8")
+        with open(self._ids_path, "ab") as f:
+            f.truncate(self._ids_bytes)
+            f.write(lines)
+        self._ids_bytes += len(lines)
+        for cid, _ in new:
+            self._pos[cid] = len(self.ids)
+            self.ids.append(cid)
+        return len(new)
+
+    def vectors(self) -> np.ndarray:
+        if self._mm is None:
+            if not self.ids:
+                return np.zeros((0, len(self.header["fields"]), self.dim), dtype=np.float16)
+            self._mm = np.memmap(self._vec_path, dtype=np.float16, mode="r",
+                                 shape=(len(self.ids), len(self.header["fields"]), self.dim))
+        return self._mm
+
+    def scores(self, jd: dict, field_weights: dict | None = None,
+               chunk: int = 65_536) -> np.ndarray:
+        """Weighted cosine similarity of every indexed candidate to the JD."""
+        weights = field_weights or _settings()["field_weights"]
+        fields = self.header["fields"]
+        w = np.array([float(weights.get(f, 0.0)) for f in fields], dtype=np.float32)
+        w = w / w.sum() if w.sum() > 0 else w
+        q = self._embed([jd_text(jd)])[0]
+        mm = self.vectors()
+        out = np.empty(len(mm), dtype=np.float32)
+        for start in range(0, len(mm), chunk):
+            block = np.asarray(mm[start:start + chunk], dtype=np.float32)   # (c, F, dim)
+            out[start:start + chunk] = (block @ q) @ w
+        return out
+
+    def top_k(self, jd: dict, k: int = 10, field_weights: dict | None = None) -> list:
+        s = self.scores(jd, field_weights)
+        if not len(s):
+            return []
+        k = min(k, len(s))
+        idx = np.argpartition(-s, k - 1)[:k]
+        idx = idx[np.argsort(-s[idx], kind="stable")]
+        return [(self.ids[i], round(float(s[i]), 4)) for i in idx]
+
+
+if __name__ == "__main__":
+    import argparse
+    import glob
+    from pprint import pprint
+
+    ap = argparse.ArgumentParser(description="Offline semantic index for parsed resumes.")
+    ap.add_argument("--index", default=INDEX_DIR)
+    sub = ap.add_subparsers(dest="cmd", required=True)
+    add_p = sub.add_parser("add", help="Embed parsed resume JSON files into the index")
+    add_p.add_argument("paths", nargs="+", help="JSON files, folders or globs")
+    q_p = sub.add_parser("query", help="Top-k candidates for a JD JSON")
+    q_p.add_argument("--jd-json", required=True)
+    q_p.add_argument("--k", type=int, default=10)
+    args = ap.parse_args()
+
+    index = SemanticIndex(args.index)
+    if args.cmd == "add":
+        files = []
+        for p in args.paths:
+            files += sorted(glob.glob(os.path.join(p, "**", "*.json"), recursive=True)) \
+                if os.path.isdir(p) else sorted(glob.glob(p))
+        resumes = []
+        for path in files:
+            with open(path, "r", encoding="utf-8") as f:
+                resumes.append(json.load(f))
+        added = index.add(resumes, [os.path.relpath(p) for p in files])
+        print(f"[Semantic Matcher] Added {added} candidates ({len(index)} indexed).")
+    else:
+        with open(args.jd_json, "r", encoding="utf-8") as f:
+            jd = json.load(f)
+        pprint(index.top_k(jd, args.k))
@@ -3,8 +3,15 @@ import os
 from typing import List, Dict, Any
 
 from openai_model import generate as openai_generate
+from async_llm import estimate_tokens
+from config_loader import get_section
+from logging_module import stage
+from json_output import parse_json, validate_json, skill_scores_schema, skill_batch_schema
 
 PROMPT_PATH = os.path.join(os.path.dirname(__file__), '../prompts/skills_match.txt')
+BATCH_PROMPT_PATH = os.path.join(os.path.dirname(__file__), '../prompts/skills_match_batch.txt')
+SYSTEM = "You are an HR assistant who carefully scores candidate skills." \
+         " Return strict JSON."
 
 
 def _load_prompt_template(path: str) -> str:
@@ -12,6 +19,17 @@ def _load_prompt_template(path: str) -> str:
         return f.read()
 
 
+def _experience_text(past_roles: List[Dict[str, Any]] | None) -> str:
+    experience_lines: List[str] = []
+    for role in past_roles or []:
+        title = role.get('title', '')
+        company = role.get('company', '')
+        start = role.get('start_year_month', role.get('start_month_year', role.get('start_year', '')))
+        end = role.get('end_year_month', role.get('end_month_year', role.get('end_year', '')))
+        experience_lines.append(f"{title} at {company} ({start} - {end})")
+    return '\n'.join(experience_lines)
+
+
 def score_skills(required_skills: List[str],
                  resume_skills: List[str],
                  past_roles: List[Dict[str, Any]] | None = None) -> Dict[str, Any]:
@@ -21,49 +39,155 @@ def score_skills(required_skills: List[str],
     jd_section = '\n'.join(f"- {skill}" for skill in required_skills)
     resume_section = ', '.join(resume_skills)
 
-    experience_lines: List[str] = []
-    if past_roles:
-        for role in past_roles:
-            title = role.get('title', '')
-            company = role.get('company', '')
-            start = role.get('start_year_month', '')
-            end = role.get('end_year_month', '')
-            experience_lines.append(f"{title} at {company} ({start} - {end})")
-    experience_text = '\n'.join(experience_lines)
-
-    prompt = prompt_template.format(
-        REQUIRED_SKILLS=jd_section,
-        RESUME_SKILLS=resume_section,
-        EXPERIENCE=experience_text,
-    )
-
-    system = "You are an HR assistant who carefully scores candidate skills." \
-             " Return strict JSON."
-
-    response = openai_generate(prompt, system=system, max_tokens=800, temperature=0.3)
+    # str.replace, not str.format: the template's JSON example contains braces.
+    prompt = (prompt_template
+              .replace('{REQUIRED_SKILLS}', jd_section)
+              .replace('{RESUME_SKILLS}', resume_section)
+              .replace('{EXPERIENCE}', _experience_text(past_roles)))
+
+    with stage("llm_call", task="skill_scoring"):
+        response = openai_generate(prompt, system=SYSTEM, max_tokens=800, temperature=0.3,
+                                   validate=validate_json, schema=skill_scores_schema(required_skills))
 
     try:
-        return json.loads(response)
+        with stage("json_parse", task="skill_scoring"):
+            return parse_json(response)
     except json.JSONDecodeError as e:
         raise ValueError(f"Model did not return valid JSON: {e}\nResponse: {response}")
 
 
+# ---------- batched scoring -------------------------------------------------
+def _candidate_block(key: str, resume: Dict[str, Any]) -> str:
+    return (f"[{key}]\nSkills: {', '.join(resume.get('skills') or [])}\n"
+            f"Experience:\n{_experience_text(resume.get('past_roles'))}\n")
+
+
+def _pack_batches(blocks: List[tuple], base_tokens: int, prompt_budget: int,
+                  per_candidate_out: int, max_output: int) -> List[List[tuple]]:
+    """Greedy packing of (key, block) pairs under both the prompt and response budgets."""
+    batches, current, used = [], [], base_tokens
+    per_batch = max(1, max_output // max(per_candidate_out, 1))
+    for key, block in blocks:
+        cost = estimate_tokens(block)
+        if current and (used + cost > prompt_budget or len(current) >= per_batch):
+            batches.append(current)
+            current, used = [], base_tokens
+        current.append((key, block))
+        used += cost
+    if current:
+        batches.append(current)
+    return batches
+
+
+def _valid_entry(entry: Any, required_skills: List[str]) -> bool:
+    return isinstance(entry, dict) and all(
+        isinstance(entry.get(s), dict) and 'score' in entry[s] for s in required_skills)
+
+
+def score_skills_batch(required_skills: List[str],
+                       candidates: Dict[str, Dict[str, Any]],
+                       stats: Dict[str, int] | None = None) -> Dict[str, Any]:
+    """
+    Score many candidates in as few requests as the token budget allows.
+
+    `candidates` maps candidate id -> parsed resume (uses "skills" and "past_roles").
+    The JD is stated once per request and the model returns a JSON object keyed per
+    candidate. A malformed response, or candidates missing from it, only re-sends the
+    affected sub-batch: it is halved and retried until single candidates remain, and a
+    candidate that still fails maps to {"error": ...}. A failed request (backend down,
+    timeout) is raised, not split.
+    """
+    cfg = get_section('skill_match')
+    prompt_budget = int(cfg.get('batch_prompt_tokens', 6000))
+    max_output = int(cfg.get('batch_max_output_tokens', 4000))
+    per_candidate_out = int(cfg.get('output_tokens_per_skill', 40)) * max(len(required_skills), 1)
+    stats = stats if stats is not None else {}
+    for k in ('requests', 'splits', 'failed'):
+        stats.setdefault(k, 0)
+
+    template = _load_prompt_template(BATCH_PROMPT_PATH)
+    template = template.replace('{REQUIRED_SKILLS}', '\n'.join(f"- {s}" for s in required_skills))
+    ids = list(candidates)
+    blocks = [(f"C{i + 1}", _candidate_block(f"C{i + 1}", candidates[cid])) for i, cid in enumerate(ids)]
+    key_to_id = {f"C{i + 1}": cid for i, cid in enumerate(ids)}
+    base = estimate_tokens(SYSTEM) + estimate_tokens(template)
+
+    results: Dict[str, Any] = {}
+
+    def _check(parsed: Any, keys: List[str]):
+        # Only fully-formed responses are worth caching.
+        if not isinstance(parsed, dict) or not all(_valid_entry(parsed.get(k), required_skills)
+                                                   for k in keys):
+            raise ValueError("incomplete batch response")
+
+    def run(batch: List[tuple]):
+        keys = [k for k, _ in batch]
+        prompt = template.replace('{CANDIDATES}', '\n'.join(b for _, b in batch))
+        stats['requests'] += 1
+        # A failed request propagates: a smaller batch wouldn't fix a backend that is down.
+        with stage("llm_call", task="skill_scoring_batch", candidates=len(batch)):
+            response = openai_generate(prompt, system=SYSTEM, temperature=0.3,
+                                       max_tokens=min(max_output, per_candidate_out * len(batch) + 50),
+                                       validate=lambda r: _check(validate_json(r), keys),
+                                       schema=skill_batch_schema(keys, required_skills))
+        try:
+            with stage("json_parse", task="skill_scoring_batch"):
+                parsed = parse_json(response)
+        except json.JSONDecodeError as e:
+            parsed, error = {}, f"{type(e).__name__}: {e}"
+        else:
+            error = "missing or incomplete in model output"
+        if not isinstance(parsed, dict):
+            parsed = {}
+        retry = []
+        for key, block in batch:
+            if _valid_entry(parsed.get(key), required_skills):
+                results[key_to_id[key]] = parsed[key]
+            else:
+                retry.append((key, block))
+        if not retry:
+            return
+        if len(retry) == 1 and len(batch) == 1:
+            stats['failed'] += 1
+            results[key_to_id[retry[0][0]]] = {'error': error}
+            return
+        stats['splits'] += 1
+        mid = max(1, len(retry) // 2)
+        for part in (retry[:mid], retry[mid:]):
+            if part:
+                run(part)
+
+    for batch in _pack_batches(blocks, base, prompt_budget, per_candidate_out, max_output):
+        run(batch)
+    return {cid: results[cid] for cid in ids}
+
+
 if __name__ == '__main__':
     import argparse
     from pprint import pprint
 
     parser = argparse.ArgumentParser(description='Score resume skills against JD requirements.')
     parser.add_argument('--jd-json', required=True, help='Path to JSON file with required_skills field')
-    parser.add_argument('--resume-json', required=True, help='Path to resume JSON file with skills and past_roles')
+    parser.add_argument('--resume-json', required=True, nargs='+',
+                        help='Resume JSON file(s) with skills and past_roles; several files are scored in batches')
     args = parser.parse_args()
 
     with open(args.jd_json, 'r', encoding='utf-8') as f:
         jd_data = json.load(f)
-    with open(args.resume_json, 'r', encoding='utf-8') as f:
-        resume_data = json.load(f)
-
-    scores = score_skills(jd_data.get('required_skills', []),
-                          resume_data.get('skills', []),
-                          resume_data.get('past_roles', []))
+    resumes = {}
+    for path in args.resume_json:
+        with open(path, 'r', encoding='utf-8') as f:
+            resumes[path] = json.load(f)
+
+    if len(resumes) == 1:
+        resume_data = next(iter(resumes.values()))
+        scores = score_skills(jd_data.get('required_skills', []),
+                              resume_data.get('skills', []),
+                              resume_data.get('past_roles', []))
+    else:
+        batch_stats: Dict[str, int] = {}
+        scores = score_skills_batch(jd_data.get('required_skills', []), resumes, stats=batch_stats)
+        print(f"[Skill Match] {len(resumes)} candidates in {batch_stats['requests']} requests "
+              f"({batch_stats['splits']} splits, {batch_stats['failed']} failed)")
 
     pprint(scores)
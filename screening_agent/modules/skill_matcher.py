@@ -0,0 +1,155 @@
+# skill_matcher.py
+"""
+Precompiled multi-pattern skill matcher.
+
+The taxonomy (config/skills_taxonomy.json, or SKILL_TAXONOMY_PATH) is a list of
+{"id", "name", "aliases"} entries. Every name/alias is tokenised and inserted into
+a token trie once; a scan walks the trie from each token of the text, so the
+cost depends on the text length and the longest skill (in tokens), not on how
+many skills the taxonomy holds.
+"""
+
+import os
+import re
+import json
+from functools import lru_cache
+
+BASE_DIR       = os.path.dirname(__file__)
+TAXONOMY_PATH  = os.getenv("SKILL_TAXONOMY_PATH",
+                           os.path.join(BASE_DIR, "../../config/skills_taxonomy.json"))
+
+# Letters/digits plus '+' and '#' so "C++" / "C#" survive; everything else separates.
+TOKEN_RE = re.compile(r"(?:[^\W_]|[+#])+")
+_END     = "\0"      # trie key holding the skill id at the end of a phrase
+
+
+def _tokens(text):
+    return [m.group(0).lower() for m in TOKEN_RE.finditer(text)]
+
+
+def load_taxonomy(path=TAXONOMY_PATH):
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+class SkillMatcher:
+    """Leftmost-longest, word-boundary-aware matcher over a skill taxonomy."""
+
+    def __init__(self, taxonomy):
+        self.trie = {}
+        self.names = {}          # skill id -> canonical display name
+        self.max_len = 0
+        for entry in taxonomy:
+            skill_id = entry["id"]
+            name = entry.get("name", skill_id)
+            self.names[skill_id] = name
+            for surface in [name] + list(entry.get("aliases", [])):
+                self._add(surface, skill_id)
+
+    def _add(self, surface, skill_id):
+        toks = _tokens(surface)
+        if not toks:
+            return
+        variants = [toks]
+        if len(toks) > 1:
+            variants.append(["".join(toks)])     # "ML Flow" also matches "MLflow"
+        for variant in variants:
+            node = self.trie
+            for tok in variant:
+                node = node.setdefault(tok, {})
+            node.setdefault(_END, skill_id)      # first registration wins
+            self.max_len = max(self.max_len, len(variant))
+
+    def __len__(self):
+        return len(self.names)
+
+    def finditer(self, text):
+        """Yield (skill_id, start, end) character offsets, non-overlapping."""
+        spans = [(m.group(0).lower(), m.start(), m.end()) for m in TOKEN_RE.finditer(text)]
+        i, n = 0, len(spans)
+        while i < n:
+            node, best, j = self.trie, None, i
+            while j < n and j - i < self.max_len:
+                node = node.get(spans[j][0])
+                if node is None:
+                    break
+                if _END in node:
+                    best = (node[_END], j)
+                j += 1
+            if best:
+                skill_id, last = best
+                yield skill_id, spans[i][1], spans[last][2]
+                i = last + 1
+            else:
+                i += 1
+
+    def match(self, text):
+        return list(self.finditer(text))
+
+    def exact(self, text):
+        """Skill id when the whole string is one known skill (trailing dots allowed), else None."""
+        text = text.strip()
+        hits = self.match(text)
+        if len(hits) == 1 and hits[0][1] == 0 and hits[0][2] >= len(text.rstrip(" .")):
+            return hits[0][0]
+        return None
+
+    def find_skills(self, text):
+        """Canonical skill names found in text, in first-seen order."""
+        seen = {}
+        for skill_id, _, _ in self.finditer(text):
+            seen.setdefault(skill_id, self.names[skill_id])
+        return list(seen.values())
+
+
+@lru_cache(maxsize=None)
+def get_skill_matcher(path=TAXONOMY_PATH):
+    """Process-wide matcher, built on first use."""
+    return SkillMatcher(load_taxonomy(path))
+
+
+@lru_cache(maxsize=200_000)
+def skill_key(skill: str) -> str:
+    """Canonical taxonomy id when the whole string is one known skill, else a folded string."""
+    skill_id = get_skill_matcher().exact(skill)
+    return skill_id if skill_id is not None else " ".join(skill.lower().split())
+
+# ---------------------- benchmark -------------------------------------------
+def benchmark(sizes=(100, 1000, 10000, 50000), text_words=2000, repeats=5):
+    """Time a scan of a fixed text while the taxonomy grows; returns rows of stats."""
+    import random
+    import time
+
+    rng = random.Random(0)
+    base = load_taxonomy()
+    words = [t for e in base for t in _tokens(e["name"])] + ["experience", "team", "built",
+                                                             "pipeline", "using", "with"]
+    text = " ".join(rng.choice(words) for _ in range(text_words))
+    rows = []
+    for size in sizes:
+        taxonomy = list(base)
+        for k in range(size - len(base)):
+            taxonomy.append({"id": f"syn-{k}", "name": f"synthskill{k} tool{k % 97}"})
+        t0 = time.perf_counter()
+        matcher = SkillMatcher(taxonomy)
+        build = time.perf_counter() - t0
+        t0 = time.perf_counter()
+        for _ in range(repeats):
+            hits = matcher.match(text)
+        scan = (time.perf_counter() - t0) / repeats
+        rows.append({"skills": len(matcher), "build_ms": round(build * 1000, 2),
+                     "scan_ms": round(scan * 1000, 3), "hits": len(hits)})
+    return rows
+
+
+if __name__ == "__main__":
+    import sys
+    from pprint import pprint
+
+    if len(sys.argv) > 1 and sys.argv[1] == "--bench":
+        print(f"{'skills':>8} {'build_ms':>10} {'scan_ms':>10} {'hits':>6}")
+        for row in benchmark():
+            print(f"{row['skills']:>8} {row['build_ms']:>10} {row['scan_ms']:>10} {row['hits']:>6}")
+    else:
+        text = sys.argv[1] if len(sys.argv) > 1 else "Postgres, MLflow, scikit learn and Apache Spark on k8s"
+        pprint(get_skill_matcher().match(text))
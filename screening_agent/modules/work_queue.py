@@ -0,0 +1,324 @@
+# work_queue.py
+"""
+Durable work queue in one SQLite file, so any number of worker processes, on this
+machine or on hosts sharing the filesystem, can drain a requisition together.
+
+    q = WorkQueue()
+    q.enqueue(job_id, "resume_parse", {"path": p}, key=file_hash(p))   # idempotent per key
+    for task in q.lease("host:123", n=4):
+        q.complete(task, handler(task["payload"]))                     # or q.fail(task, error)
+    q.progress(job_id)
+
+- Leases: a leased task belongs to one worker until `lease_expires`; heartbeat()
+  extends it. A worker that dies simply lets the lease run out and the task is
+  picked up again.
+- Retries: fail() puts the task back with exponential backoff (`backoff_s` · 2^(n-1));
+  after `max_attempts` it is dead-lettered (status "dead") with its last error, and
+  requeue_dead() brings it back.
+- Idempotent results: one row per (job_id, kind, key). complete() is fenced on the
+  lease (owner and attempt number): a worker whose lease expired and was taken over
+  stores nothing, and a stored result is never overwritten.
+
+Settings live in config/config.yaml → work_queue. WAL mode needs a local disk; for
+a shared (network) filesystem set `journal_mode: delete`.
+"""
+
+import os
+import json
+import time
+import socket
+import sqlite3
+import threading
+
+from config_loader import get_section
+
+BASE_DIR   = os.path.dirname(__file__)
+QUEUE_PATH = os.getenv("WORK_QUEUE_PATH", os.path.join(BASE_DIR, "../../data/store/work_queue.sqlite"))
+STATUSES   = ("queued", "leased", "done", "dead")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS tasks (
+    id             INTEGER PRIMARY KEY,
+    job_id         TEXT NOT NULL,
+    kind           TEXT NOT NULL,
+    key            TEXT NOT NULL,
+    payload        TEXT NOT NULL,
+    status         TEXT NOT NULL DEFAULT 'queued',
+    attempts       INTEGER NOT NULL DEFAULT 0,
+    available_at   REAL NOT NULL,
+    lease_owner    TEXT,
+    lease_expires  REAL,
+    last_error     TEXT,
+    created_at     REAL,
+    started_at     REAL,
+    finished_at    REAL,
+    UNIQUE (job_id, kind, key)
+);
+CREATE INDEX IF NOT EXISTS idx_tasks_ready ON tasks(status, available_at);
+CREATE INDEX IF NOT EXISTS idx_tasks_job ON tasks(job_id, status);
+CREATE TABLE IF NOT EXISTS results (
+    job_id       TEXT NOT NULL,
+    kind         TEXT NOT NULL,
+    key          TEXT NOT NULL,
+    result       TEXT,
+    worker       TEXT,
+    seconds      REAL,
+    finished_at  REAL,
+    PRIMARY KEY (job_id, kind, key)
+);
+"""
+
+DEFAULTS = {"lease_s": 300, "max_attempts": 3, "backoff_s": 5, "journal_mode": "wal"}
+
+
+def worker_name() -> str:
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+
+def _dumps(data) -> str:
+    return json.dumps(data, ensure_ascii=False, separators=(",", ":"), default=str)
+
+
+class WorkQueue:
+    def __init__(self, path: str = QUEUE_PATH, config: dict | None = None):
+        self.config = {**DEFAULTS, **get_section("work_queue"), **(config or {})}
+        self.path = path
+        self._lock = threading.Lock()
+        if path != ":memory:":
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        # Autocommit; write transactions are opened explicitly with BEGIN IMMEDIATE so two
+        # workers can never lease the same row.
+        self._db = sqlite3.connect(path, timeout=60, check_same_thread=False, isolation_level=None)
+        self._db.execute(f"PRAGMA journal_mode={self.config['journal_mode']}")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.executescript(SCHEMA)
+
+    def _write(self, fn):
+        with self._lock:
+            self._db.execute("BEGIN IMMEDIATE")
+            try:
+                out = fn(self._db)
+            except BaseException:
+                self._db.execute("ROLLBACK")
+                raise
+            self._db.execute("COMMIT")
+            return out
+
+    # ---------- producers ---------------------------------------------------
+    def enqueue_many(self, job_id: str, kind: str, items) -> int:
+        """
+        Add [(key, payload), …]. A key already queued for (job_id, kind) is left
+        alone, so re-submitting a requisition only adds what is new.
+        """
+        now = time.time()
+        rows = [(job_id, kind, str(key), _dumps(payload), now, now) for key, payload in items]
+
+        def txn(db):
+            before = db.total_changes
+            db.executemany("INSERT OR IGNORE INTO tasks (job_id, kind, key, payload, available_at, created_at) "
+                           "VALUES (?, ?, ?, ?, ?, ?)", rows)
+            return db.total_changes - before
+        return self._write(txn)
+
+    def enqueue(self, job_id: str, kind: str, payload: dict, key: str | None = None) -> bool:
+        return self.enqueue_many(job_id, kind, [(key or kind, payload)]) == 1
+
+    # ---------- workers -----------------------------------------------------
+    def lease(self, worker: str, kinds=None, n: int = 1, job_id: str | None = None,
+              lease_s: float | None = None) -> list:
+        """
+        Claim up to n ready tasks: queued ones whose backoff has passed and leased ones
+        whose lease ran out. Each returned task dict carries the lease it was granted.
+        """
+        now = time.time()
+        expires = now + (lease_s or self.config["lease_s"])
+        where = ["((status = 'queued' AND available_at <= ?) OR (status = 'leased' AND lease_expires < ?))"]
+        args = [now, now]
+        if kinds:
+            where.append(f"kind IN ({','.join('?' * len(kinds))})")
+            args.extend(kinds)
+        if job_id:
+            where.append("job_id = ?")
+            args.append(job_id)
+
+        def txn(db):
+            # A task whose worker died on every attempt is dead-lettered, not leased forever.
+            db.execute("UPDATE tasks SET status = 'dead', lease_owner = NULL, finished_at = ?, "
+                       "last_error = COALESCE(last_error, 'lease expired') "
+                       "WHERE status = 'leased' AND lease_expires < ? AND attempts >= ?",
+                       (now, now, self.config["max_attempts"]))
+            rows = db.execute(f"SELECT id, job_id, kind, key, payload, attempts FROM tasks "
+                              f"WHERE {' AND '.join(where)} ORDER BY available_at, id LIMIT ?",
+                              (*args, n)).fetchall()
+            db.executemany("UPDATE tasks SET status = 'leased', attempts = attempts + 1, lease_owner = ?, "
+                           "lease_expires = ?, started_at = COALESCE(started_at, ?) WHERE id = ?",
+                           [(worker, expires, now, r[0]) for r in rows])
+            return rows
+        return [{"id": tid, "job_id": job, "kind": kind, "key": key, "payload": json.loads(payload),
+                 "attempt": attempts + 1, "worker": worker, "lease_expires": expires, "leased_at": now}
+                for tid, job, kind, key, payload, attempts in self._write(txn)]
+
+    def _fence(self) -> str:
+        return "id = ? AND status = 'leased' AND lease_owner = ? AND attempts = ?"
+
+    def heartbeat(self, task: dict, lease_s: float | None = None) -> bool:
+        """Extend a lease; False means it was lost (expired and taken by another worker)."""
+        expires = time.time() + (lease_s or self.config["lease_s"])
+
+        def txn(db):
+            return db.execute(f"UPDATE tasks SET lease_expires = ? WHERE {self._fence()}",
+                              (expires, task["id"], task["worker"], task["attempt"])).rowcount
+        ok = self._write(txn) == 1
+        if ok:
+            task["lease_expires"] = expires
+        return ok
+
+    def complete(self, task: dict, result) -> bool:
+        """
+        Store the task's result and mark it done, if this worker still holds the lease.
+        Returns False when the lease was lost (the task is someone else's now, or was
+        dead-lettered); nothing is written then.
+        """
+        now = time.time()
+
+        def txn(db):
+            fenced = db.execute(f"UPDATE tasks SET status = 'done', lease_owner = NULL, lease_expires = NULL, "
+                                f"last_error = NULL, finished_at = ? WHERE {self._fence()}",
+                                (now, task["id"], task["worker"], task["attempt"])).rowcount
+            if fenced:
+                db.execute("INSERT OR IGNORE INTO results VALUES (?, ?, ?, ?, ?, ?, ?)",
+                           (task["job_id"], task["kind"], task["key"], _dumps(result), task["worker"],
+                            round(now - task["leased_at"], 4), now))
+            return fenced
+        return self._write(txn) == 1
+
+    def fail(self, task: dict, error: str) -> str:
+        """Retry later with backoff, or dead-letter after max_attempts. Returns the new status."""
+        now = time.time()
+        attempt = task["attempt"]
+        if attempt >= self.config["max_attempts"]:
+            status, available = "dead", now
+        else:
+            status, available = "queued", now + self.config["backoff_s"] * 2 ** (attempt - 1)
+
+        def txn(db):
+            n = db.execute(f"UPDATE tasks SET status = ?, available_at = ?, lease_owner = NULL, "
+                           f"lease_expires = NULL, last_error = ?, "
+                           f"finished_at = CASE WHEN ? = 'dead' THEN ? END WHERE {self._fence()}",
+                           (status, available, str(error)[:2000], status, now,
+                            task["id"], task["worker"], task["attempt"])).rowcount
+            return status if n else "lost"
+        return self._write(txn)
+
+    def requeue_dead(self, job_id: str, kind: str | None = None) -> int:
+        """Give dead-lettered tasks a fresh set of attempts (and no error from their last life)."""
+        sql = ("UPDATE tasks SET status = 'queued', attempts = 0, available_at = ?, finished_at = NULL, "
+               "last_error = NULL, lease_owner = NULL, lease_expires = NULL "
+               "WHERE job_id = ? AND status = 'dead'")
+        args = [time.time(), job_id]
+        if kind:
+            sql += " AND kind = ?"
+            args.append(kind)
+        return self._write(lambda db: db.execute(sql, args).rowcount)
+
+    # ---------- readers -----------------------------------------------------
+    def results(self, job_id: str, kind: str) -> dict:
+        """{key: result}, in the order they finished."""
+        with self._lock:
+            rows = self._db.execute("SELECT key, result FROM results WHERE job_id = ? AND kind = ? "
+                                    "ORDER BY finished_at", (job_id, kind)).fetchall()
+        return {key: json.loads(result) for key, result in rows}
+
+    def payloads(self, job_id: str, kind: str) -> dict:
+        """{key: payload} of every task of that kind, in the order they were queued."""
+        with self._lock:
+            rows = self._db.execute("SELECT key, payload FROM tasks WHERE job_id = ? AND kind = ? ORDER BY id",
+                                    (job_id, kind)).fetchall()
+        return {key: json.loads(payload) for key, payload in rows}
+
+    def result(self, job_id: str, kind: str, key: str):
+        with self._lock:
+            row = self._db.execute("SELECT result FROM results WHERE job_id = ? AND kind = ? AND key = ?",
+                                   (job_id, kind, key)).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def dead(self, job_id: str) -> list:
+        with self._lock:
+            rows = self._db.execute("SELECT kind, key, attempts, last_error FROM tasks "
+                                    "WHERE job_id = ? AND status = 'dead' ORDER BY id", (job_id,)).fetchall()
+        return [{"kind": k, "key": key, "attempts": a, "error": e} for k, key, a, e in rows]
+
+    def pending(self, job_id: str, kind: str | None = None) -> int:
+        """Tasks not yet done or dead."""
+        sql = "SELECT COUNT(*) FROM tasks WHERE job_id = ? AND status IN ('queued', 'leased')"
+        args = [job_id]
+        if kind:
+            sql += " AND kind = ?"
+            args.append(kind)
+        with self._lock:
+            return self._db.execute(sql, args).fetchone()[0]
+
+    def progress(self, job_id: str, window_s: float = 60.0) -> dict:
+        """
+        Per kind: task counts by status, retries, and throughput — overall (done per
+        second since the first lease) and over the last `window_s` — plus per-worker
+        completions and mean task time.
+        """
+        now = time.time()
+        with self._lock:
+            counts = self._db.execute("SELECT kind, status, COUNT(*), SUM(MAX(attempts - 1, 0)) FROM tasks "
+                                      "WHERE job_id = ? GROUP BY kind, status", (job_id,)).fetchall()
+            spans = self._db.execute("SELECT kind, MIN(started_at), MAX(finished_at), "
+                                     "SUM(finished_at >= ?) FROM tasks WHERE job_id = ? AND status = 'done' "
+                                     "GROUP BY kind", (now - window_s, job_id)).fetchall()
+            workers = self._db.execute("SELECT worker, COUNT(*), AVG(seconds) FROM results "
+                                       "WHERE job_id = ? GROUP BY worker", (job_id,)).fetchall()
+        kinds = {}
+        for kind, status, n, retries in counts:
+            k = kinds.setdefault(kind, {**{s: 0 for s in STATUSES}, "retries": 0})
+            k[status] = n
+            k["retries"] += retries or 0
+        for kind, first, last, recent in spans:
+            k = kinds[kind]
+            k["total"] = sum(k[s] for s in STATUSES)
+            elapsed = (last or now) - (first or now)
+            k["per_sec"] = round(k["done"] / elapsed, 2) if elapsed > 0 else None
+            k["recent_per_sec"] = round((recent or 0) / window_s, 2)
+        for k in kinds.values():
+            k.setdefault("total", sum(k[s] for s in STATUSES))
+        total = sum(k["total"] for k in kinds.values())
+        finished = sum(k["done"] + k["dead"] for k in kinds.values())
+        return {"job_id": job_id, "kinds": kinds, "total": total, "finished": finished,
+                "complete": round(finished / total, 4) if total else 0.0,
+                "workers": {w: {"done": n, "mean_s": round(s or 0, 3)} for w, n, s in workers}}
+
+    def jobs(self) -> list:
+        with self._lock:
+            return [r[0] for r in self._db.execute("SELECT job_id FROM tasks GROUP BY job_id ORDER BY MIN(id)")]
+
+    def close(self):
+        with self._lock:
+            self._db.close()
+
+
+_queue = None
+
+def get_queue() -> WorkQueue:
+    global _queue
+    if _queue is None:
+        _queue = WorkQueue()
+    return _queue
+
+
+if __name__ == "__main__":
+    import argparse
+    from pprint import pprint
+
+    ap = argparse.ArgumentParser(description="Inspect the screening work queue.")
+    ap.add_argument("--job", help="Job id (default: every job in the queue)")
+    ap.add_argument("--dead", action="store_true", help="List dead-lettered tasks")
+    args = ap.parse_args()
+
+    q = get_queue()
+    for job in [args.job] if args.job else q.jobs():
+        pprint(q.dead(job) if args.dead else q.progress(job))
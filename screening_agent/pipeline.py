@@ -0,0 +1,387 @@
+# pipeline.py
+"""
+Tiered screening pipeline: fast NLP for the whole pool, LLMs only where needed.
+
+    paths ──► NLP parse (process pool) ──► confidence ──┬──► collector ──► pre-filter + top-K rank ──► LLM skill scoring (top K)
+                                                        └──► LLM extraction (threads) ──┘
+
+Every resume is parsed by resume_scraper_nlp first. field_confidence() rates how
+complete that parse is; only resumes under `pipeline.escalate_below` (or missing
+a must-have field) are re-extracted by the LLM and merged back. Stages are joined
+by bounded queues, so parsing keeps running while LLM calls are in flight and a
+slow LLM applies back-pressure instead of piling up results in memory. LLM spend
+therefore follows the number of hard resumes plus the shortlist, not the pool size.
+
+With a candidate store, resumes are identified by content (dedup.py): a file or
+text seen before reuses its stored parse (including an earlier LLM escalation),
+so screening the same people against another job is only scoring. Exact and
+near-duplicate submissions within a run are flagged and, by default, ranked once.
+Ranking drops candidates failing the JD's hard constraints via an inverted skill
+index and scores the rest only until the top K is settled (scoring.rank_top_k).
+"""
+
+import os
+import re
+import sys
+import time
+import queue
+import threading
+from functools import partial
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+
+MODULES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "modules")
+if MODULES_DIR not in sys.path:
+    sys.path.insert(0, MODULES_DIR)
+
+from config_loader import get_section                                   # noqa: E402
+from logging_module import stage, incr                                  # noqa: E402
+from resume_scraper_nlp import _parse_one, calc_total_exp, iter_resume_paths  # noqa: E402
+from text_extraction import extract_text, file_hash                     # noqa: E402
+from candidate_store import SHARED                                      # noqa: E402
+import dedup                                                            # noqa: E402
+import scoring                                                          # noqa: E402
+
+_DONE = object()
+EMAIL_RE = re.compile(r"^[\w\.+-]+@[\w-]+\.[\w\.-]+$")
+LLM_FIELDS = ("name", "email", "phone", "skills", "past_roles", "education",
+              "certifications", "projects", "soft_skills", "other_notes")
+
+
+# ---------- confidence ------------------------------------------------------
+def _name_conf(name) -> float:
+    if not name:
+        return 0.0
+    words = [w for w in str(name).split() if w.isalpha()]
+    return 1.0 if 2 <= len(words) <= 4 else 0.5
+
+
+def _roles_conf(roles) -> float:
+    if not roles:
+        return 0.0
+    dated = sum(1 for r in roles if r.get("title") and r.get("start_year_month"))
+    return dated / len(roles)
+
+
+def field_confidence(parsed: dict, config: dict | None = None) -> tuple:
+    """(overall 0–1, {field: 0–1}) for an NLP parse, weighted by `pipeline.field_weights`."""
+    config = config or get_section("pipeline")
+    phone_digits = sum(ch.isdigit() for ch in parsed.get("phone") or "")
+    fields = {
+        "name": _name_conf(parsed.get("name")),
+        "email": 1.0 if EMAIL_RE.match(parsed.get("email") or "") else 0.0,
+        "phone": 1.0 if phone_digits >= 10 else (0.5 if phone_digits >= 7 else 0.0),
+        "skills": min(1.0, len(parsed.get("skills") or []) / config.get("min_skills", 5)),
+        "past_roles": _roles_conf(parsed.get("past_roles")),
+        "education": 1.0 if any(e.get("degree") for e in parsed.get("education") or []) else 0.0,
+        "total_years_of_experience": 0.0 if parsed.get("total_years_of_experience") is None else 1.0,
+    }
+    weights = config.get("field_weights", {})
+    total = sum(weights.get(k, 0.0) for k in fields) or 1.0
+    overall = sum(fields[k] * weights.get(k, 0.0) for k in fields) / total
+    return round(overall, 4), fields
+
+
+def needs_escalation(overall: float, fields: dict, config: dict | None = None) -> bool:
+    config = config or get_section("pipeline")
+    if overall < config.get("escalate_below", 0.7):
+        return True
+    return any(fields.get(f, 0.0) == 0.0 for f in config.get("must_have", []))
+
+
+# ---------- LLM tier --------------------------------------------------------
+def _normalise_roles(roles):
+    # LLM output uses start_month_year / start_year; stored parses keep start_year_month filled
+    # (experience.py reads all three shapes).
+    out = []
+    for r in roles or []:
+        r = dict(r)
+        for side in ("start", "end"):
+            if not r.get(f"{side}_year_month"):
+                r[f"{side}_year_month"] = r.get(f"{side}_month_year") or r.get(f"{side}_year")
+        for k in ("start_year_month", "end_year_month"):
+            if r.get(k) is not None:
+                r[k] = str(r[k])
+        out.append(r)
+    return out
+
+
+def merge_parses(nlp: dict, llm: dict) -> dict:
+    """LLM fields win where they are non-empty; NLP values fill the gaps."""
+    merged = dict(nlp)
+    for field in LLM_FIELDS:
+        value = llm.get(field)
+        if value:
+            merged[field] = value
+    merged["past_roles"] = _normalise_roles(merged.get("past_roles"))
+    years = calc_total_exp(merged["past_roles"])
+    if years is not None:
+        merged["total_years_of_experience"] = years
+    return merged
+
+
+def _parse_and_fingerprint(path: str) -> dict:
+    # Process-pool task: NLP parse plus content identity (text comes from the text cache).
+    result = _parse_one(path)
+    if result["ok"]:
+        text = extract_text(path)
+        result.update(doc_hash=dedup.content_hash(text), simhash=dedup.simhash(text))
+    return result
+
+
+def llm_extract(path: str, job_id: str, candidate_id: str, store=SHARED) -> dict:
+    from resume_parser import parse_resume_from_file
+    result = parse_resume_from_file(path, job_id, candidate_id, store=store)
+    if not isinstance(result, dict):
+        raise ValueError("LLM extraction did not return a JSON object")
+    return result
+
+
+def store_extractor(store):
+    """llm_extract that reuses and saves parses in `store` only (None: no store at all)."""
+    return partial(llm_extract, store=store)
+
+
+def rankable(candidates: dict, config: dict | None = None) -> list:
+    """[(candidate_id, record)] the ranking stage scores: parsed, and not a dropped duplicate."""
+    drop_dups = (config or get_section("pipeline")).get("drop_duplicates", True)
+    return [(cid, r) for cid, r in candidates.items()
+            if r["parsed"] and not (drop_dups and r.get("duplicate_of"))]
+
+
+# ---------- pipeline --------------------------------------------------------
+class ScreeningPipeline:
+    """
+    run(jd, paths) → {"ranked": [...], "candidates": {id: record}, "stats": {...}}.
+    A record is {path, tier: "nlp"|"llm"|"failed", reused, confidence, fields, parsed,
+    doc_hash?, simhash?, duplicate_of?, near_duplicates?, error?}.
+    `llm_extract` / `llm_score` can be swapped out (tests, benchmarks, other backends).
+    """
+
+    def __init__(self, config: dict | None = None, llm_extract=None, llm_score=None, store=None):
+        self.config = {**get_section("pipeline"), **(config or {})}
+        self.store = store                # CandidateStore for parse reuse / dedup (None = off)
+        if llm_extract is None:
+            llm_extract = store_extractor(store)
+        self.llm_extract = llm_extract
+        if llm_score is None:
+            from skill_match import score_skills_batch as llm_score
+        self.llm_score = llm_score
+
+    # -- stage 1: NLP parse (or stored parse), routed by confidence ---------
+    def _parse_stage(self, paths, to_llm: queue.Queue, to_collect: queue.Queue, stats: dict):
+        cfg, store = self.config, self.store
+        drop_dups = cfg.get("drop_duplicates", True)
+        escalations_left = cfg.get("max_escalations")
+        first_of = {}                     # doc_hash -> candidate_id of its first copy in this run
+        near_index = dedup.NearDupIndex()
+
+        def identify(record, result):
+            doc_hash, sim = result.get("doc_hash"), result.get("simhash")
+            if doc_hash is None:
+                return
+            record["doc_hash"], record["simhash"] = doc_hash, sim
+            if doc_hash in first_of:
+                record["duplicate_of"] = first_of[doc_hash]
+                return
+            near = near_index.query(sim)
+            if near:
+                record["duplicate_of"], record["near_duplicate_bits"] = near[0]
+            first_of[doc_hash] = record["candidate_id"]
+            near_index.add(record["candidate_id"], sim)
+            if store is not None:
+                earlier = store.near_duplicates(sim, exclude=doc_hash)
+                if earlier:
+                    record["near_duplicates"] = [h for h, _ in earlier]
+                store.put_document({"doc_hash": doc_hash, "simhash": sim,
+                                    "file_hash": result.get("file_hash")},
+                                   None if result.get("reused") else result["data"], "nlp")
+
+        def route(result):
+            nonlocal escalations_left
+            cid = os.path.splitext(os.path.basename(result["path"]))[0]
+            record = {"candidate_id": cid, "path": result["path"], "parse_s": result["seconds"],
+                      "reused": bool(result.get("reused"))}
+            if not result["ok"]:
+                record.update(tier="failed", error=result["error"], parsed=None,
+                              confidence=0.0, fields={})
+                stats["parse_failed"] += 1
+            else:
+                if store is not None and not record["reused"] and result.get("doc_hash"):
+                    stored = store.get_document(result["doc_hash"])      # same text, different file
+                    if stored and stored["parsed"]:
+                        result.update(data=stored["parsed"], tier=stored["tier"], reused=True)
+                        record["reused"] = True
+                identify(record, result)
+                overall, fields = field_confidence(result["data"], cfg)
+                record.update(tier=result.get("tier", "nlp"), parsed=result["data"],
+                              confidence=overall, fields=fields)
+            if record["reused"]:
+                stats["reused"] += 1
+            if record.get("duplicate_of"):
+                stats["duplicates"] += 1
+            skip_llm = record["tier"] == "llm" or (drop_dups and record.get("duplicate_of"))
+            wants_llm = not skip_llm and (record["tier"] == "failed" or
+                                          needs_escalation(record["confidence"], record["fields"], cfg))
+            if wants_llm and (escalations_left is None or escalations_left > 0):
+                if escalations_left is not None:
+                    escalations_left -= 1
+                to_llm.put(record)            # blocks while the LLM tier is saturated
+            else:
+                to_collect.put(record)
+
+        def stored_parse(path):
+            # Known file → its document's stored parse, without extracting or parsing anything.
+            fh = file_hash(path) if store is not None else None
+            doc_hash = fh and store.doc_for_file(fh)
+            doc = doc_hash and store.get_document(doc_hash)
+            if doc and doc["parsed"]:
+                return fh, {"path": path, "ok": True, "data": doc["parsed"], "seconds": 0.0,
+                            "doc_hash": doc_hash, "simhash": doc["simhash"], "tier": doc["tier"],
+                            "reused": True}
+            return fh, None
+
+        workers = cfg.get("parse_workers")
+        if workers is None:
+            workers = os.cpu_count() or 1
+        if workers <= 1:
+            for path in paths:
+                fh, hit = stored_parse(path)
+                route(hit or {**_parse_and_fingerprint(path), "file_hash": fh})
+            return
+        in_flight = max(2, workers * 2)
+        with ProcessPoolExecutor(max_workers=workers) as ex:
+            pending = {}
+
+            def drain():
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for fut in done:
+                    fh = pending.pop(fut)
+                    route({**fut.result(), "file_hash": fh})
+
+            for path in paths:
+                fh, hit = stored_parse(path)
+                if hit:
+                    route(hit)
+                    continue
+                if len(pending) >= in_flight:
+                    drain()
+                pending[ex.submit(_parse_and_fingerprint, path)] = fh
+            while pending:
+                drain()
+
+    # -- stage 2: LLM extraction for low-confidence resumes ------------------
+    def _llm_worker(self, job_id, to_llm: queue.Queue, to_collect: queue.Queue, stats: dict, lock):
+        while True:
+            record = to_llm.get()
+            if record is _DONE:
+                return
+            t0 = time.perf_counter()
+            try:
+                with stage("llm_escalation", candidate=record["candidate_id"]):
+                    llm = self.llm_extract(record["path"], job_id, record["candidate_id"])
+                record["parsed"] = merge_parses(record["parsed"] or {}, llm)
+                record["tier"] = "llm"
+                if self.store is not None and record.get("doc_hash"):
+                    # Later jobs reuse the escalated parse instead of paying for it again.
+                    self.store.put_document({"doc_hash": record["doc_hash"], "simhash": record["simhash"]},
+                                            record["parsed"], "llm")
+                with lock:
+                    stats["escalated"] += 1
+                incr("pipeline_escalated")
+            except Exception as e:
+                record["escalation_error"] = f"{type(e).__name__}: {e}"
+                with lock:
+                    stats["escalation_failed"] += 1
+            record["llm_s"] = round(time.perf_counter() - t0, 4)
+            to_collect.put(record)
+
+    def run(self, jd: dict, paths, top_k: int | None = None, llm_score: bool = True) -> dict:
+        cfg = self.config
+        top_k = top_k or cfg.get("shortlist_k", 20)
+        paths = list(paths)
+        job_id = jd.get("JOB_ID", "adhoc")
+        stats = {"resumes": len(paths), "parse_failed": 0, "escalated": 0, "escalation_failed": 0,
+                 "reused": 0, "duplicates": 0}
+        lock = threading.Lock()
+        to_llm = queue.Queue(maxsize=cfg.get("queue_size", 64))
+        to_collect = queue.Queue(maxsize=cfg.get("queue_size", 64))
+        n_llm = max(1, cfg.get("llm_workers", 4))
+        t_start = time.perf_counter()
+
+        llm_threads = [threading.Thread(target=self._llm_worker, name=f"llm-extract-{i}",
+                                        args=(job_id, to_llm, to_collect, stats, lock), daemon=True)
+                       for i in range(n_llm)]
+
+        errors = []
+
+        def drive():
+            try:
+                self._parse_stage(paths, to_llm, to_collect, stats)
+            except BaseException as e:            # re-raised by run() once the stages wind down
+                errors.append(e)
+            finally:
+                for _ in llm_threads:
+                    to_llm.put(_DONE)
+                for t in llm_threads:
+                    t.join()
+                to_collect.put(_DONE)
+
+        for t in llm_threads:
+            t.start()
+        driver = threading.Thread(target=drive, name="nlp-parse", daemon=True)
+        driver.start()
+
+        candidates = {}
+        while True:
+            record = to_collect.get()
+            if record is _DONE:
+                break
+            cid = record["candidate_id"]
+            if cid in candidates:                         # same file stem in two folders
+                cid = f"{cid}#{len(candidates)}"
+                record["candidate_id"] = cid
+            candidates[cid] = record
+        driver.join()
+        if errors:
+            raise errors[0]
+        stats["parse_and_extract_s"] = round(time.perf_counter() - t_start, 3)
+
+        # -- stage 3: pre-filter and top-K rank ------------------------------
+        t0 = time.perf_counter()
+        usable = [(cid, r["parsed"]) for cid, r in rankable(candidates, cfg)]
+        ranked = []
+        if usable:
+            ids, resumes = zip(*usable)
+            with stage("rank", candidates=len(ids)):
+                pool = scoring.CandidatePool.from_resumes(list(resumes), ids=list(ids))
+                if get_section("ranking").get("prefilter", True):
+                    stats["prefilter"] = {}
+                    ranked = scoring.rank_top_k(jd, pool, top_k, stats=stats["prefilter"])
+                else:
+                    ranked = scoring.rank_candidates(jd, list(resumes), top_k=top_k, pool=pool)
+        stats["rank_s"] = round(time.perf_counter() - t0, 4)
+
+        # -- stage 4: LLM skill scoring of the shortlist only -----------------
+        if llm_score and ranked and jd.get("required_skills"):
+            t0 = time.perf_counter()
+            shortlist = {r["candidate"]: candidates[r["candidate"]]["parsed"] for r in ranked}
+            with stage("llm_shortlist_scoring", candidates=len(shortlist)):
+                skill_scores = self.llm_score(jd["required_skills"], shortlist)
+            for r in ranked:
+                r["llm_skill_scores"] = skill_scores.get(r["candidate"])
+            stats["llm_score_s"] = round(time.perf_counter() - t0, 3)
+
+        for r in ranked:
+            rec = candidates[r["candidate"]]
+            r.update(tier=rec["tier"], confidence=rec["confidence"], path=rec["path"])
+        stats["tiers"] = {t: sum(1 for r in candidates.values() if r["tier"] == t)
+                          for t in ("nlp", "llm", "failed")}
+        stats["escalation_rate"] = round(stats["escalated"] / len(paths), 4) if paths else 0.0
+        stats["total_s"] = round(time.perf_counter() - t_start, 3)
+        return {"job_id": job_id, "ranked": ranked, "candidates": candidates, "stats": stats}
+
+
+def screen(jd: dict, resume_target: str, top_k: int | None = None, llm_score: bool = True,
+           config: dict | None = None) -> dict:
+    """Run the tiered pipeline over a resume file, directory or glob."""
+    return ScreeningPipeline(config).run(jd, iter_resume_paths(resume_target), top_k, llm_score)
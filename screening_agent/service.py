@@ -0,0 +1,554 @@
+# service.py
+"""
+Long-running screening service: one asyncio process that keeps the NLP workers,
+skill taxonomy, LLM clients and caches warm between requests.
+
+    python screening_agent/service.py --port 8080
+    python screening_agent/service.py --stub              # local stub LLM (benchmarks/stub_server.py)
+
+Endpoints (JSON in, JSON out):
+
+    POST /jobs                         {"text": "<JD text>"} or {"jd": {...extracted JD...}}
+    GET  /jobs/<job_id>
+    POST /jobs/<job_id>/resumes        raw file body (?filename=cv.pdf[&candidate_id=…]),
+                                       or {"text": "...", "filename": "..."} as JSON
+    GET  /jobs/<job_id>/rank?top=10[&llm=1]
+    GET  /health, GET /stats
+
+Uploads are NLP-parsed in a process pool, escalated to the LLM when confidence is
+low (same routing as pipeline.py), then scored. Concurrent scoring requests are
+coalesced by MicroBatcher: items queue up until `service.max_batch` are waiting or
+`service.max_wait_ms` has passed since the first, and the batch is scored in one
+vectorized pass (and, for LLM skill scores, one batched prompt per job). Settings
+live in config/config.yaml → service.
+"""
+
+import os
+import re
+import sys
+import json
+import time
+import uuid
+import asyncio
+import hashlib
+from urllib.parse import urlsplit, parse_qs
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from pipeline import (_parse_and_fingerprint, field_confidence, needs_escalation,  # noqa: E402
+                      merge_parses, store_extractor)                                # (also puts modules/ on sys.path)
+from config_loader import get_section                                               # noqa: E402
+from logging_module import Histogram                                                # noqa: E402
+from text_extraction import file_hash                                               # noqa: E402
+import scoring                                                                      # noqa: E402
+
+BASE_DIR   = os.path.dirname(os.path.abspath(__file__))
+UPLOAD_DIR = os.getenv("SCREENING_UPLOAD_DIR", os.path.normpath(os.path.join(BASE_DIR, "../data/uploads")))
+REASONS    = {200: "OK", 201: "Created", 400: "Bad Request", 404: "Not Found",
+              405: "Method Not Allowed", 413: "Payload Too Large", 500: "Internal Server Error"}
+_SAFE_NAME = re.compile(r"[^A-Za-z0-9._-]+")
+
+
+def _warm_worker():
+    # Runs once per parse process so the first real upload doesn't pay for imports.
+    from skill_matcher import get_skill_matcher
+    get_skill_matcher()
+    return os.getpid()
+
+# ---------- micro-batching --------------------------------------------------
+class MicroBatcher:
+    """
+    Coalesce concurrent submit() calls into one `fn(items) -> results` call.
+
+    A batch closes when max_batch items are waiting or max_wait_ms after its first
+    item; up to max_concurrent batches run at once so one slow batch doesn't stall
+    the window behind it.
+    """
+
+    def __init__(self, fn, max_batch: int = 32, max_wait_ms: float = 20.0, max_concurrent: int = 4):
+        self.fn = fn
+        self.max_batch, self.max_wait = max_batch, max_wait_ms / 1000
+        self.max_concurrent = max_concurrent
+        self.queue = None
+        self.sizes = Histogram(buckets=(1, 2, 4, 8, 16, 32, 64, 128))
+        self._task, self._running = None, set()
+
+    def start(self):
+        self.queue = asyncio.Queue()
+        self._task = asyncio.create_task(self._loop())
+
+    async def stop(self):
+        """Stop batching; submit() calls still waiting for a batch raise CancelledError."""
+        if self._task:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+        await asyncio.gather(*self._running, return_exceptions=True)
+        pending = []
+        while self.queue is not None and not self.queue.empty():
+            pending.append(self.queue.get_nowait())
+        self._cancel(pending)
+
+    @staticmethod
+    def _cancel(batch):
+        for _, fut in batch:
+            if not fut.done():
+                fut.set_exception(asyncio.CancelledError())
+
+    async def submit(self, item):
+        if self._task is None or self._task.done():
+            raise RuntimeError("MicroBatcher is not running")
+        fut = asyncio.get_running_loop().create_future()
+        await self.queue.put((item, fut))
+        return await fut
+
+    async def _loop(self):
+        loop = asyncio.get_running_loop()
+        slots = asyncio.Semaphore(self.max_concurrent)
+        batch = []
+        try:
+            while True:
+                batch = [await self.queue.get()]
+                deadline = loop.time() + self.max_wait
+                while len(batch) < self.max_batch:
+                    remaining = deadline - loop.time()
+                    if remaining <= 0:
+                        break
+                    try:
+                        batch.append(await asyncio.wait_for(self.queue.get(), remaining))
+                    except asyncio.TimeoutError:
+                        break
+                await slots.acquire()
+                task = asyncio.create_task(self._run(batch, slots))
+                self._running.add(task)
+                task.add_done_callback(self._running.discard)
+                batch = []
+        except asyncio.CancelledError:
+            self._cancel(batch)               # collected but never dispatched
+            raise
+
+    async def _run(self, batch, slots):
+        self.sizes.observe(len(batch))
+        try:
+            results = await self.fn([item for item, _ in batch])
+            for (_, fut), res in zip(batch, results):
+                if not fut.done():
+                    fut.set_result(res)
+        except Exception as e:
+            for _, fut in batch:
+                if not fut.done():
+                    fut.set_exception(e)
+        finally:
+            slots.release()
+
+    def stats(self) -> dict:
+        return {"batches": self.sizes.count, "items": int(self.sizes.total),
+                "mean_batch": round(self.sizes.total / self.sizes.count, 2) if self.sizes.count else 0.0,
+                "max_batch": self.sizes.max}
+
+# ---------- service ---------------------------------------------------------
+class HTTPError(Exception):
+    def __init__(self, status: int, message: str):
+        super().__init__(message)
+        self.status = status
+
+
+class ScreeningService:
+    """Jobs, their candidates and the warm executors behind the HTTP routes."""
+
+    def __init__(self, config: dict | None = None, store=None, llm_extract=None, llm_score=None):
+        self.config = {**get_section("service"), **(config or {})}
+        self.pipeline_cfg = get_section("pipeline")
+        self.store = store               # None: jobs and candidates live in memory only
+        if llm_extract is None:
+            llm_extract = store_extractor(store)
+        self.llm_extract = llm_extract
+        if llm_score is None:
+            from skill_match import score_skills_batch as llm_score
+        self.llm_score = llm_score
+        self.jobs = {}                   # job_id -> {"jd", "candidates": {cid: record}, "pool", "version"}
+        self.latency = {}                # route -> Histogram (ms)
+        self.counters = {"uploads": 0, "escalated": 0, "reused": 0, "parse_failed": 0}
+        cfg = self.config
+        self.score_batcher = MicroBatcher(self._score_batch, cfg.get("max_batch", 32),
+                                          cfg.get("max_wait_ms", 20), cfg.get("max_concurrent_batches", 4))
+        self.llm_batcher = MicroBatcher(self._llm_batch, cfg.get("llm_max_batch", 16),
+                                        cfg.get("llm_max_wait_ms", 50), cfg.get("max_concurrent_batches", 4))
+        self.parse_pool = None
+        self.threads = None
+        self.escalations = None
+
+    async def start(self):
+        workers = self.config.get("parse_workers") or os.cpu_count() or 1
+        self.parse_pool = ProcessPoolExecutor(max_workers=workers)
+        self.threads = ThreadPoolExecutor(max_workers=self.config.get("threads", 16),
+                                          thread_name_prefix="service")
+        self.escalations = asyncio.Semaphore(self.pipeline_cfg.get("llm_workers", 4))
+        loop = asyncio.get_running_loop()
+        await asyncio.gather(*(loop.run_in_executor(self.parse_pool, _warm_worker) for _ in range(workers)))
+        _warm_worker()
+        self.score_batcher.start()
+        self.llm_batcher.start()
+        print(f"[Service] Ready: {workers} parse workers, batches of ≤{self.score_batcher.max_batch} "
+              f"within {self.score_batcher.max_wait * 1000:.0f} ms")
+
+    async def stop(self):
+        await self.score_batcher.stop()
+        await self.llm_batcher.stop()
+        self.parse_pool.shutdown(cancel_futures=True)
+        self.threads.shutdown(wait=False, cancel_futures=True)
+
+    def _blocking(self, fn, *args):
+        return asyncio.get_running_loop().run_in_executor(self.threads, fn, *args)
+
+    async def _job(self, job_id: str) -> dict:
+        job = self.jobs.get(job_id)
+        if job is None and self.store is not None:
+            job = await self._blocking(self._load_job, job_id)
+            if job is not None:
+                job = self.jobs.setdefault(job_id, job)      # a concurrent request may have loaded it first
+        if job is None:
+            raise HTTPError(404, f"unknown job {job_id}")
+        return job
+
+    def _load_job(self, job_id: str) -> dict | None:
+        """A job from an earlier process, with its stored candidates, or None."""
+        jd = self.store.get_job(job_id)
+        if not jd:
+            return None
+        candidates = {}
+        for cid, parsed in self.store.load_candidates(job_id):
+            overall, fields = field_confidence(parsed, self.pipeline_cfg)
+            # No upload path: a re-upload under this id replaces the stored parse, as in the store.
+            candidates[cid] = {"candidate_id": cid, "path": None, "tier": "stored", "parsed": parsed,
+                               "confidence": overall, "fields": fields}
+        return {"jd": jd, "candidates": candidates, "pool": None, "version": 0}
+
+    # -- routes --------------------------------------------------------------
+    async def submit_jd(self, body: dict) -> dict:
+        if isinstance(body.get("jd"), dict):
+            jd = dict(body["jd"])
+            jd.setdefault("JOB_ID", str(uuid.uuid4()))
+            if self.store is not None:
+                await self._blocking(self.store.put_job, jd, jd["JOB_ID"])
+        elif body.get("text"):
+            from jd_parser import extract_jd_requirements      # stores the JD in self.store itself
+            jd = await self._blocking(lambda: extract_jd_requirements(body["text"], store=self.store))
+        else:
+            raise HTTPError(400, 'expected {"text": ...} or {"jd": {...}}')
+        self.jobs[jd["JOB_ID"]] = {"jd": jd, "candidates": {}, "pool": None, "version": 0}
+        return {"job_id": jd["JOB_ID"], "jd": jd}
+
+    async def job_info(self, job_id: str) -> dict:
+        job = await self._job(job_id)
+        return {"job_id": job_id, "jd": job["jd"], "candidates": len(job["candidates"])}
+
+    async def submit_resume(self, job_id: str, data: bytes, filename: str,
+                            candidate_id: str | None = None) -> dict:
+        job = await self._job(job_id)
+        path = await self._blocking(self._save_upload, job_id, data, filename)
+        record = await self._parse(job_id, path, candidate_id)
+        if record["parsed"] is None:
+            return {k: record[k] for k in ("candidate_id", "tier", "error")}
+        scored = await self.score_batcher.submit((job_id, record["candidate_id"], record["parsed"]))
+        record.update(scored)
+        if self.config.get("llm_score_uploads") and job["jd"].get("required_skills"):
+            record["llm_skill_scores"] = await self.llm_batcher.submit(
+                (job_id, record["candidate_id"], record["parsed"]))
+        cid = record["candidate_id"]
+        if cid in job["candidates"] and job["candidates"][cid]["path"] not in (None, path):
+            cid = record["candidate_id"] = f"{cid}#{len(job['candidates'])}"
+        job["candidates"][cid] = record
+        job["pool"] = None
+        job["version"] += 1
+        if self.store is not None:
+            await self._blocking(self.store.put_candidates, job_id,
+                                 [(cid, record["parsed"], record.get("doc_hash"))])
+        return {k: v for k, v in record.items() if k not in ("parsed", "fields")}
+
+    async def rank(self, job_id: str, top: int, llm: bool = False) -> dict:
+        job = await self._job(job_id)
+        ids = [cid for cid, r in job["candidates"].items() if r["parsed"]]
+        if not ids:
+            return {"job_id": job_id, "ranked": []}
+        pool = job["pool"]
+        if pool is None:
+            version = job["version"]
+            pool = await self._blocking(
+                scoring.CandidatePool.from_resumes, [job["candidates"][c]["parsed"] for c in ids], ids)
+            if job["version"] == version:                  # no upload landed while it was built
+                job["pool"] = pool
+        stats = {}
+        ranked = await self._blocking(lambda: scoring.rank_top_k(job["jd"], pool, top, stats=stats))
+        if llm and job["jd"].get("required_skills"):
+            todo = [r for r in ranked if "llm_skill_scores" not in job["candidates"][r["candidate"]]]
+            scores = await asyncio.gather(*(self.llm_batcher.submit(
+                (job_id, r["candidate"], job["candidates"][r["candidate"]]["parsed"])) for r in todo))
+            for r, s in zip(todo, scores):
+                job["candidates"][r["candidate"]]["llm_skill_scores"] = s
+            for r in ranked:
+                r["llm_skill_scores"] = job["candidates"][r["candidate"]].get("llm_skill_scores")
+        for r in ranked:
+            rec = job["candidates"][r["candidate"]]
+            r.update(tier=rec["tier"], confidence=rec["confidence"])
+        return {"job_id": job_id, "ranked": ranked, "prefilter": stats}
+
+    def stats(self) -> dict:
+        return {"jobs": len(self.jobs),
+                "candidates": sum(len(j["candidates"]) for j in self.jobs.values()),
+                **self.counters,
+                "score_batches": self.score_batcher.stats(), "llm_batches": self.llm_batcher.stats(),
+                "latency": {route: h.to_dict() for route, h in self.latency.items()}}
+
+    # -- upload handling -----------------------------------------------------
+    def _save_upload(self, job_id: str, data: bytes, filename: str) -> str:
+        folder = os.path.join(self.config.get("upload_dir") or UPLOAD_DIR, job_id)
+        os.makedirs(folder, exist_ok=True)
+        name = _SAFE_NAME.sub("_", os.path.basename(filename)) or "resume.txt"
+        # Content-addressed, so re-uploading the same file reuses the text cache and stored parse.
+        path = os.path.join(folder, f"{hashlib.sha256(data).hexdigest()[:12]}_{name}")
+        if not os.path.exists(path):
+            with open(path, "wb") as f:
+                f.write(data)
+        return path
+
+    def _stored_parse(self, path: str):
+        fh = file_hash(path)
+        doc_hash = self.store.doc_for_file(fh)
+        doc = doc_hash and self.store.get_document(doc_hash)
+        if doc and doc["parsed"]:
+            return fh, {"ok": True, "data": doc["parsed"], "doc_hash": doc_hash,
+                        "simhash": doc["simhash"], "tier": doc["tier"], "reused": True}
+        return fh, None
+
+    async def _parse(self, job_id: str, path: str, candidate_id: str | None) -> dict:
+        loop = asyncio.get_running_loop()
+        self.counters["uploads"] += 1
+        fh, result = (await self._blocking(self._stored_parse, path)) if self.store is not None else (None, None)
+        if result is None:
+            result = await loop.run_in_executor(self.parse_pool, _parse_and_fingerprint, path)
+            if self.store is not None and result["ok"] and result.get("doc_hash"):
+                await self._blocking(self.store.put_document,
+                                     {"doc_hash": result["doc_hash"], "simhash": result["simhash"],
+                                      "file_hash": fh}, result["data"], "nlp")
+        else:
+            self.counters["reused"] += 1
+        name = os.path.splitext(os.path.basename(path))[0].split("_", 1)[-1]
+        record = {"candidate_id": candidate_id or name, "path": path, "tier": "failed",
+                  "parsed": None, "confidence": 0.0, "fields": {}, "doc_hash": result.get("doc_hash")}
+        if result["ok"]:
+            overall, fields = field_confidence(result["data"], self.pipeline_cfg)
+            record.update(tier=result.get("tier", "nlp"), parsed=result["data"],
+                          confidence=overall, fields=fields)
+        else:
+            record["error"] = result["error"]
+            self.counters["parse_failed"] += 1
+        if record["tier"] == "failed" or (record["tier"] == "nlp" and needs_escalation(
+                record["confidence"], record["fields"], self.pipeline_cfg)):
+            await self._escalate(job_id, record)
+        return record
+
+    async def _escalate(self, job_id: str, record: dict):
+        async with self.escalations:
+            try:
+                llm = await self._blocking(self.llm_extract, record["path"], job_id, record["candidate_id"])
+            except Exception as e:
+                record["escalation_error"] = f"{type(e).__name__}: {e}"
+                return
+        record["parsed"] = merge_parses(record["parsed"] or {}, llm)
+        record["tier"] = "llm"
+        record.pop("error", None)
+        self.counters["escalated"] += 1
+
+    # -- batch functions -----------------------------------------------------
+    async def _score_batch(self, items: list) -> list:
+        # Pool build and scoring are CPU work: off the event loop, like rank().
+        return await self._blocking(self._score_items, items)
+
+    def _score_items(self, items: list) -> list:
+        by_job = {}
+        for pos, (job_id, cid, parsed) in enumerate(items):
+            by_job.setdefault(job_id, []).append((pos, cid, parsed))
+        out = [None] * len(items)
+        for job_id, rows in by_job.items():
+            jd = self.jobs[job_id]["jd"]
+            pool = scoring.CandidatePool.from_resumes([p for _, _, p in rows], ids=[c for _, c, _ in rows])
+            for r in scoring.rank_candidates(jd, None, pool=pool):
+                out[rows[r["index"]][0]] = {k: r[k] for k in ("score", "sub_scores", "missing_required")}
+        return out
+
+    async def _llm_batch(self, items: list) -> list:
+        by_job = {}
+        for pos, (job_id, cid, parsed) in enumerate(items):
+            by_job.setdefault(job_id, []).append((pos, f"{cid}@{pos}", parsed))
+        out = [None] * len(items)
+        for job_id, rows in by_job.items():
+            required = self.jobs[job_id]["jd"].get("required_skills") or []
+            scores = await self._blocking(self.llm_score, required, {key: p for _, key, p in rows})
+            for pos, key, _ in rows:
+                out[pos] = scores.get(key)
+        return out
+
+# ---------- HTTP ------------------------------------------------------------
+ROUTES = [
+    ("POST", re.compile(r"^/jobs/?$"), "submit_jd"),
+    ("GET",  re.compile(r"^/jobs/(?P<job_id>[^/]+)/?$"), "job_info"),
+    ("POST", re.compile(r"^/jobs/(?P<job_id>[^/]+)/resumes/?$"), "submit_resume"),
+    ("GET",  re.compile(r"^/jobs/(?P<job_id>[^/]+)/rank/?$"), "rank"),
+    ("GET",  re.compile(r"^/health/?$"), "health"),
+    ("GET",  re.compile(r"^/stats/?$"), "stats"),
+]
+
+
+class HTTPServer:
+    """Minimal HTTP/1.1 (keep-alive, Content-Length bodies) over asyncio streams."""
+
+    def __init__(self, service: ScreeningService, host: str, port: int):
+        self.service, self.host, self.port = service, host, port
+        self.max_body = int(service.config.get("max_body_mb", 10) * 1024 * 1024)
+        self.server = None
+
+    async def start(self):
+        self.server = await asyncio.start_server(self._handle, self.host, self.port, limit=2 ** 20)
+        self.port = self.server.sockets[0].getsockname()[1]
+        return self
+
+    async def stop(self):
+        self.server.close()
+        await self.server.wait_closed()
+
+    async def _handle(self, reader, writer):
+        try:
+            while True:
+                line = await reader.readline()
+                if not line.strip():
+                    break
+                method, target, _ = line.decode("latin-1").split(" ", 2)
+                headers = {}
+                while True:
+                    h = await reader.readline()
+                    if h in (b"\r\n", b"\n", b""):
+                        break
+                    k, _, v = h.decode("latin-1").partition(":")
+                    headers[k.strip().lower()] = v.strip()
+                length = int(headers.get("content-length") or 0)
+                if length > self.max_body:
+                    self._write(writer, 413, {"error": "body too large"}, close=True)
+                    await writer.drain()
+                    break
+                body = await reader.readexactly(length) if length else b""
+                status, payload = await self._dispatch(method, target, headers, body)
+                close = headers.get("connection", "").lower() == "close"
+                self._write(writer, status, payload, close)
+                await writer.drain()
+                if close:
+                    break
+        except (asyncio.IncompleteReadError, ConnectionError, ValueError):
+            pass
+        finally:
+            writer.close()
+
+    @staticmethod
+    def _write(writer, status: int, payload: dict, close: bool = False):
+        data = json.dumps(payload, default=str).encode("utf-8")
+        writer.write((f"HTTP/1.1 {status} {REASONS.get(status, '')}\r\n"
+                      f"Content-Type: application/json\r\nContent-Length: {len(data)}\r\n"
+                      f"Connection: {'close' if close else 'keep-alive'}\r\n\r\n").encode("latin-1") + data)
+
+    async def _dispatch(self, method: str, target: str, headers: dict, body: bytes):
+        url = urlsplit(target)
+        query = {k: v[-1] for k, v in parse_qs(url.query).items()}
+        svc = self.service
+        t0 = time.perf_counter()
+        name = "unknown"
+        try:
+            for m, pattern, handler in ROUTES:
+                match = pattern.match(url.path)
+                if not match:
+                    continue
+                if m != method:
+                    raise HTTPError(405, f"{method} not allowed on {url.path}")
+                name, args = handler, match.groupdict()
+                if handler == "submit_jd":
+                    return 201, await svc.submit_jd(json.loads(body or b"{}"))
+                if handler == "job_info":
+                    return 200, await svc.job_info(args["job_id"])
+                if handler == "submit_resume":
+                    filename = query.get("filename") or headers.get("x-filename") or "resume.txt"
+                    if headers.get("content-type", "").startswith("application/json"):
+                        doc = json.loads(body or b"{}")
+                        body, filename = str(doc.get("text", "")).encode("utf-8"), doc.get("filename") or "resume.txt"
+                        if not filename.lower().endswith(".txt"):
+                            filename += ".txt"
+                    if not body:
+                        raise HTTPError(400, "empty resume")
+                    return 201, await svc.submit_resume(args["job_id"], body, filename,
+                                                        query.get("candidate_id"))
+                if handler == "rank":
+                    return 200, await svc.rank(args["job_id"], int(query.get("top", 10)),
+                                               query.get("llm", "0") in ("1", "true"))
+                if handler == "health":
+                    return 200, {"status": "ok"}
+                return 200, svc.stats()
+            raise HTTPError(404, f"no route for {url.path}")
+        except HTTPError as e:
+            return e.status, {"error": str(e)}
+        except (json.JSONDecodeError, UnicodeDecodeError, ValueError) as e:
+            return 400, {"error": f"{type(e).__name__}: {e}"}
+        except Exception as e:
+            print(f"[Service] {method} {url.path} failed: {type(e).__name__}: {e}", file=sys.stderr)
+            return 500, {"error": f"{type(e).__name__}: {e}"}
+        finally:
+            svc.latency.setdefault(name, Histogram()).observe((time.perf_counter() - t0) * 1000)
+
+
+async def serve(host: str, port: int, store=None, ready=None, **kwargs):
+    """Run until cancelled. `ready` (an asyncio.Event) is set once the port is bound."""
+    service = ScreeningService(store=store, **kwargs)
+    await service.start()
+    http = await HTTPServer(service, host, port).start()
+    print(f"[Service] Listening on http://{host}:{http.port}")
+    if ready is not None:
+        ready.port, ready.service = http.port, service
+        ready.set()
+    try:
+        await asyncio.Event().wait()
+    finally:
+        await http.stop()
+        await service.stop()
+
+
+def main(argv=None):
+    import argparse
+
+    cfg = get_section("service")
+    ap = argparse.ArgumentParser(description="Run the screening HTTP service.")
+    ap.add_argument("--host", default=cfg.get("host", "127.0.0.1"))
+    ap.add_argument("--port", type=int, default=cfg.get("port", 8080))
+    ap.add_argument("--stub", action="store_true", help="Serve against a local stub LLM backend")
+    ap.add_argument("--no-store", action="store_true", help="Keep jobs and candidates in memory only")
+    args = ap.parse_args(argv)
+
+    stub = None
+    if args.stub:
+        from benchmarks.stub_server import StubLLMServer
+        stub = StubLLMServer(latency_ms=200, jitter_ms=50).start()
+        os.environ.update({"OLLAMA_HOST": stub.url, "OPENAI_BASE_URL": f"{stub.url}/v1",
+                           "OPENAI_API_KEY": os.environ.get("OPENAI_API_KEY", "stub"), "OLLAMA_PROBE_S": "0"})
+        print(f"[Service] Using stub LLM backend at {stub.url}")
+    store = None
+    if not args.no_store:
+        from candidate_store import get_store
+        store = get_store()
+    try:
+        asyncio.run(serve(args.host, args.port, store=store))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        if stub is not None:
+            stub.stop()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
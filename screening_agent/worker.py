@@ -0,0 +1,349 @@
+# worker.py
+"""
+Distributed screening through the durable work queue (modules/work_queue.py).
+
+    python screening_agent/worker.py submit --jd data/job_descriptions/DY_FS.txt --resumes data/resumes
+    python screening_agent/worker.py work --processes 8              # on as many hosts as you like
+    python screening_agent/worker.py status --job <job_id>
+    python screening_agent/worker.py rank --job <job_id> --top 20 --llm-score --wait
+
+Task kinds, one handler each:
+
+    jd_parse       {"text"}                       → extracted JD (stored under the job id)
+    resume_parse   {"path", "candidate_id"}       → NLP parse (keyed by file hash), escalated to the LLM like pipeline.py
+    skill_score    {"candidate_ids", "required"}  → LLM skill scores for a shortlist batch
+
+Every host must see the queue file (WORK_QUEUE_PATH), the resume paths and the
+candidate store at the same paths. Re-running a handler is harmless: results are
+stored once per (job, kind, key) and store writes are upserts.
+"""
+
+import os
+import sys
+import json
+import time
+import hashlib
+import uuid
+import signal
+import threading
+import traceback
+from concurrent.futures import ProcessPoolExecutor
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from pipeline import (_parse_and_fingerprint, field_confidence, needs_escalation,  # noqa: E402
+                      merge_parses, llm_extract, iter_resume_paths)                 # (also puts modules/ on sys.path)
+from config_loader import get_section                                               # noqa: E402
+from text_extraction import file_hash                                               # noqa: E402
+from work_queue import WorkQueue, get_queue, worker_name                            # noqa: E402
+import scoring                                                                      # noqa: E402
+
+KINDS = ("jd_parse", "resume_parse", "skill_score")
+
+# ---------- handlers --------------------------------------------------------
+def handle_jd_parse(job_id: str, payload: dict, queue: WorkQueue) -> dict:
+    from jd_parser import extract_jd_requirements
+    return extract_jd_requirements(payload["text"], job_id=job_id)
+
+
+def handle_resume_parse(job_id: str, payload: dict, queue: WorkQueue) -> dict:
+    from candidate_store import get_store
+
+    path, cid = payload["path"], payload["candidate_id"]
+    cfg = get_section("pipeline")
+    store = get_store()
+    fh = file_hash(path)
+    doc_hash = store.doc_for_file(fh)
+    doc = doc_hash and store.get_document(doc_hash)
+    if doc and doc["parsed"]:
+        result = {"ok": True, "data": doc["parsed"], "doc_hash": doc_hash, "tier": doc["tier"], "reused": True}
+    else:
+        result = _parse_and_fingerprint(path)
+        if result["ok"] and result.get("doc_hash"):
+            store.put_document({"doc_hash": result["doc_hash"], "simhash": result["simhash"], "file_hash": fh},
+                               result["data"], "nlp")
+    fields = {}
+    record = {"candidate_id": cid, "path": path, "tier": "failed", "confidence": 0.0, "parsed": None,
+              "doc_hash": result.get("doc_hash"), "reused": bool(result.get("reused"))}
+    if result["ok"]:
+        overall, fields = field_confidence(result["data"], cfg)
+        record.update(tier=result.get("tier", "nlp"), parsed=result["data"], confidence=overall)
+    if payload.get("escalate", True) and (record["tier"] == "failed" or (
+            record["tier"] == "nlp" and needs_escalation(record["confidence"], fields, cfg))):
+        # An LLM error propagates: the task is retried with backoff, then dead-lettered.
+        llm = llm_extract(path, job_id, cid)
+        record.update(parsed=merge_parses(record["parsed"] or {}, llm), tier="llm")
+    if record["parsed"] is None:
+        raise ValueError(result.get("error") or "resume could not be parsed")
+    store.put_candidates(job_id, [(cid, record["parsed"], record["doc_hash"])])
+    return record
+
+
+def handle_skill_score(job_id: str, payload: dict, queue: WorkQueue) -> dict:
+    from skill_match import score_skills_batch
+
+    parses = _parses(queue, job_id)
+    shortlist = {cid: parses[cid]["parsed"] for cid in payload["candidate_ids"] if cid in parses}
+    return score_skills_batch(payload["required"], shortlist)
+
+
+HANDLERS = {"jd_parse": handle_jd_parse, "resume_parse": handle_resume_parse,
+            "skill_score": handle_skill_score}
+
+# ---------- worker loop -----------------------------------------------------
+class _Heartbeat(threading.Thread):
+    """Keeps the leases of the tasks in hand alive while a handler runs."""
+
+    def __init__(self, queue: WorkQueue, tasks: list, every_s: float):
+        super().__init__(daemon=True, name="lease-heartbeat")
+        self.queue, self.every_s = queue, every_s
+        self.held = {task["id"]: task for task in tasks}
+        self.lost = set()
+        self.stopped = threading.Event()
+        self._lock = threading.Lock()
+
+    def release(self, task: dict):
+        with self._lock:
+            self.held.pop(task["id"], None)
+
+    def is_lost(self, task: dict) -> bool:
+        with self._lock:
+            return task["id"] in self.lost
+
+    def run(self):
+        while not self.stopped.wait(self.every_s):
+            with self._lock:
+                tasks = list(self.held.values())
+            for task in tasks:
+                if not self.queue.heartbeat(task):
+                    print(f"[Worker] Lost lease on {task['kind']} {task['key']}")
+                    with self._lock:
+                        self.held.pop(task["id"], None)
+                        self.lost.add(task["id"])
+
+
+def work(kinds=KINDS, job_id: str | None = None, batch: int = 1, idle_exit_s: float | None = None,
+         queue: WorkQueue | None = None) -> dict:
+    """Lease, run and settle tasks until stopped (or idle for idle_exit_s). Returns counts."""
+    queue = queue or get_queue()
+    poll_s = queue.config.get("poll_s", 0.5)
+    me = worker_name()
+    counts = {"done": 0, "retried": 0, "dead": 0, "lost": 0}
+    stop = threading.Event()
+    if threading.current_thread() is threading.main_thread():
+        signal.signal(signal.SIGTERM, lambda *_: stop.set())
+    idle_since = time.monotonic()
+    while not stop.is_set():
+        tasks = queue.lease(me, kinds, n=batch, job_id=job_id)
+        if not tasks:
+            if idle_exit_s is not None and time.monotonic() - idle_since >= idle_exit_s:
+                break
+            stop.wait(poll_s)
+            continue
+        beat = _Heartbeat(queue, tasks, queue.config["lease_s"] / 3)
+        beat.start()
+        try:
+            for task in tasks:
+                if beat.is_lost(task):
+                    # Expired while earlier tasks of the batch ran; another worker has it.
+                    counts["lost"] += 1
+                    continue
+                try:
+                    result = HANDLERS[task["kind"]](task["job_id"], task["payload"], queue)
+                except Exception as e:
+                    status = queue.fail(task, f"{type(e).__name__}: {e}")
+                    counts[{"dead": "dead", "lost": "lost"}.get(status, "retried")] += 1
+                    print(f"[Worker] {task['kind']} {task['key']} failed (attempt {task['attempt']}, "
+                          f"now {status}): {type(e).__name__}: {e}", file=sys.stderr)
+                    if status == "dead":
+                        traceback.print_exc()
+                else:
+                    # False: the lease ran out and another worker owns the task; its result counts.
+                    counts["done" if queue.complete(task, result) else "lost"] += 1
+                beat.release(task)
+        finally:
+            beat.stopped.set()
+        idle_since = time.monotonic()
+    print(f"[Worker] {me} stopping: {counts}")
+    return counts
+
+
+def _work_process(kinds, job_id, batch, idle_exit_s):
+    # A SQLite connection must not cross a fork: each process opens its own queue.
+    import work_queue
+    work_queue._queue = None
+    return work(kinds, job_id, batch, idle_exit_s, queue=get_queue())
+
+# ---------- producers -------------------------------------------------------
+def submit(resumes, jd_text: str | None = None, jd: dict | None = None, job_id: str | None = None,
+           escalate: bool = True, queue: WorkQueue | None = None) -> dict:
+    """Queue a requisition: the JD (text to extract, or already extracted) and every resume."""
+    queue = queue or get_queue()
+    job_id = job_id or (jd or {}).get("JOB_ID") or str(uuid.uuid4())
+    if jd is not None:
+        from candidate_store import get_store
+        get_store().put_job({**jd, "JOB_ID": job_id}, job_id)
+    elif jd_text is not None:
+        queue.enqueue(job_id, "jd_parse", {"text": jd_text}, key="jd")
+    # Tasks are keyed by file content, so an edited resume is parsed again; a path keeps
+    # the candidate id it was first given, and a new path whose stem is taken gets a hash suffix.
+    owner = {}                                          # candidate id -> path
+    for payload in queue.payloads(job_id, "resume_parse").values():
+        owner.setdefault(payload["candidate_id"], payload["path"])
+    ids = {path: cid for cid, path in owner.items()}
+    items = []
+    for path in iter_resume_paths(resumes):
+        path, key = os.path.abspath(path), file_hash(path)
+        cid = ids.get(path) or os.path.splitext(os.path.basename(path))[0]
+        if owner.setdefault(cid, path) != path:         # same file stem in two folders
+            cid = f"{cid}#{key[:8]}"
+            owner[cid] = path
+        ids[path] = cid
+        items.append((key, {"path": path, "candidate_id": cid, "escalate": escalate}))
+    added = queue.enqueue_many(job_id, "resume_parse", items)
+    print(f"[Worker] Job {job_id}: queued {added} of {len(items)} resumes")
+    return {"job_id": job_id, "resumes": len(items), "queued": added}
+
+
+def wait_for(queue: WorkQueue, job_id: str, kind: str | None = None, poll_s: float = 1.0):
+    while queue.pending(job_id, kind):
+        time.sleep(poll_s)
+
+
+def _parses(queue: WorkQueue, job_id: str) -> dict:
+    """{candidate_id: resume_parse result} of a job; the latest parse wins when a resume was edited."""
+    return {r["candidate_id"]: r for r in queue.results(job_id, "resume_parse").values() if r.get("parsed")}
+
+
+def _job_jd(queue: WorkQueue, job_id: str) -> dict | None:
+    jd = queue.result(job_id, "jd_parse", "jd")
+    if jd is None:
+        from candidate_store import get_store
+        jd = get_store().get_job(job_id)
+    return jd
+
+
+def _batch_key(candidate_ids: list, required: list) -> str:
+    """skill_score task key: the batch's content, so a changed shortlist is scored anew."""
+    blob = json.dumps([sorted(candidate_ids), required], ensure_ascii=False)
+    return hashlib.sha256(blob.encode("utf-8")).hexdigest()[:24]
+
+
+def rank(job_id: str, top_k: int | None = None, llm_score: bool = False, wait: bool = False,
+         queue: WorkQueue | None = None) -> list:
+    """
+    Rank the parsed candidates of a job (pre-filter + top-K) and store the scores. With
+    llm_score the shortlist is queued as skill_score tasks for the workers; scores
+    already stored for these batches are attached to the ranking.
+    """
+    from candidate_store import get_store
+
+    queue = queue or get_queue()
+    top_k = top_k or get_section("pipeline").get("shortlist_k", 20)
+    if wait:
+        wait_for(queue, job_id, "jd_parse")
+        wait_for(queue, job_id, "resume_parse")
+    jd = _job_jd(queue, job_id)
+    if jd is None:
+        raise ValueError(f"No JD for job {job_id} yet")
+    parses = _parses(queue, job_id)
+    if not parses:
+        return []
+    ids = list(parses)
+    pool = scoring.CandidatePool.from_resumes([parses[c]["parsed"] for c in ids], ids=ids)
+    ranked = scoring.rank_top_k(jd, pool, top_k)
+    required = jd.get("required_skills") or []
+    size = get_section("work_queue").get("skill_score_batch", 8)
+    shortlist = [r["candidate"] for r in ranked]
+    batches = {_batch_key(shortlist[i:i + size], required): shortlist[i:i + size]
+               for i in range(0, len(shortlist), size)}
+    if llm_score and ranked and required:
+        queue.enqueue_many(job_id, "skill_score", [
+            (key, {"candidate_ids": ids, "required": required}) for key, ids in batches.items()])
+        if wait:
+            wait_for(queue, job_id, "skill_score")
+    scores = {}
+    for key in batches:
+        scores.update(queue.result(job_id, "skill_score", key) or {})
+    for r in ranked:
+        rec = parses[r["candidate"]]
+        r.update(tier=rec["tier"], confidence=rec["confidence"], path=rec["path"])
+        if r["candidate"] in scores:
+            r["llm_skill_scores"] = scores[r["candidate"]]
+    get_store().put_scores(job_id, ranked)
+    return ranked
+
+
+def main(argv=None):
+    import argparse
+    from pprint import pprint
+
+    ap = argparse.ArgumentParser(description="Screen resumes through the durable work queue.")
+    sub = ap.add_subparsers(dest="cmd", required=True)
+    s = sub.add_parser("submit", help="Queue a JD and its resumes")
+    src = s.add_mutually_exclusive_group(required=True)
+    src.add_argument("--jd", help="Job description text file (extracted by a jd_parse task)")
+    src.add_argument("--jd-json", help="Already-extracted JD JSON")
+    src.add_argument("--job", help="Add resumes to an existing job")
+    s.add_argument("--resumes", required=True, help="Resume file, directory or glob pattern")
+    s.add_argument("--no-escalate", action="store_true", help="NLP parse only, never call the LLM")
+    w = sub.add_parser("work", help="Run worker processes until stopped")
+    w.add_argument("--processes", type=int, default=None, help="Default: work_queue.processes or CPU count")
+    w.add_argument("--kinds", default=",".join(KINDS))
+    w.add_argument("--job", help="Only take tasks of this job")
+    w.add_argument("--batch", type=int, default=1, help="Tasks leased at a time")
+    w.add_argument("--exit-when-idle", type=float, default=None, metavar="SECONDS",
+                   help="Stop after this long with nothing to do")
+    st = sub.add_parser("status", help="Progress and throughput per job")
+    st.add_argument("--job")
+    st.add_argument("--dead", action="store_true", help="List dead-lettered tasks")
+    rq = sub.add_parser("retry-dead", help="Requeue dead-lettered tasks")
+    rq.add_argument("--job", required=True)
+    rq.add_argument("--kind")
+    rk = sub.add_parser("rank", help="Rank a job's parsed candidates")
+    rk.add_argument("--job", required=True)
+    rk.add_argument("--top", type=int, default=None)
+    rk.add_argument("--llm-score", action="store_true", help="Queue LLM skill scoring of the shortlist")
+    rk.add_argument("--wait", action="store_true", help="Wait for outstanding tasks first")
+    args = ap.parse_args(argv)
+
+    # Opened per branch: "work" forks its processes before any connection exists.
+    if args.cmd == "submit":
+        jd_text = jd = None
+        if args.jd:
+            with open(args.jd, "r", encoding="utf-8") as f:
+                jd_text = f.read()
+        elif args.jd_json:
+            with open(args.jd_json, "r", encoding="utf-8") as f:
+                jd = json.load(f)
+        submit(args.resumes, jd_text, jd, args.job, escalate=not args.no_escalate)
+    elif args.cmd == "work":
+        kinds = [k for k in args.kinds.split(",") if k]
+        n = args.processes or get_section("work_queue").get("processes") or os.cpu_count() or 1
+        if n <= 1:
+            work(kinds, args.job, args.batch, args.exit_when_idle)
+        else:
+            with ProcessPoolExecutor(max_workers=n) as ex:
+                futures = [ex.submit(_work_process, kinds, args.job, args.batch, args.exit_when_idle)
+                           for _ in range(n)]
+                totals = {}
+                for fut in futures:
+                    for k, v in fut.result().items():
+                        totals[k] = totals.get(k, 0) + v
+            print(f"[Worker] {n} processes done: {totals}")
+    elif args.cmd == "status":
+        queue = get_queue()
+        for job in [args.job] if args.job else queue.jobs():
+            pprint(queue.dead(job) if args.dead else queue.progress(job))
+    elif args.cmd == "retry-dead":
+        print(f"[Worker] Requeued {get_queue().requeue_dead(args.job, args.kind)} dead tasks")
+    else:
+        ranked = rank(args.job, args.top, args.llm_score, args.wait)
+        for i, r in enumerate(ranked, start=1):
+            missing = ", ".join(r["missing_required"]) or "-"
+            print(f"{i:>3}. {r['candidate']:<30} {r['score']:.3f}  [{r['tier']}]  missing: {missing}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
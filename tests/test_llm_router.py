@@ -0,0 +1,42 @@
+# test_llm_router.py
+"""Circuit breaker behaviour of the async routed call."""
+
+import asyncio
+import os
+import sys
+import time
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "screening_agent")
+sys.path.insert(0, os.path.join(ROOT, "modules"))
+sys.path.insert(0, ROOT)
+
+from llm_router import Backend, CircuitOpen, Router, OPEN, CLOSED  # noqa: E402
+
+
+def test_ainvoke_half_opens_after_cool_down_with_a_single_trial():
+    backend = Backend("ollama", None, failure_threshold=1, reset_timeout=0.05)
+    router = Router([backend])
+
+    async def fail():
+        raise RuntimeError("down")
+
+    async def slow_ok():
+        await asyncio.sleep(0.05)
+        return "ok"
+
+    async def scenario():
+        try:
+            await router.ainvoke(backend, fail)
+        except RuntimeError:
+            pass
+        assert backend.breaker.state == OPEN and not router.available("ollama")
+        time.sleep(0.06)
+        assert router.available("ollama")            # cool-down applied without a probe
+        return await asyncio.gather(*(router.ainvoke(backend, slow_ok) for _ in range(3)),
+                                    return_exceptions=True)
+
+    results = asyncio.run(scenario())
+    assert results[0] == "ok"
+    assert all(isinstance(r, CircuitOpen) for r in results[1:])
+    assert backend.breaker.state == CLOSED
+    assert backend.stats.summary()["calls"] == 2 and backend.stats.summary()["errors"] == 1
@@ -0,0 +1,53 @@
+# test_prompt_compaction.py
+"""Page furniture removal must not drop real content that repeats a header-block line."""
+
+import os
+import sys
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "screening_agent")
+sys.path.insert(0, os.path.join(ROOT, "modules"))
+
+from prompt_compaction import compact_resume  # noqa: E402
+
+RESUME = """Jane Candidate
+Data Scientist
+jane@example.com | +1 617 555 0100
+
+PROFESSIONAL EXPERIENCE
+Data Scientist
+Acme Corp, Jan 2021 - Dec 2023
+- Built churn models in Python
+\f
+Jane Candidate
+Data Scientist
+jane@example.com | +1 617 555 0100
+- Shipped a forecasting service
+
+EDUCATION
+MSc Data Science, Northeastern University 2019 - 2021
+"""
+
+
+def test_headline_repeated_as_role_title_is_kept():
+    out, report = compact_resume(RESUME, budget=0)
+    experience = out.split("PROFESSIONAL EXPERIENCE", 1)[1]
+    assert experience.splitlines()[1] == "Data Scientist"
+    assert "Acme Corp" in experience
+
+
+def test_page_header_after_page_break_is_dropped():
+    out, report = compact_resume(RESUME, budget=0)
+    experience = out.split("PROFESSIONAL EXPERIENCE", 1)[1]
+    assert experience.count("Data Scientist") == 1
+    assert "Jane Candidate" not in experience
+    assert "jane@example.com" not in experience
+    assert "- Shipped a forecasting service" in experience
+    assert report["lines_dropped"] == 3
+
+
+def test_contact_line_is_dropped_anywhere():
+    text = RESUME.replace("\f\n", "")
+    out, _ = compact_resume(text, budget=0)
+    experience = out.split("PROFESSIONAL EXPERIENCE", 1)[1]
+    assert "jane@example.com" not in experience and "Jane Candidate" not in experience
+    assert experience.count("Data Scientist") == 2          # no page break: the headline copy stays
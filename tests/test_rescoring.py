@@ -0,0 +1,48 @@
+# test_rescoring.py
+"""Incremental re-ranking matches a fresh ranking after candidates change in the store."""
+
+import os
+import sys
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "screening_agent")
+sys.path.insert(0, os.path.join(ROOT, "modules"))
+sys.path.insert(0, ROOT)
+
+import rescoring  # noqa: E402
+import scoring  # noqa: E402
+from candidate_store import CandidateStore  # noqa: E402
+
+JD = {"JOB_ID": "job", "required_skills": ["Python", "SQL"], "preferred_skills": ["Docker"],
+      "min_experience_years": 2}
+
+
+def _resume(skills, years=3):
+    return {"skills": skills, "total_years_of_experience": years, "education": [{"degree": "BSc"}]}
+
+
+def _fresh(store):
+    items = store.load_candidates("job")
+    pool = scoring.CandidatePool.from_resumes([r for _, r in items], ids=[c for c, _ in items])
+    return [(r["candidate"], r["score"]) for r in scoring.rank_top_k(JD, pool, 10)]
+
+
+def test_rerank_picks_up_upserted_and_re_added_candidates(tmp_path):
+    store = CandidateStore(str(tmp_path / "store.sqlite"))
+    store.put_job(JD, "job")
+    store.put_candidates("job", [("a", _resume(["Python"])), ("b", _resume(["SQL"])),
+                                 ("c", _resume(["Python", "SQL"]))])
+    rescoring.snapshot(store, "job", JD)
+
+    store.put_candidate("job", "a", _resume(["Python", "SQL", "Docker"], 6))      # re-parse
+    with store._db:
+        store._db.execute("DELETE FROM candidates WHERE job_id = 'job' AND candidate_id = 'c'")
+    store.put_candidate("job", "c", _resume(["Docker"]))                           # deleted, re-added
+    store.put_candidate("job", "d", _resume(["Python", "SQL"]))                    # new
+
+    out = rescoring.rerank(store, "job", top_k=10, save=True)
+    assert (out["updated_candidates"], out["added_candidates"]) == (2, 1)
+    assert [(r["candidate"], r["score"]) for r in out["ranked"]] == _fresh(store)
+
+    again = rescoring.rerank(store, "job", top_k=10)
+    assert (again["updated_candidates"], again["added_candidates"]) == (0, 0)
+    store.close()
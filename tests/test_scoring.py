@@ -0,0 +1,40 @@
+# test_scoring.py
+"""Batched scoring and the pre-filtered top-K agree with a full ranking."""
+
+import os
+import sys
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "screening_agent")
+sys.path.insert(0, os.path.join(ROOT, "modules"))
+sys.path.insert(0, ROOT)
+
+import scoring  # noqa: E402
+
+CONFIG = {"weights": {"required_skills": 0.5, "preferred_skills": 0.15,
+                      "experience": 0.25, "qualifications": 0.1}}
+FILTERS = {"min_required_skills": 1}
+JD = {"required_skills": ["Python", "SQL", "Java"], "preferred_skills": ["Docker"],
+      "min_experience_years": 2}
+
+
+def _resume(i, skills=("Python", "SQL")):
+    return {"name": f"c{i}", "skills": list(skills), "total_years_of_experience": 3,
+            "education": [{"degree": "BSc"}]}
+
+
+def test_identical_candidates_tie_and_keep_lower_index():
+    resumes = [_resume(i) for i in range(601)]
+    pool = scoring.CandidatePool.from_resumes(resumes)
+    res = scoring.score_pool(JD, pool, CONFIG)
+    assert len(set(res["final"].tolist())) == 1
+    full = [r["candidate"] for r in scoring.rank_candidates(JD, resumes, 20, CONFIG, pool)]
+    top = [r["candidate"] for r in scoring.rank_top_k(JD, pool, 20, CONFIG, filters=FILTERS)]
+    assert full == top == [f"c{i}" for i in range(20)]
+
+
+def test_aliased_jd_skills_each_get_their_column():
+    pool = scoring.CandidatePool.from_resumes([_resume(0, ["Python"]), _resume(1, ["SQL"])])
+    key = scoring.skill_key("Python")
+    alias = next(s for s in ("python3", "Python 3", "PYTHON") if scoring.skill_key(s) == key)
+    m = pool.skill_matrix(["Python", "SQL", alias, "Rust"])
+    assert m.tolist() == [[True, False, True, False], [False, True, False, False]]
@@ -0,0 +1,38 @@
+# test_semantic_matcher.py
+"""The semantic index stays aligned across duplicate ids and interrupted adds."""
+
+import os
+import sys
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "screening_agent")
+sys.path.insert(0, os.path.join(ROOT, "modules"))
+sys.path.insert(0, ROOT)
+
+from semantic_matcher import SemanticIndex  # noqa: E402
+
+
+def _resume(skill):
+    return {"skills": [skill], "past_roles": [], "education": []}
+
+
+def test_duplicate_ids_in_a_batch_keep_the_last_resume(tmp_path):
+    index = SemanticIndex(str(tmp_path))
+    assert index.add([_resume("Python"), _resume("Java"), _resume("SQL")], ["a", "b", "a"]) == 2
+    assert index.ids == ["a", "b"]
+    assert index.top_k({"required_skills": ["SQL"]}, 1)[0][0] == "a"
+
+
+def test_an_interrupted_add_is_rolled_back(tmp_path):
+    index = SemanticIndex(str(tmp_path))
+    index.add([_resume("Python"), _resume("Java")], ["a", "b"])
+    with open(os.path.join(str(tmp_path), "vectors.f16"), "ab") as f:
+        f.write(b"\0" * 1000)                        # vectors written, ids never committed
+    with open(os.path.join(str(tmp_path), "ids.jsonl"), "a", encoding="utf-8") as f:
+        f.write('"torn')
+    reopened = SemanticIndex(str(tmp_path))
+    assert reopened.ids == ["a", "b"]
+    reopened.add([_resume("SQL")], ["c"])
+    index = SemanticIndex(str(tmp_path))
+    assert index.ids == ["a", "b", "c"]
+    assert os.path.getsize(os.path.join(str(tmp_path), "vectors.f16")) == index.vectors().nbytes
+    assert index.top_k({"required_skills": ["SQL"]}, 1)[0][0] == "c"
@@ -0,0 +1,143 @@
+# test_work_queue.py
+"""Leases, retries with backoff, dead-lettering and fenced results of the work queue."""
+
+import os
+import sys
+import time
+
+import pytest
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "screening_agent")
+sys.path.insert(0, os.path.join(ROOT, "modules"))
+sys.path.insert(0, ROOT)
+
+from work_queue import WorkQueue  # noqa: E402
+
+LEASE_S = 0.05
+
+
+@pytest.fixture
+def queue():
+    q = WorkQueue(":memory:", {"lease_s": LEASE_S, "backoff_s": LEASE_S, "max_attempts": 3, "poll_s": 0.01})
+    yield q
+    q.close()
+
+
+def _expire():
+    time.sleep(LEASE_S * 2)
+
+
+def test_enqueue_is_idempotent_per_key(queue):
+    assert queue.enqueue_many("j", "k", [("a", {}), ("b", {})]) == 2
+    assert queue.enqueue_many("j", "k", [("a", {}), ("c", {})]) == 1
+    assert queue.pending("j", "k") == 3
+
+
+def test_lease_is_exclusive_until_it_expires(queue):
+    queue.enqueue("j", "k", {"n": 1}, key="a")
+    [task] = queue.lease("w1")
+    assert task["payload"] == {"n": 1} and task["attempt"] == 1
+    assert queue.lease("w2") == []
+    _expire()
+    [again] = queue.lease("w2")
+    assert again["key"] == "a" and again["worker"] == "w2" and again["attempt"] == 2
+
+
+def test_heartbeat_keeps_the_lease(queue):
+    queue.enqueue("j", "k", {}, key="a")
+    [task] = queue.lease("w1")
+    for _ in range(3):
+        time.sleep(LEASE_S / 2)
+        assert queue.heartbeat(task)
+    assert queue.lease("w2") == []
+
+
+def test_late_complete_after_re_lease_is_fenced(queue):
+    queue.enqueue("j", "k", {}, key="a")
+    [t1] = queue.lease("w1")
+    _expire()
+    [t2] = queue.lease("w2")
+    assert not queue.complete(t1, "from w1")
+    assert not queue.heartbeat(t1)
+    assert queue.heartbeat(t2)
+    assert queue.complete(t2, "from w2")
+    assert queue.result("j", "k", "a") == "from w2"
+    assert not queue.complete(t2, "again")
+    assert queue.result("j", "k", "a") == "from w2"
+
+
+def test_fail_backs_off_then_dead_letters(queue):
+    queue.enqueue("j", "k", {}, key="a")
+    [task] = queue.lease("w")
+    assert queue.fail(task, "boom 1") == "queued"
+    assert queue.lease("w") == []                      # still backing off
+    time.sleep(LEASE_S * 1.5)
+    [task] = queue.lease("w")
+    assert task["attempt"] == 2
+    assert queue.fail(task, "boom 2") == "queued"
+    time.sleep(LEASE_S * 2.5)                          # backoff doubles
+    [task] = queue.lease("w")
+    assert queue.fail(task, "boom 3") == "dead"
+    assert queue.pending("j") == 0
+    assert queue.dead("j") == [{"kind": "k", "key": "a", "attempts": 3, "error": "boom 3"}]
+    assert not queue.complete(task, "too late")
+
+
+def test_expired_leases_dead_letter_after_max_attempts(queue):
+    queue.enqueue("j", "k", {}, key="a")
+    for _ in range(3):
+        assert len(queue.lease("w")) == 1
+        _expire()
+    assert queue.lease("w") == []
+    assert queue.dead("j")[0]["error"] == "lease expired"
+
+
+def test_requeue_dead_starts_a_fresh_life(queue):
+    queue.enqueue("j", "k", {}, key="a")
+    for _ in range(3):
+        [task] = queue.lease("w")
+        queue.fail(task, "parse error")
+        time.sleep(LEASE_S * 4.5)
+    assert queue.requeue_dead("j") == 1
+    for _ in range(3):                                 # this time the worker dies every attempt
+        assert len(queue.lease("w")) == 1
+        _expire()
+    queue.lease("w")
+    assert queue.dead("j")[0]["error"] == "lease expired"
+
+
+def test_worker_retries_then_completes(queue):
+    import worker
+
+    calls = []
+
+    def flaky(job_id, payload, q):
+        calls.append(payload["n"])
+        if len(calls) < 2:
+            raise RuntimeError("transient")
+        return {"n": payload["n"]}
+
+    worker.HANDLERS["flaky"] = flaky
+    try:
+        queue.enqueue("j", "flaky", {"n": 7}, key="a")
+        counts = worker.work(["flaky"], idle_exit_s=LEASE_S * 3, queue=queue)
+    finally:
+        del worker.HANDLERS["flaky"]
+    assert counts == {"done": 1, "retried": 1, "dead": 0, "lost": 0}
+    assert queue.result("j", "flaky", "a") == {"n": 7}
+
+
+def test_submit_keys_resumes_by_content(queue, tmp_path):
+    import worker
+
+    (tmp_path / "a").mkdir()
+    (tmp_path / "b").mkdir()
+    first = tmp_path / "a" / "cv.txt"
+    first.write_text("Jane Doe\nPython")
+    (tmp_path / "b" / "cv.txt").write_text("John Roe\nSQL")
+    assert worker.submit(str(tmp_path / "*" / "cv.txt"), job_id="j", queue=queue)["queued"] == 2
+    assert worker.submit(str(tmp_path / "a"), job_id="j", queue=queue)["queued"] == 0
+    first.write_text("Jane Doe\nPython, Docker")                    # edited resume
+    assert worker.submit(str(first), job_id="j", queue=queue)["queued"] == 1
+    ids = [p["candidate_id"] for p in queue.payloads("j", "resume_parse").values()]
+    assert ids[0] == ids[2] == "cv" and ids[1].startswith("cv#")